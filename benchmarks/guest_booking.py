@@ -0,0 +1,103 @@
+"""
+Benchmark rezerwacji dla nowego gościa: konto z hasłem vs konto bez hasła (core.accounts).
+
+"before" to dawna ścieżka widoku recepcji: szukanie wolnej nazwy użytkownika
+pętlą zapytań ``exists()`` i ``create_user`` z numerem telefonu jako hasłem
+(PBKDF2). "after" to ``accounts.create_guest``: wolna nazwa jednym zapytaniem
+i ``set_unusable_password`` + zaproszenie w skrzynce nadawczej. Obie ścieżki
+zapisują tę samą rezerwację z wyceną i potwierdzeniem e-mail w jednej
+transakcji, na testowej bazie z ``--namesakes`` gośćmi o tym samym nazwisku.
+
+Uruchomienie (z katalogu repozytorium):
+    python benchmarks/guest_booking.py --bookings 50 --namesakes 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from core import accounts, notifications  # noqa: E402
+from core.models import GuestProfile, Reservation, Room, compute_reservation_price  # noqa: E402
+
+
+def legacy_guest(request, name, surname, email, phone):
+    base = accounts.username_base(name, surname, email)
+    username, counter = base, 1
+    while User.objects.filter(username=username).exists():
+        username = f"{base}{counter}"
+        counter += 1
+    user = User.objects.create_user(username=username, email=email, password=phone or 'hotel123')
+    user.first_name = name
+    user.last_name = surname
+    user.save()
+    return GuestProfile.objects.create(user=user, phone_number=phone)
+
+
+def new_guest(request, name, surname, email, phone):
+    guest = accounts.create_guest(name, surname, email=email, phone=phone)
+    accounts.send_invite(request, guest.user)
+    return guest
+
+
+def book(create_guest, request, room, index):
+    check_in = date.today() + timedelta(days=index * 3)
+    with transaction.atomic():
+        guest = create_guest(request, 'Jan', 'Kowalski', 'jan.kowalski@example.com', '+48 600 000 000')
+        reservation = Reservation(
+            guest=guest, room=room, room_type=room.room_type,
+            check_in=check_in, check_out=check_in + timedelta(days=2), status='confirmed',
+        )
+        reservation.total_price = compute_reservation_price(reservation)
+        reservation.save()
+        notifications.reservation_confirmation(reservation)
+
+
+def measure(label, create_guest, request, room, bookings):
+    timings = []
+    for index in range(bookings):
+        started = time.perf_counter()
+        book(create_guest, request, room, index)
+        timings.append((time.perf_counter() - started) * 1000)
+    Reservation.objects.all().delete()
+    timings.sort()
+    print(f"{label:<8} mediana {statistics.median(timings):8.1f} ms   "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:8.1f} ms   suma {sum(timings) / 1000:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=50)
+    parser.add_argument('--namesakes', type=int, default=30, help="Istniejący goście 'jan.kowalski', 'jan.kowalski1'...")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        User.objects.bulk_create(
+            [User(username='jan.kowalski' + (str(i) if i else ''), password='!') for i in range(args.namesakes)]
+        )
+        room = Room.objects.create(number='B101', price=200)
+        request = RequestFactory().post('/employee/reservations/create/')
+        print(f"Rezerwacje dla nowych gości: {args.bookings}, istniejących imienników: {args.namesakes}")
+        measure('before', legacy_guest, request, room, args.bookings)
+        measure('after', new_guest, request, room, args.bookings)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark generowania PDF: dotychczasowy kod vs renderer z core.pdf.
+
+Warianty:
+* "legacy" - jak wcześniejsze widoki: nowy canvas.Canvas na dokument,
+  Helvetica, ręczne współrzędne i clean_text z 18 wywołaniami str.replace,
+* "naive" - ten sam kod co legacy, ale z czcionką Unicode wczytywaną przy
+  każdym dokumencie (najprostszy sposób na polskie znaki w starych widokach),
+* "cold" - nowy PdfRenderer na każdy dokument (style i szablony budowane
+  za każdym razem; czcionka i tak rejestrowana tylko raz na proces),
+* "warm" - jeden rozgrzany renderer z get_renderer() dla wszystkich dokumentów.
+
+Uruchomienie (z katalogu repozytorium, wymaga reportlab):
+    python benchmarks/pdf_render.py --documents 300
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import pdf  # noqa: E402
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+from reportlab.pdfbase.ttfonts import TTFont  # noqa: E402
+
+INVOICE = {
+    'id': 1234,
+    'issued': '2026-05-14',
+    'guest_first_name': 'Łucja',
+    'guest_last_name': 'Źdźbło-Wąsowska',
+    'guest_email': 'lucja@example.com',
+    'room_number': '204',
+    'room_type': 'Dwuosobowy',
+    'check_in': '2026-05-10',
+    'check_out': '2026-05-14',
+    'number_of_guests': 2,
+    'status': 'Zakończona',
+    'payment_method': 'Gotówka',
+    'total_price': '1240.00',
+    'amount_paid': '1240.00',
+    'balance_due': '0.00',
+    'payments': [
+        {'id': 1, 'date': '2026-05-10', 'amount': '400.00', 'method': 'Karta', 'status': 'Zrealizowana'},
+        {'id': 2, 'date': '2026-05-14', 'amount': '840.00', 'method': 'Gotówka', 'status': 'Zrealizowana'},
+    ],
+}
+
+REPORT = {
+    'month': '05/2026',
+    'generated': '2026-05-31',
+    'monthly_revenue': '48210.00',
+    'occupancy_rate': 71.4,
+    'occupied_rooms': 25,
+    'total_rooms': 35,
+}
+
+
+def legacy_clean_text(text):
+    replacements = {
+        'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n', 'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z',
+        'Ą': 'A', 'Ć': 'C', 'Ę': 'E', 'Ł': 'L', 'Ń': 'N', 'Ó': 'O', 'Ś': 'S', 'Ź': 'Z', 'Ż': 'Z'
+    }
+    if not text:
+        return ""
+    text = str(text)
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+    return text
+
+
+def legacy_invoice(data, font="Helvetica", font_bold="Helvetica-Bold", clean=legacy_clean_text):
+    buffer = io.BytesIO()
+    p = pdf.canvas.Canvas(buffer, pagesize=pdf.A4)
+    width, height = pdf.A4
+    p.setFont(font_bold, 16)
+    p.drawString(50, height - 50, clean(f"Faktura / Rachunek #{data['id']}"))
+    p.setFont(font, 12)
+    p.drawString(50, height - 80, clean(f"Data: {data['issued']}"))
+    p.drawString(50, height - 100, "Hotel XYZ")
+    p.drawString(50, height - 140, "Nabywca:")
+    p.drawString(50, height - 155, clean(f"{data['guest_first_name']} {data['guest_last_name']}"))
+    p.drawString(50, height - 170, clean(data['guest_email']))
+    p.drawString(50, height - 210, "Szczegoly rezerwacji:")
+    p.drawString(50, height - 230, clean(f"Pokoj: {data['room_number']} ({data['room_type']})"))
+    p.drawString(50, height - 250, clean(f"Termin: {data['check_in']} - {data['check_out']}"))
+    p.drawString(50, height - 270, clean(f"Liczba gosci: {data['number_of_guests']}"))
+    p.drawString(50, height - 310, clean(f"Status: {data['status']}"))
+    p.drawString(50, height - 330, clean(f"Metoda platnosci: {data['payment_method']}"))
+    p.setFont(font_bold, 14)
+    p.drawString(50, height - 370, clean(f"Razem: {data['total_price']} PLN"))
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def legacy_report(data, font="Helvetica", font_bold="Helvetica-Bold", clean=legacy_clean_text):
+    buffer = io.BytesIO()
+    p = pdf.canvas.Canvas(buffer, pagesize=pdf.A4)
+    width, height = pdf.A4
+    p.setFont(font_bold, 18)
+    p.drawString(50, height - 50, clean(f"Raport Managerski - {data['month']}"))
+    p.setFont(font, 12)
+    p.drawString(50, height - 80, clean(f"Wygenerowano: {data['generated']}"))
+    p.drawString(50, height - 120, clean(f"Przychod (miesiac): {data['monthly_revenue']} PLN"))
+    p.drawString(50, height - 140, clean(f"Oblozenie (teraz): {data['occupancy_rate']}%"))
+    p.drawString(50, height - 160, clean(f"Zajete pokoje: {data['occupied_rooms']} / {data['total_rooms']}"))
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def naive_fonts():
+    regular, bold = pdf.FONT_CANDIDATES[0]
+    pdfmetrics.registerFont(TTFont('NaiveSans', regular))
+    pdfmetrics.registerFont(TTFont('NaiveSans-Bold', bold))
+    return 'NaiveSans', 'NaiveSans-Bold'
+
+
+def naive_unicode_invoice(data):
+    return legacy_invoice(data, *naive_fonts(), clean=str)
+
+
+def naive_unicode_report(data):
+    return legacy_report(data, *naive_fonts(), clean=str)
+
+
+VARIANTS = {
+    'legacy': (legacy_invoice, legacy_report),
+    'naive': (naive_unicode_invoice, naive_unicode_report),
+    'cold': (lambda d: pdf.PdfRenderer().render_invoice(d), lambda d: pdf.PdfRenderer().render_report(d)),
+    'warm': (pdf.render_invoice, pdf.render_report),
+}
+
+
+def measure(func, data, documents):
+    started = time.perf_counter()
+    size = 0
+    for _ in range(documents):
+        size += len(func(data))
+    elapsed = time.perf_counter() - started
+    return documents / elapsed, size / documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=300, help="Dokumentów na wariant")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Procesy w trybie wsadowym")
+    args = parser.parse_args()
+
+    if not pdf.available():
+        sys.exit("Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
+
+    started = time.perf_counter()
+    font, _, unicode = pdf.register_fonts()
+    print(f"Rejestracja czcionki {font} (unicode={unicode}): {(time.perf_counter() - started) * 1000:.1f} ms, raz na proces")
+
+    print(f"{'wariant':<10}{'faktury/s':>12}{'raporty/s':>12}{'faktura [kB]':>14}")
+    for name, (invoice, report) in VARIANTS.items():
+        invoice(INVOICE)  # rozgrzanie
+        invoices_per_s, invoice_size = measure(invoice, INVOICE, args.documents)
+        reports_per_s, _ = measure(report, REPORT, args.documents)
+        print(f"{name:<10}{invoices_per_s:>12.0f}{reports_per_s:>12.0f}{invoice_size / 1024:>14.1f}")
+
+    # Tryb wsadowy jak w core.invoices.month_invoices: pula procesów z rozgrzanym rendererem
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=pdf.warm) as pool:
+        list(pool.map(pdf.render_invoice, [INVOICE] * args.workers))
+        started = time.perf_counter()
+        list(pool.map(pdf.render_invoice, [INVOICE] * args.documents, chunksize=4))
+        elapsed = time.perf_counter() - started
+    print(f"pula {args.workers} procesów: {args.documents / elapsed:.0f} faktur/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark wyszukiwania pokoi dla grupy: wyceny liczone od nowa vs zapamiętane (core.pricing).
+
+"before" czyści przed każdym wyszukaniem LRU wycen i cache Django - każda
+wycena pokoju to jak dawniej zapytania o sezony i ceny sezonowe. "after"
+powtarza to samo wyszukanie z ciepłym cache, jak przy wielu gościach
+sprawdzających popularny termin. Testowa baza z ``--rooms`` pokojami
+i ``--seasons`` sezonami w zakresie pobytu.
+
+Uruchomienie (z katalogu repozytorium):
+    python benchmarks/price_quotes.py --searches 50 --rooms 60
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from core import availability, pricing  # noqa: E402
+from core.models import Room, Season, SeasonPrice  # noqa: E402
+
+
+def measure(label, searches, check_in, check_out, cold):
+    timings = []
+    for _ in range(searches):
+        if cold:
+            cache.clear()
+            pricing.clear()
+        started = time.perf_counter()
+        availability.search_groups(check_in, check_out, guests=4)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"{label:<8} mediana {statistics.median(timings):8.1f} ms   "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:8.1f} ms   suma {sum(timings) / 1000:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--rooms', type=int, default=60)
+    parser.add_argument('--seasons', type=int, default=4)
+    parser.add_argument('--nights', type=int, default=7)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        types = [code for code, _ in Room.TYPE_CHOICES]
+        Room.objects.bulk_create([
+            Room(number=f"P{i:03d}", room_type=types[i % len(types)], capacity=1 + i % 4, price=150 + (i % 7) * 25)
+            for i in range(args.rooms)
+        ])
+        check_in = date.today() + timedelta(days=60)
+        check_out = check_in + timedelta(days=args.nights)
+        for i in range(args.seasons):
+            season = Season.objects.create(
+                name=f"Sezon {i}", start_date=check_in + timedelta(days=i), end_date=check_in + timedelta(days=i + 1),
+            )
+            SeasonPrice.objects.bulk_create([
+                SeasonPrice(season=season, room_type=code, price_multiplier=Decimal('1.20')) for code in types
+            ])
+        print(f"Wyszukiwania: {args.searches}, pokoi: {args.rooms}, sezonów: {args.seasons}, nocy: {args.nights}")
+        measure('before', args.searches, check_in, check_out, cold=True)
+        measure('after', args.searches, check_in, check_out, cold=False)
+        print(f"Liczniki wycen: {pricing.stats()}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
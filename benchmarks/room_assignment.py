@@ -0,0 +1,75 @@
+"""
+Benchmark optymalizatora przydziału pokoi (core.assignment.plan).
+
+Generuje rok rezerwacji dla jednego typu pokoju przydzielanych jak dotąd
+(pierwszy wolny pokój w chwili rezerwacji, w losowej kolejności zakładania),
+a następnie układa je od nowa i porównuje rozdrobnienie grafiku oraz czas.
+
+Uruchomienie (z katalogu repozytorium):
+    python benchmarks/room_assignment.py --rooms 300 --days 365
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from core import assignment  # noqa: E402
+
+
+def generate(rooms, days, occupancy, seed):
+    """Rezerwacje przydzielone "pierwszy wolny pokój" w kolejności zakładania."""
+    rng = random.Random(seed)
+    schedules = {room: assignment._Schedule() for room in range(rooms)}
+    stays = []
+    target = int(rooms * days * occupancy)
+    booked = attempts = 0
+    while booked < target and attempts < target * 4:
+        attempts += 1
+        nights = rng.choice([1, 1, 2, 2, 2, 3, 3, 4, 5, 7, 10, 14])
+        start = rng.randrange(0, days - nights)
+        end = start + nights
+        room = next((r for r in range(rooms) if schedules[r].gaps_around(start, end) is not None), None)
+        if room is None:
+            continue
+        schedules[room].add(start, end)
+        stays.append((len(stays) + 1, room, start, end))
+        booked += nights
+    return stays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=300)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--occupancy', type=float, default=0.75, help="Docelowe obłożenie (0-1)")
+    parser.add_argument('--pinned', type=float, default=0.05, help="Odsetek przypiętych rezerwacji")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    stays = generate(args.rooms, args.days, args.occupancy, args.seed)
+    rng = random.Random(args.seed)
+    fixed = [s for s in stays if rng.random() < args.pinned]
+    fixed_ids = {s[0] for s in fixed}
+    movable = [s for s in stays if s[0] not in fixed_ids]
+
+    started = time.perf_counter()
+    result = assignment.plan(range(args.rooms), fixed, movable, 0, args.days)
+    elapsed = time.perf_counter() - started
+
+    moved = sum(1 for s in movable if result.assignments.get(s[0], s[1]) != s[1])
+    print(f"{len(stays)} rezerwacji ({len(fixed)} przypiętych), {args.rooms} pokoi, {args.days} dni")
+    print(f"czas planowania: {elapsed:.2f} s, przeniesione: {moved}, bez miejsca: {len(result.unplaced)}")
+    for key in ('short_gaps', 'short_gap_nights', 'longest_free_block'):
+        print(f"{key:<20}{result.before[key]:>10}{result.after[key]:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark równoległych zapisów do SQLite: ustawienia domyślne vs profil z config.settings.
+
+Każdy wątek symuluje rezerwację: sprawdza kolizję terminów i wstawia wiersz
+w jednej transakcji, a w tle działają czytelnicy (tablice, raporty).
+Profil "default" to dotychczasowe ustawienia Django i sqlite3: tryb
+rollback journal, domyślny 5-sekundowy busy timeout i transakcje DEFERRED
+(zwykłe BEGIN). Profil "tuned" to PRAGMY z SQLITE_INIT_COMMAND
+i BEGIN IMMEDIATE.
+
+Uruchomienie (z katalogu repozytorium):
+    python benchmarks/sqlite_concurrent_writes.py --writers 8 --bookings 200
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SQLITE_INIT_COMMAND, SQLITE_BUSY_TIMEOUT_MS  # noqa: E402
+
+PROFILES = {
+    # Domyślny timeout modułu sqlite3 (i Django bez OPTIONS['timeout']) to 5 s
+    'default': {'pragmas': [], 'begin': 'BEGIN', 'timeout': 5},
+    'tuned': {
+        'pragmas': [p for p in SQLITE_INIT_COMMAND.split(';') if p.strip()],
+        'begin': 'BEGIN IMMEDIATE',
+        'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+    },
+}
+
+SCHEMA = """
+CREATE TABLE reservation (
+    id INTEGER PRIMARY KEY,
+    room_id INTEGER NOT NULL,
+    check_in INTEGER NOT NULL,
+    check_out INTEGER NOT NULL,
+    notes TEXT
+);
+CREATE INDEX reservation_room ON reservation(room_id, check_in);
+"""
+
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+    for pragma in profile['pragmas']:
+        conn.execute(pragma)
+    return conn
+
+
+def writer(path, profile, bookings, rooms, stats, lock):
+    conn = connect(path, profile)
+    done = errors = 0
+    for _ in range(bookings):
+        room = random.randrange(rooms)
+        check_in = random.randrange(365)
+        check_out = check_in + random.randint(1, 7)
+        try:
+            conn.execute(profile['begin'])
+            collision = conn.execute(
+                "SELECT 1 FROM reservation WHERE room_id=? AND check_in<? AND check_out>? LIMIT 1",
+                (room, check_out, check_in),
+            ).fetchone()
+            if not collision:
+                conn.execute(
+                    "INSERT INTO reservation(room_id, check_in, check_out, notes) VALUES (?, ?, ?, ?)",
+                    (room, check_in, check_out, 'x' * 200),
+                )
+            conn.execute("COMMIT")
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    with lock:
+        stats['done'] += done
+        stats['errors'] += errors
+
+
+def reader(path, profile, stop):
+    conn = connect(path, profile)
+    while not stop.is_set():
+        try:
+            conn.execute("SELECT room_id, COUNT(*) FROM reservation GROUP BY room_id").fetchall()
+        except sqlite3.OperationalError:
+            pass
+    conn.close()
+
+
+def run(profile_name, writers, bookings, readers, rooms):
+    profile = PROFILES[profile_name]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        setup = connect(path, profile)
+        setup.executescript(SCHEMA)
+        setup.close()
+
+        stats = {'done': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+        reader_threads = [threading.Thread(target=reader, args=(path, profile, stop)) for _ in range(readers)]
+        writer_threads = [
+            threading.Thread(target=writer, args=(path, profile, bookings, rooms, stats, lock))
+            for _ in range(writers)
+        ]
+        for t in reader_threads:
+            t.start()
+        started = time.perf_counter()
+        for t in writer_threads:
+            t.start()
+        for t in writer_threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for t in reader_threads:
+            t.join()
+
+    return {
+        'profile': profile_name,
+        'committed': stats['done'],
+        'lock_errors': stats['errors'],
+        'seconds': elapsed,
+        'tx_per_s': stats['done'] / elapsed if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--bookings', type=int, default=200, help="Transakcje na wątek piszący")
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--rooms', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'profil':<10}{'zatwierdzone':>14}{'błędy blokad':>14}{'czas [s]':>10}{'tx/s':>10}")
+    for name in PROFILES:
+        result = run(name, args.writers, args.bookings, args.readers, args.rooms)
+        print(f"{result['profile']:<10}{result['committed']:>14}{result['lock_errors']:>14}"
+              f"{result['seconds']:>10.2f}{result['tx_per_s']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
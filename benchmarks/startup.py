@@ -0,0 +1,74 @@
+"""
+Benchmark startu procesu: ``django.setup()`` + rozwiązanie adresów URL i pamięć RSS workera.
+
+Każdy pomiar to świeży proces Pythona (zimny start, jak nowy worker przy
+autoskalowaniu). "before" importuje reportlab razem z widokami - tak jak
+dawny moduł core.views przez core.pdf; "after" to bieżący kod, w którym
+reportlab ładuje się dopiero przy pierwszym PDF-ie. Mierzone: czas
+``django.setup()``, czas załadowania konfiguracji URL (import widoków)
+i rozwiązania kilku adresów, maksymalny RSS oraz liczba modułów.
+
+Uruchomienie (z katalogu repozytorium):
+    python benchmarks/startup.py --runs 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+if {eager!r}:
+    import reportlab.pdfgen.canvas, reportlab.platypus, reportlab.lib.styles, reportlab.pdfbase.ttfonts
+from django.urls import resolve
+for path in ('/', '/employee/dashboard/', '/guest/reservations/', '/api/rooms-availability/'):
+    resolve(path)
+urls_done = time.perf_counter()
+print(json.dumps({{
+    'setup': (setup_done - started) * 1000,
+    'urls': (urls_done - setup_done) * 1000,
+    'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules),
+}}))
+'''
+
+
+def run(eager):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(root=ROOT, eager=eager)],
+        check=True, capture_output=True, text=True, cwd=ROOT,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(label, eager, runs):
+    samples = [run(eager) for _ in range(runs)]
+    median = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+    print(f"{label:<8} setup {median['setup']:7.1f} ms   URL-e {median['urls']:7.1f} ms   "
+          f"razem {median['setup'] + median['urls']:7.1f} ms   RSS {median['rss']:6.1f} MB   "
+          f"modułów {median['modules']:5.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15, help="Świeżych procesów na wariant (mediana)")
+    args = parser.parse_args()
+
+    run(False)  # rozgrzanie pamięci podręcznej systemu plików i plików .pyc
+    print(f"Procesów na wariant: {args.runs}")
+    measure('before', True, args.runs)
+    measure('after', False, args.runs)
+
+
+if __name__ == '__main__':
+    main()
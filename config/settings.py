@@ -10,22 +10,45 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def env_list(name, default=()):
+    value = os.environ.get(name)
+    if not value:
+        return list(default)
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-i!)p*tamz^ur##(cpbx4tb2h@a@=*#%%e7*l*3bxudsig7t&1*'
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-i!)p*tamz^ur##(cpbx4tb2h@a@=*#%%e7*l*3bxudsig7t&1*',
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', True)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS')
 
 
 # Application definition
@@ -46,6 +69,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.replica.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -72,14 +96,74 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# Domyślnie SQLite w trybie WAL: czytelnicy nie blokują piszącego, a zapisy
+# startują od BEGIN IMMEDIATE i czekają na blokadę (busy_timeout) zamiast
+# od razu zgłaszać "database is locked". DJANGO_DB_ENGINE=postgresql włącza
+# konfigurację PostgreSQL z parametrami ze zmiennych środowiskowych.
+
+SQLITE_BUSY_TIMEOUT_MS = env_int('DJANGO_SQLITE_BUSY_TIMEOUT_MS', 5000)
+
+SQLITE_INIT_COMMAND = ';'.join([
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA mmap_size=134217728',
+])
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'hms'),
+            'USER': os.environ.get('DJANGO_DB_USER', 'hms'),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            'CONN_MAX_AGE': env_int('DJANGO_CONN_MAX_AGE', 0),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': env_int('DJANGO_CONN_MAX_AGE', 0),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': SQLITE_INIT_COMMAND,
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    }
+
+
+# Replika do odczytu (core.replica): raporty, eksporty, kanały iCal i API
+# dostępności czytają z aliasu "replica", a sesja po zapisie przez
+# REPLICA_PIN_SECONDS czyta z bazy głównej. Bez DJANGO_DB_REPLICA_NAME
+# (SQLite - plik odświeżany przez manage.py sync_replica) ani
+# DJANGO_DB_REPLICA_HOST (PostgreSQL) replika to ta sama baza, a routing
+# jest wyłączony. W testach alias jest lustrem bazy testowej.
 
+DB_REPLICA_NAME = os.environ.get('DJANGO_DB_REPLICA_NAME', '')
+DB_REPLICA_HOST = os.environ.get('DJANGO_DB_REPLICA_HOST', '')
+
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+if DB_REPLICA_NAME:
+    DATABASES['replica']['NAME'] = DB_REPLICA_NAME
+if DB_REPLICA_HOST:
+    DATABASES['replica']['HOST'] = DB_REPLICA_HOST
+
+DATABASE_ROUTERS = ['core.replica.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+REPLICA_READS = env_bool('DJANGO_DB_REPLICA_READS', bool(DB_REPLICA_NAME or DB_REPLICA_HOST))
+REPLICA_PIN_SECONDS = env_int('DJANGO_DB_REPLICA_PIN_SECONDS', 15)
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -124,3 +208,109 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
+
+
+# Live updates (Server-Sent Events)
+# InProcessBroker wystarcza dla jednego procesu ASGI; przy wielu workerach
+# SpoolBroker rozsyła zdarzenia przez wspólny plik.
+
+LIVE_BROKER = 'core.live.InProcessBroker'
+LIVE_SPOOL_PATH = BASE_DIR / 'var' / 'live_events.jsonl'
+
+
+# Invoices
+# Wyrenderowane faktury PDF (po jednym pliku na wersję rezerwacji) oraz liczba
+# procesów renderujących w trybie wsadowym (domyślnie liczba rdzeni).
+
+INVOICE_CACHE_DIR = os.environ.get('DJANGO_INVOICE_CACHE_DIR', BASE_DIR / 'var' / 'invoices')
+INVOICE_RENDER_WORKERS = env_int('DJANGO_INVOICE_RENDER_WORKERS', os.cpu_count() or 1)
+
+# Horyzont tabeli stawek dziennych (NightlyRate), ok. 18 miesięcy
+
+NIGHTLY_RATE_HORIZON_DAYS = env_int('DJANGO_NIGHTLY_RATE_HORIZON_DAYS', 548)
+
+# Czcionka TTF z polskimi znakami dla PDF-ów; bez ustawienia core.pdf szuka
+# DejaVu Sans w typowych lokalizacjach systemowych.
+PDF_FONT_PATH = os.environ.get('DJANGO_PDF_FONT_PATH') or None
+PDF_FONT_BOLD_PATH = os.environ.get('DJANGO_PDF_FONT_BOLD_PATH') or None
+
+# Kolejka zadań (core.taskqueue): `manage.py run_tasks` wykonuje zadania z bazy
+# w puli wątków i zakłada zadania okresowe według TASK_SCHEDULE (składnia cron,
+# strefa TIME_ZONE). Zadanie przejęte dłużej niż TASK_LOCK_TIMEOUT sekund
+# wraca do kolejki (worker uznany za przerwany).
+
+TASK_WORKERS = env_int('DJANGO_TASK_WORKERS', 4)
+TASK_POLL_INTERVAL = env_int('DJANGO_TASK_POLL_INTERVAL', 2)
+TASK_LOCK_TIMEOUT = env_int('DJANGO_TASK_LOCK_TIMEOUT', 600)
+TASK_SCHEDULE = {
+    'night_audit': {'task': 'core.tasks.night_audit', 'cron': '30 2 * * *'},
+    'rebuild_nightly_rates': {'task': 'core.tasks.rebuild_nightly_rates', 'cron': '0 3 * * *'},
+    'rebuild_inventory': {'task': 'core.tasks.rebuild_inventory', 'cron': '15 3 * * *'},
+    'purge_tasks': {'task': 'core.tasks.purge_tasks', 'cron': '45 3 * * 0'},
+    'send_outbox': {'task': 'core.tasks.send_outbox', 'cron': '*/5 * * * *'},
+    'settle_payments': {'task': 'core.tasks.settle_payments', 'cron': '* * * * *'},
+    'archive_reservations': {'task': 'core.tasks.archive_reservations', 'cron': '30 4 * * 0'},
+}
+
+# Poczta: powiadomienia z core.notifications wysyła w tle zadanie send_outbox
+# (paczki po OUTBOX_BATCH_SIZE, przebieg najwyżej OUTBOX_SEND_DEADLINE sekund).
+# Domyślnie wiadomości trafiają do plików w EMAIL_FILE_PATH; produkcyjnie np.
+# DJANGO_EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend.
+
+HOTEL_NAME = os.environ.get('DJANGO_HOTEL_NAME', 'Hotel XYZ')
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('DJANGO_EMAIL_FILE_PATH', BASE_DIR / 'var' / 'mail')
+EMAIL_HOST = os.environ.get('DJANGO_EMAIL_HOST', 'localhost')
+EMAIL_PORT = env_int('DJANGO_EMAIL_PORT', 25)
+EMAIL_HOST_USER = os.environ.get('DJANGO_EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('DJANGO_EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = env_bool('DJANGO_EMAIL_USE_TLS', False)
+EMAIL_TIMEOUT = env_int('DJANGO_EMAIL_TIMEOUT', 10)
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'rezerwacje@hotel.example')
+OUTBOX_BATCH_SIZE = env_int('DJANGO_OUTBOX_BATCH_SIZE', 100)
+OUTBOX_SEND_DEADLINE = env_int('DJANGO_OUTBOX_SEND_DEADLINE', 60)
+
+# Płatności online (core.payments): widok zakłada płatność oczekującą, a zadanie
+# settle_payments rozlicza je paczkami po PAYMENT_BATCH_SIZE przez bramkę
+# PAYMENT_GATEWAY (ścieżka klasy; opcje konstruktora w PAYMENT_GATEWAY_OPTIONS).
+# Błąd przejściowy bramki ponawia płatność, najwyżej PAYMENT_MAX_ATTEMPTS razy.
+
+PAYMENT_GATEWAY = os.environ.get('DJANGO_PAYMENT_GATEWAY', 'core.payments.FakeGateway')
+PAYMENT_GATEWAY_OPTIONS = {}
+PAYMENT_BATCH_SIZE = env_int('DJANGO_PAYMENT_BATCH_SIZE', 50)
+PAYMENT_MAX_ATTEMPTS = env_int('DJANGO_PAYMENT_MAX_ATTEMPTS', 5)
+PAYMENT_LOCK_TIMEOUT = env_int('DJANGO_PAYMENT_LOCK_TIMEOUT', 300)
+
+# Dziennik zmian (core.changes): /api/changes/?since=<seq> dla systemów
+# zewnętrznych (tokeny Bearer z CHANGE_FEED_TOKENS albo zalogowany menedżer)
+# i plik JSON Lines z manage.py export_changes. Numery zdarzeń nadawane są
+# dopiero po zatwierdzeniu transakcji, więc odbiorca niczego nie przeskoczy.
+
+CHANGE_FEED_TOKENS = env_list('DJANGO_CHANGE_FEED_TOKENS', [])
+CHANGE_SINK_PATH = os.environ.get('DJANGO_CHANGE_SINK_PATH', BASE_DIR / 'var' / 'changes.jsonl')
+
+# Kanały iCal dostępności pokoi (core.calendars): adresy z tokenem w panelu
+# administracyjnym (edycja pokoju), zakres od dziś do CALENDAR_HORIZON_DAYS dni.
+
+CALENDAR_HORIZON_DAYS = env_int('DJANGO_CALENDAR_HORIZON_DAYS', 365)
+CALENDAR_UID_DOMAIN = os.environ.get('DJANGO_CALENDAR_UID_DOMAIN', 'hotel.example')
+
+# Archiwum rezerwacji (core.archive): zakończone i anulowane rezerwacje
+# z wyjazdem starszym niż ARCHIVE_AFTER_DAYS dni przechodzą paczkami po
+# ARCHIVE_BATCH_SIZE do tabel archiwalnych (zadanie archive_reservations).
+
+ARCHIVE_AFTER_DAYS = env_int('DJANGO_ARCHIVE_AFTER_DAYS', 730)
+ARCHIVE_BATCH_SIZE = env_int('DJANGO_ARCHIVE_BATCH_SIZE', 500)
+
+# Cache: domyślnie w pamięci procesu; przy wielu workerach wspólny, np.
+# DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# i DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379. Wyceny pobytów (core.pricing)
+# trzymają też do PRICE_QUOTE_LRU_SIZE pozycji w pamięci każdego procesu.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+PRICE_QUOTE_LRU_SIZE = env_int('DJANGO_PRICE_QUOTE_LRU_SIZE', 4096)
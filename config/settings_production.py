@@ -0,0 +1,34 @@
+"""
+Produkcyjny profil ustawień.
+
+Uruchomienie: DJANGO_SETTINGS_MODULE=config.settings_production
+Wymaga DJANGO_SECRET_KEY i DJANGO_ALLOWED_HOSTS. Baza jak w config.settings
+(SQLite w trybie WAL lub PostgreSQL przez DJANGO_DB_ENGINE=postgresql),
+ale z trwałymi połączeniami i wyłączonym DEBUG, który trzyma w pamięci
+każde wykonane zapytanie.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, env_bool, env_int, env_list
+
+DEBUG = env_bool('DJANGO_DEBUG', False)
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', '')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Ustaw DJANGO_SECRET_KEY dla profilu produkcyjnego.")
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS')
+CSRF_TRUSTED_ORIGINS = env_list('DJANGO_CSRF_TRUSTED_ORIGINS')
+
+# Trwałe połączenia - bez ponownego otwierania pliku/połączenia TCP i
+# wykonywania PRAGM przy każdym żądaniu
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = env_int('DJANGO_CONN_MAX_AGE', 600)
+    database['CONN_HEALTH_CHECKS'] = True
+
+SESSION_COOKIE_SECURE = env_bool('DJANGO_SECURE_COOKIES', True)
+CSRF_COOKIE_SECURE = env_bool('DJANGO_SECURE_COOKIES', True)
+SECURE_CONTENT_TYPE_NOSNIFF = True
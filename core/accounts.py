@@ -0,0 +1,77 @@
+"""Konta gości zakładane przy rezerwacji (walk-in w recepcji, rezerwacja bez logowania).
+
+Takie konto nie dostaje hasła (``set_unusable_password``) - haszowanie PBKDF2
+to setki milisekund CPU przy każdej rezerwacji, a hasłem był zwykle numer
+telefonu. Gość z adresem e-mail dostaje przez skrzynkę nadawczą link
+``claim_account``, pod którym sam ustawia hasło. Link to jednorazowy token
+(jak przy resetowaniu hasła): traci ważność po ustawieniu hasła albo po
+``PASSWORD_RESET_TIMEOUT``.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from . import notifications
+from .models import GuestProfile
+
+
+def username_base(first_name, last_name, email=''):
+    base = email.split('@')[0] if email else f"{first_name}.{last_name}".lower()
+    return re.sub(r'[^a-zA-Z0-9@.+-_]', '', base) or 'guest'
+
+
+def next_free_username(base):
+    """Pierwsza wolna nazwa z ciągu ``base``, ``base1``, ``base2``... (jedno zapytanie).
+
+    Prefiks korzysta z indeksu na nazwie użytkownika (LIKE 'base%').
+    """
+    taken = set(User.objects.filter(username__startswith=base).values_list('username', flat=True))
+    username, counter = base, 1
+    while username in taken:
+        username = f"{base}{counter}"
+        counter += 1
+    return username
+
+
+def create_guest(first_name, last_name, email='', phone='', username=None, password=None):
+    """Zakłada użytkownika i profil gościa. Bez ``password`` konto czeka na przejęcie."""
+    user = User(
+        username=username or next_free_username(username_base(first_name, last_name, email)),
+        email=email or '',
+        first_name=first_name or '',
+        last_name=last_name or '',
+    )
+    if password:
+        user.set_password(password)
+    else:
+        user.set_unusable_password()
+    user.save()
+    return GuestProfile.objects.create(user=user, phone_number=phone)
+
+
+def claim_url(request, user):
+    uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    return request.build_absolute_uri(reverse('claim_account', args=[uidb64, token]))
+
+
+def send_invite(request, user, reservation=None):
+    """Odkłada e-mail z linkiem do ustawienia hasła (konto bez hasła i z adresem e-mail)."""
+    if not user.email or user.has_usable_password():
+        return None
+    return notifications.account_invite(user, claim_url(request, user), reservation)
+
+
+def user_from_claim(uidb64, token):
+    """Użytkownik z linku ``claim_account`` albo None, gdy link jest nieważny."""
+    try:
+        user = User.objects.get(pk=urlsafe_base64_decode(uidb64).decode())
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        return None
+    if not default_token_generator.check_token(user, token):
+        return None
+    return user
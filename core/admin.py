@@ -1,10 +1,48 @@
 from django.contrib import admin
-from .models import GuestProfile, Room, Reservation, EmployeeProfile, Season, SeasonPrice, Payment
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils.functional import cached_property
+from .models import GuestProfile, Room, Reservation, EmployeeProfile, Season, SeasonPrice, NightlyRate, RoomTypeInventory, Payment, MaintenanceTicket, RevenuePosting, NightAuditRun, Task, PeriodicTask, OutboxMessage, ChangeEvent, ArchivedReservation, ArchivedPayment
+from . import calendars, changes
+from .signals import bulk_room_release
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator dla dużych tabel: bez filtrów liczba wierszy jest szacowana zamiast COUNT(*).
+
+    PostgreSQL - statystyka planera (pg_class.reltuples), SQLite - największy klucz
+    główny. Poniżej ``exact_below`` wierszy i przy filtrach liczy dokładnie.
+    """
+    exact_below = 10000
+
+    def _estimate(self):
+        queryset = self.object_list
+        if getattr(queryset, 'query', None) is None or queryset.query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            return int(row[0]) if row and row[0] > 0 else None
+        return queryset.model._default_manager.using(queryset.db).aggregate(last=Max('pk'))['last']
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate >= self.exact_below:
+            return estimate
+        return super().count
+
 
 @admin.register(GuestProfile)
 class GuestProfileAdmin(admin.ModelAdmin):
-    list_display = ('get_full_name', 'get_email', 'phone_number')
+    list_display = ('get_full_name', 'get_email', 'phone_number', 'stays_count', 'lifetime_revenue', 'last_visit')
+    list_select_related = ('user',)
+    ordering = ('user__last_name', 'user__first_name', 'pk')
     search_fields = ('user__first_name', 'user__last_name', 'user__email', 'phone_number')
+    readonly_fields = GuestProfile.STATS_FIELDS
 
     def get_full_name(self, obj):
         return f"{obj.user.first_name} {obj.user.last_name}"
@@ -20,6 +58,7 @@ class RoomAdmin(admin.ModelAdmin):
     list_filter = ('status', 'room_type')
     list_editable = ('status',)
     search_fields = ('number',)
+    ordering = ('number',)
     fieldsets = (
         ('Informacje podstawowe', {
             'fields': ('number', 'room_type', 'capacity', 'price')
@@ -27,18 +66,35 @@ class RoomAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('status', 'notes') 
         }),
+        ('Kanały iCal', {
+            'fields': ('room_calendar_url', 'room_type_calendar_url'),
+            'description': "Adresy dla channel managerów i OTA - przekazuj tylko partnerom.",
+        }),
     )
+    readonly_fields = ('room_calendar_url', 'room_type_calendar_url')
+
+    @admin.display(description="Kanał pokoju")
+    def room_calendar_url(self, obj):
+        return calendars.room_feed_path(obj) if obj.pk else '-'
+
+    @admin.display(description="Kanał typu pokoju")
+    def room_type_calendar_url(self, obj):
+        return calendars.room_type_feed_path(obj.room_type) if obj.pk else '-'
 
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
-    list_display = ('id', 'guest', 'room', 'check_in', 'check_out', 'status', 'total_price', 'created_at')
-    list_filter = ('status', 'check_in', 'check_out', 'created_at')
+    list_display = ('id', 'guest', 'room', 'room_type', 'check_in', 'check_out', 'status', 'total_price', 'created_at')
+    list_filter = ('status', 'overdue', 'room_type', 'check_in', 'check_out', 'created_at')
     search_fields = ('guest__user__last_name', 'guest__user__email', 'room__number')
+    list_select_related = ('guest__user', 'room')
+    autocomplete_fields = ('guest', 'room')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ('created_at',)
     date_hierarchy = 'check_in'
     fieldsets = (
         ('Rezerwacja', {
-            'fields': ('guest', 'room', 'check_in', 'check_out', 'status', 'notes')
+            'fields': ('guest', 'room', 'room_type', 'room_pinned', 'check_in', 'check_out', 'status', 'notes')
         }),
         ('Płatność', {
             'fields': ('total_price',)
@@ -47,36 +103,31 @@ class ReservationAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
-    
+
     def delete_queryset(self, request, queryset):
-        """Przy masowym usuwaniu rezerwacji - logika zwalniania pokoi"""
-        rooms_to_release = {}
-
-        for reservation in queryset:
-            room = reservation.room
-            if room.status in ['occupied']:
-                active = Reservation.objects.filter(
-                     room=room,
-                     status__in=['pending', 'confirmed', 'checked_in']
-                ).exclude(id=reservation.id)
-
-                if not active.exists():
-                    rooms_to_release[room.id] = room
-
-        queryset.delete()
-
-        for room_id, room in rooms_to_release.items():
-            remaining = Reservation.objects.filter(
-                room_id=room_id,
-                status__in=['pending', 'confirmed', 'checked_in']
-            )
-            if not remaining.exists():
-                Room.objects.filter(id=room_id).update(status='available')
+        """Przy masowym usuwaniu rezerwacji pokoje zwalnia jedno UPDATE po zatwierdzeniu"""
+        with transaction.atomic(using=queryset.db), bulk_room_release(queryset.db):
+            queryset.delete()
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
-    list_display = ('reservation', 'amount', 'payment_date', 'payment_method', 'payment_status')
+    list_display = ('reservation', 'amount', 'payment_date', 'payment_method', 'payment_status', 'attempts')
     list_filter = ('payment_date', 'payment_method', 'payment_status')
+    list_select_related = ('reservation__guest__user',)
+    autocomplete_fields = ('reservation',)
+    readonly_fields = ('idempotency_key', 'attempts', 'next_attempt_at', 'locked_until', 'last_error')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('retry_settlement',)
+
+    @admin.action(description="Ponów rozliczenie płatności online")
+    def retry_settlement(self, request, queryset):
+        from django.utils import timezone
+        count = changes.update_and_record(
+            queryset.filter(payment_method='online', payment_status='failed'),
+            payment_status='pending', attempts=0, next_attempt_at=timezone.now(), locked_until=None,
+        )
+        self.message_user(request, f"Do ponownego rozliczenia: {count}.")
 
 
 class SeasonPriceInline(admin.TabularInline):
@@ -94,13 +145,173 @@ class SeasonAdmin(admin.ModelAdmin):
 class SeasonPriceAdmin(admin.ModelAdmin):
     list_display = ('season', 'room_type', 'price_multiplier')
     list_filter = ('season', 'room_type')
+    list_select_related = ('season',)
+
+@admin.register(NightlyRate)
+class NightlyRateAdmin(admin.ModelAdmin):
+    """Podgląd tabeli wyliczanej z sezonów - edycja przez Season/SeasonPrice."""
+    list_display = ('date', 'room_type', 'multiplier', 'price_from', 'rooms_total')
+    list_filter = ('room_type',)
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(RoomTypeInventory)
+class RoomTypeInventoryAdmin(admin.ModelAdmin):
+    """Podgląd rejestru prowadzonego przez rezerwacje i pokoje - bez ręcznej edycji."""
+    list_display = ('date', 'room_type', 'total', 'booked', 'out_of_order', 'available')
+    list_filter = ('room_type',)
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(RevenuePosting)
+class RevenuePostingAdmin(admin.ModelAdmin):
+    """Księgowania audytu nocnego - tylko do odczytu."""
+    list_display = ('date', 'reservation', 'room', 'room_type', 'amount', 'posted_at')
+    list_filter = ('room_type',)
+    list_select_related = ('reservation__guest__user', 'room')
+    date_hierarchy = 'date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(NightAuditRun)
+class NightAuditRunAdmin(admin.ModelAdmin):
+    list_display = ('audit_date', 'no_shows', 'overdue', 'postings', 'revenue', 'rooms_occupied', 'rooms_released', 'finished_at')
+    date_hierarchy = 'audit_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Podgląd kolejki zadań (core.taskqueue) z ponawianiem nieudanych."""
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_until', 'last_error')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('retry_tasks',)
+
+    @admin.action(description="Ponów wybrane zadania")
+    def retry_tasks(self, request, queryset):
+        from django.utils import timezone
+        count = queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_at=timezone.now(), locked_by='', locked_until=None, finished_at=None,
+        )
+        self.message_user(request, f"Ponownie w kolejce: {count}.")
+
+@admin.register(PeriodicTask)
+class PeriodicTaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'task', 'cron', 'enabled', 'last_run_at', 'next_run_at')
+    list_editable = ('enabled',)
+    readonly_fields = ('last_run_at',)
+
+    def save_model(self, request, obj, form, change):
+        # Zmieniony harmonogram liczy następny termin od nowa
+        if 'cron' in form.changed_data:
+            obj.next_run_at = None
+        super().save_model(request, obj, form, change)
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Skrzynka nadawcza powiadomień - podgląd i ponowienie nieudanych."""
+    list_display = ('id', 'kind', 'recipient', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('kind', 'reservation', 'recipient', 'subject', 'body', 'attempts', 'locked_until', 'last_error', 'created_at', 'sent_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('retry_messages',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Wyślij ponownie")
+    def retry_messages(self, request, queryset):
+        from django.utils import timezone
+        count = queryset.exclude(status='sending').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"Do ponownej wysyłki: {count}.")
 
 @admin.register(EmployeeProfile)
 class EmployeeProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'role', 'phone_number')
     list_filter = ('role',)
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__last_name')
 
+@admin.register(MaintenanceTicket)
+class MaintenanceTicketAdmin(admin.ModelAdmin):
+    list_display = ('id', 'room', 'title', 'source', 'status', 'opened_at', 'closed_at')
+    list_filter = ('status', 'source', 'opened_at')
+    search_fields = ('title', 'room__number')
+    list_select_related = ('room',)
+    readonly_fields = ('opened_at',)
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    """Dziennik zmian - tylko do odczytu (core.changes)."""
+    list_display = ('id', 'seq', 'entity', 'object_id', 'action', 'changed', 'created_at')
+    list_filter = ('entity', 'action')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class ArchivedPaymentInline(admin.TabularInline):
+    model = ArchivedPayment
+    extra = 0
+    can_delete = False
+    fields = ('id', 'amount', 'payment_date', 'payment_method', 'payment_status', 'transaction_id')
+    readonly_fields = fields
+
+
+@admin.register(ArchivedReservation)
+class ArchivedReservationAdmin(admin.ModelAdmin):
+    """Archiwum rezerwacji - tylko do odczytu (core.archive)."""
+    list_display = ('id', 'guest', 'room', 'check_in', 'check_out', 'status', 'total_price', 'archived_at')
+    list_filter = ('status', 'room_type')
+    search_fields = ('id', 'guest__user__username', 'guest__user__last_name', 'room__number')
+    list_select_related = ('guest__user', 'room')
+    inlines = (ArchivedPaymentInline,)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 admin.site.site_header = "Panel Administracyjny Hotelu XYZ"
 admin.site.site_title = "Hotel XYZ Admin"
-admin.site.index_title = "Witamy w panelu zarządzania"
\ No newline at end of file
+admin.site.index_title = "Witamy w panelu zarządzania"
+
@@ -0,0 +1,134 @@
+"""Archiwizacja historycznych rezerwacji - tabele bieżące zostają małe.
+
+Zakończone, anulowane i niezrealizowane (no_show) rezerwacje, których wyjazd
+minął ponad ``ARCHIVE_AFTER_DAYS`` dni temu, przechodzą paczkami
+(``ARCHIVE_BATCH_SIZE``) do ArchivedReservation razem z płatnościami
+i zaksięgowanymi nocami. Każda paczka to jedna transakcja: kopia do archiwum
+i usunięcie z tabel bieżących bez sygnałów - rezerwacja nie znika z historii,
+więc dziennik zmian, rejestr pokoi i kalendarze nie dostają zdarzeń usunięcia.
+Zakończona rezerwacja z nieopłaconym saldem albo płatnością w toku czeka
+w tabelach bieżących; anulowanej i niezrealizowanej saldo nie zatrzymuje.
+
+Raporty czytają obie tabele przez funkcje tego modułu (``history``,
+``revenue``, ``find``), a historia gościa pokazuje też pobyty z archiwum.
+Archiwizację uruchamia zadanie ``core.tasks.archive_reservations`` (według
+TASK_SCHEDULE) albo ``manage.py archive_reservations``.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    ArchivedPayment, ArchivedReservation, ArchivedRevenuePosting, OutboxMessage, Payment,
+    Reservation, RevenuePosting, SearchDocument,
+)
+
+ARCHIVE_STATUSES = ('completed', 'cancelled', 'no_show')
+# Rezerwacje, które się nie odbyły - saldo nie blokuje archiwizacji
+UNSETTLED_STATUSES = ('cancelled', 'no_show')
+
+
+def candidates(cutoff):
+    """Rezerwacje do archiwizacji: wyjazd przed ``cutoff``, rozliczone i bez płatności w toku."""
+    pending = Payment.objects.filter(reservation=OuterRef('pk'), payment_status='pending')
+    return (
+        Reservation.objects
+        .filter(status__in=ARCHIVE_STATUSES, check_out__lt=cutoff)
+        .filter(Q(status__in=UNSETTLED_STATUSES) | Q(balance_due__lte=0))
+        .exclude(Exists(pending))
+    )
+
+
+def default_cutoff():
+    return timezone.localdate() - timedelta(days=getattr(settings, 'ARCHIVE_AFTER_DAYS', 730))
+
+
+def _copy(model, archive_model, queryset, **extra):
+    names = [f.attname for f in archive_model._meta.concrete_fields if f.attname not in extra and hasattr(model, f.attname)]
+    rows = [archive_model(**row, **extra) for row in queryset.values(*names)]
+    archive_model.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _delete(model, column, ids):
+    # Bez Collectora i sygnałów usunięcia - obiekty nie znikają, tylko zmieniają tabelę
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+            f"WHERE {connection.ops.quote_name(column)} IN ({placeholders})",
+            list(ids),
+        )
+
+
+def archive_batch(cutoff=None, batch_size=None):
+    """Przenosi jedną paczkę rezerwacji do archiwum. Zwraca liczbę przeniesionych."""
+    cutoff = cutoff or default_cutoff()
+    batch_size = batch_size or getattr(settings, 'ARCHIVE_BATCH_SIZE', 500)
+    with transaction.atomic():
+        ids = list(
+            candidates(cutoff).select_for_update().order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        now = timezone.now()
+        _copy(Reservation, ArchivedReservation, Reservation.objects.filter(pk__in=ids), archived_at=now)
+        _copy(Payment, ArchivedPayment, Payment.objects.filter(reservation_id__in=ids))
+        _copy(RevenuePosting, ArchivedRevenuePosting, RevenuePosting.objects.filter(reservation_id__in=ids))
+
+        # Wysłane powiadomienia zostają w skrzynce, bez powiązania z rezerwacją
+        OutboxMessage.objects.filter(reservation_id__in=ids).update(reservation=None)
+        SearchDocument.objects.filter(kind='reservation', object_id__in=ids).delete()
+        _delete(RevenuePosting, 'reservation_id', ids)
+        _delete(Payment, 'reservation_id', ids)
+        _delete(Reservation, 'id', ids)
+    return len(ids)
+
+
+def archive(cutoff=None, batch_size=None):
+    """Archiwizuje paczkami wszystkie kwalifikujące się rezerwacje. Zwraca ich liczbę."""
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if not moved:
+            return total
+
+
+# Odczyty z obu tabel
+
+def find(pk):
+    """Rezerwacja bieżąca albo z archiwum (z gościem i pokojem) - None, gdy nie ma żadnej."""
+    for model in (Reservation, ArchivedReservation):
+        reservation = model.objects.select_related('guest__user', 'room').filter(pk=pk).first()
+        if reservation is not None:
+            return reservation
+    return None
+
+
+def history(order_by='-created_at', limit=None, **filters):
+    """Rezerwacje z obu tabel spełniające ``filters``, posortowane po jednym polu.
+
+    Filtry muszą używać pól wspólnych dla obu modeli (np. guest, status,
+    check_out__year). Przy ``limit`` każda tabela oddaje najwyżej tyle wierszy.
+    """
+    field = order_by.lstrip('-')
+    querysets = []
+    for model in (Reservation, ArchivedReservation):
+        queryset = model.objects.filter(**filters).select_related('guest__user', 'room').order_by(order_by, '-pk')
+        querysets.append(queryset[:limit] if limit else queryset)
+    rows = sorted(chain(*querysets), key=lambda r: (getattr(r, field), r.pk), reverse=order_by.startswith('-'))
+    return rows[:limit] if limit else rows
+
+
+def revenue(**filters):
+    """Suma zrealizowanych płatności z obu tabel (filtry na polach płatności)."""
+    total = Decimal('0.00')
+    for model in (Payment, ArchivedPayment):
+        total += model.objects.filter(payment_status='completed', **filters).aggregate(total=Sum('amount'))['total'] or 0
+    return total
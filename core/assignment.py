@@ -0,0 +1,179 @@
+"""Optymalizacja przydziału pokoi w obrębie typu.
+
+Przydział w momencie rezerwacji zostawia w grafiku jedno- i dwudniowe luki,
+których nikt później nie wypełni. ``plan`` układa przyszłe rezerwacje
+(oczekujące i potwierdzone) od nowa metodą best-fit: kolejne pobyty,
+w kolejności przyjazdów, trafiają do pokoju, w którym zostawiają najmniej
+wolnych nocy przed i po sobie, więc puste pokoje zostają puste, a wolne
+okna są możliwie długie. Pobyty trwające (zameldowani) i przypięte
+(``room_pinned``) zostają na swoich miejscach.
+
+``plan`` działa na zwykłych krotkach (bez bazy), ``optimize_room_type``
+wczytuje dane jednego typu i zwraca zmiany do podglądu lub zapisu
+(komenda ``manage.py optimize_room_assignment``).
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Reservation, Room
+
+MOVABLE_STATUSES = ['pending', 'confirmed']
+FIXED_STATUSES = ['checked_in']
+SHORT_GAP_NIGHTS = 2
+
+
+class _Schedule:
+    """Posortowane, rozłączne przedziały [start, koniec) jednego pokoju."""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def gaps_around(self, start, end):
+        """(wolne noce przed, wolne noce po) albo None, jeśli przedział koliduje."""
+        i = bisect_left(self.starts, end)
+        if i and self.ends[i - 1] > start:
+            return None
+        before = self.ends[i - 1] if i else None
+        after = self.starts[i] if i < len(self.starts) else None
+        return before, after
+
+    def add(self, start, end):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+
+@dataclass
+class Plan:
+    assignments: dict = field(default_factory=dict)   # id rezerwacji -> id pokoju
+    unplaced: list = field(default_factory=list)      # rezerwacje bez wolnego pokoju (zostają, gdzie są)
+    before: dict = field(default_factory=dict)
+    after: dict = field(default_factory=dict)
+
+
+def fragmentation(schedules, window_start, window_end, short=SHORT_GAP_NIGHTS):
+    """Miary rozdrobnienia: krótkie luki między pobytami, ich suma i najdłuższe wolne okno."""
+    short_gaps = short_nights = 0
+    longest = 0
+    for schedule in schedules.values():
+        cursor = window_start
+        for start, end in zip(schedule.starts, schedule.ends):
+            gap = _nights(cursor, start)
+            if gap > 0:
+                longest = max(longest, gap)
+                if gap <= short and cursor != window_start:
+                    short_gaps += 1
+                    short_nights += gap
+            cursor = max(cursor, end)
+        longest = max(longest, _nights(cursor, window_end))
+    return {'short_gaps': short_gaps, 'short_gap_nights': short_nights, 'longest_free_block': longest}
+
+
+def _nights(start, end):
+    if isinstance(start, date):
+        return (end - start).days
+    return end - start
+
+
+def _schedules(room_ids, stays):
+    schedules = {room_id: _Schedule() for room_id in room_ids}
+    for _, room_id, start, end in stays:
+        if room_id in schedules:
+            schedules[room_id].add(start, end)
+    return schedules
+
+
+def plan(room_ids, fixed, movable, window_start, window_end):
+    """Układa pobyty ``movable`` w pokojach ``room_ids`` wokół pobytów ``fixed``.
+
+    Pobyty to krotki (id, id_pokoju_lub_None, przyjazd, wyjazd); daty mogą być
+    obiektami date albo liczbami dni. Zwraca Plan z nowym przydziałem i miarami
+    rozdrobnienia grafiku przed i po zmianie.
+    """
+    room_ids = sorted(room_ids)
+    result = Plan()
+    result.before = fragmentation(_schedules(room_ids, list(fixed) + list(movable)), window_start, window_end)
+
+    schedules = _schedules(room_ids, fixed)
+    # Najpierw wcześniejsze przyjazdy, przy remisie dłuższe pobyty
+    order = sorted(movable, key=lambda s: (s[2], -_nights(s[2], s[3]), s[0]))
+    for reservation_id, current_room, start, end in order:
+        best = None
+        for room_id in room_ids:
+            gaps = schedules[room_id].gaps_around(start, end)
+            if gaps is None:
+                continue
+            prev_end, next_start = gaps
+            waste = _nights(prev_end if prev_end is not None else window_start, start)
+            waste += _nights(end, next_start if next_start is not None else window_end)
+            # Pusty pokój to najgorsze dopasowanie - zajmujemy go ostatni
+            key = (waste, room_id != current_room, room_id)
+            if best is None or key < best[0]:
+                best = (key, room_id)
+        if best is None:
+            result.unplaced.append(reservation_id)
+            if current_room in schedules:
+                schedules[current_room].add(start, end)
+            continue
+        room_id = best[1]
+        schedules[room_id].add(start, end)
+        result.assignments[reservation_id] = room_id
+
+    result.after = fragmentation(schedules, window_start, window_end)
+    return result
+
+
+def _is_better(before, after):
+    return (after['short_gaps'], -after['longest_free_block']) < (before['short_gaps'], -before['longest_free_block'])
+
+
+def optimize_room_type(room_type, start=None, apply=False):
+    """Planuje (i opcjonalnie zapisuje) przydział pokoi jednego typu od dnia ``start``.
+
+    Zwraca (plan, lista zmian [(rezerwacja, stary pokój, nowy pokój)], czy zapisano).
+    Zapis następuje tylko wtedy, gdy plan zmniejsza rozdrobnienie.
+    """
+    start = start or timezone.now().date()
+    rooms = {room.pk: room for room in Room.objects.filter(room_type=room_type).exclude(status='maintenance')}
+    reservations = list(
+        Reservation.objects
+        .filter(room_type=room_type, check_out__gt=start, status__in=MOVABLE_STATUSES + FIXED_STATUSES)
+        .select_related('room')
+        .order_by('check_in', 'pk')
+    )
+    fixed, movable = [], []
+    for reservation in reservations:
+        stay = (reservation.pk, reservation.room_id, reservation.check_in, reservation.check_out)
+        is_fixed = (
+            reservation.status in FIXED_STATUSES
+            or reservation.room_pinned
+            or reservation.check_in < start
+        )
+        (fixed if is_fixed else movable).append(stay)
+
+    window_end = max([start] + [r.check_out for r in reservations])
+    result = plan(rooms.keys(), fixed, movable, start, window_end)
+
+    by_id = {r.pk: r for r in reservations}
+    changes = [
+        (by_id[reservation_id], by_id[reservation_id].room, rooms[room_id])
+        for reservation_id, room_id in result.assignments.items()
+        if by_id[reservation_id].room_id != room_id
+    ]
+    changes.sort(key=lambda c: (c[0].check_in, c[0].pk))
+
+    applied = False
+    if apply and changes and _is_better(result.before, result.after):
+        with transaction.atomic():
+            for reservation, _, new_room in changes:
+                reservation.room = new_room
+                reservation.save(update_fields=['room'])
+        applied = True
+    return result, changes, applied
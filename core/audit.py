@@ -0,0 +1,125 @@
+"""Audyt nocny - zamknięcie doby hotelowej.
+
+Każdy krok to jedno zapytanie na zbiorze wierszy (UPDATE z warunkiem albo
+INSERT wielu wierszy), a całość wykonuje się w jednej transakcji:
+
+* oczekujące i potwierdzone rezerwacje z przyjazdem najpóźniej w zamykaną
+  dobę -> ``no_show``,
+* zameldowani po terminie wyjazdu -> flaga ``overdue`` (i zdjęcie jej z pozostałych),
+* przychód za noc dla każdego trwającego pobytu (RevenuePosting),
+* Room.status zgodny z zameldowanymi gośćmi,
+* wiersz podsumowania NightAuditRun.
+
+Zmiany statusów idą przez ``update()``, więc sygnały się nie wykonują -
+rejestr pokoi (core.inventory) jest na końcu przeliczany jednym upsertem,
+a zdarzenia dziennika zmian (core.changes) zapisuje ``update_and_record``.
+Powtórne uruchomienie dla tej samej doby niczego nie dubluje.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from . import calendars, changes, inventory
+from .models import NightAuditRun, Reservation, RevenuePosting, Room
+
+# Rezerwacje, które po terminie przyjazdu bez zameldowania stają się niestawieniem;
+# nieopłacona "oczekująca" nie może blokować pokoju w nieskończoność
+NO_SHOW_STATUSES = ('pending', 'confirmed')
+
+
+def _in_house():
+    return Reservation.objects.filter(room=OuterRef('pk'), status='checked_in')
+
+
+def _nightly_amount(total_price, check_in, check_out, room_price):
+    nights = (check_out - check_in).days
+    if total_price is not None and nights > 0:
+        return round(total_price / nights, 2)
+    return room_price or Decimal('0.00')
+
+
+def post_revenue(audit_date):
+    """Księguje noc ``audit_date`` dla trwających pobytów (już zaksięgowane są pomijane)."""
+    stays = Reservation.objects.filter(
+        status='checked_in', check_in__lte=audit_date, check_out__gt=audit_date,
+    ).values_list('pk', 'room_id', 'room_type', 'total_price', 'check_in', 'check_out', 'room__price')
+    postings = [
+        RevenuePosting(
+            reservation_id=pk, room_id=room_id, room_type=room_type, date=audit_date,
+            amount=_nightly_amount(total_price, check_in, check_out, room_price),
+        )
+        for pk, room_id, room_type, total_price, check_in, check_out, room_price in stays
+    ]
+    RevenuePosting.objects.bulk_create(postings, batch_size=1000, ignore_conflicts=True)
+
+
+def reconcile_rooms():
+    """Dopasowuje Room.status do zameldowanych gości. Zwraca (oznaczone jako zajęte, zwolnione).
+
+    Pokój "zajęty" bez zameldowanego gościa trafia do sprzątania, a nie od razu
+    do sprzedaży - ktoś mógł w nim być.
+    """
+    occupied = changes.update_and_record(
+        Room.objects
+        .exclude(status__in=['occupied', 'maintenance'])
+        .filter(Exists(_in_house())),
+        status='occupied',
+    )
+    released = changes.update_and_record(
+        Room.objects
+        .filter(status='occupied')
+        .exclude(Exists(_in_house())),
+        status='dirty',
+    )
+    return occupied, released
+
+
+def run(audit_date=None):
+    """Zamyka dobę ``audit_date`` (domyślnie wczorajszą). Zwraca NightAuditRun."""
+    started_at = timezone.now()
+    audit_date = audit_date or started_at.date() - timedelta(days=1)
+
+    with transaction.atomic():
+        missed = Reservation.objects.filter(status__in=NO_SHOW_STATUSES, check_in__lte=audit_date)
+        # Zwolnione noce niestawień znikają z kanałów iCal
+        calendars.bump_for_reservations(set(missed.values_list('room_id', 'room_type')))
+        no_shows = changes.update_and_record(missed, status='no_show')
+        changes.update_and_record(
+            Reservation.objects.filter(status='checked_in', check_out__lte=audit_date, overdue=False),
+            overdue=True,
+        )
+        changes.update_and_record(
+            Reservation.objects.filter(overdue=True).filter(~Q(status='checked_in') | Q(check_out__gt=audit_date)),
+            overdue=False,
+        )
+
+        post_revenue(audit_date)
+        rooms_occupied, rooms_released = reconcile_rooms()
+        if no_shows:
+            inventory.rebuild()
+
+        # Powtórka tej samej doby dolicza się do poprzedniego podsumowania
+        previous = NightAuditRun.objects.filter(audit_date=audit_date).first()
+        if previous:
+            no_shows += previous.no_shows
+            rooms_occupied += previous.rooms_occupied
+            rooms_released += previous.rooms_released
+
+        totals = RevenuePosting.objects.filter(date=audit_date).aggregate(revenue=Sum('amount'), postings=Count('pk'))
+        summary, _ = NightAuditRun.objects.update_or_create(
+            audit_date=audit_date,
+            defaults={
+                'started_at': started_at,
+                'finished_at': timezone.now(),
+                'no_shows': no_shows,
+                'overdue': Reservation.objects.filter(overdue=True).count(),
+                'postings': totals['postings'],
+                'revenue': totals['revenue'] or Decimal('0.00'),
+                'rooms_occupied': rooms_occupied,
+                'rooms_released': rooms_released,
+            },
+        )
+    return summary
@@ -0,0 +1,172 @@
+"""Wyszukiwanie wolnych pokoi, także dla grup (kilka pokoi na jedną rezerwację).
+
+``free_rooms`` wyznacza wolne pokoje w terminie jednym zapytaniem
+(NOT EXISTS po kolidujących rezerwacjach), a ``type_limits`` jednym
+agregatem po rejestrze RoomTypeInventory ogranicza liczbę pokoi typu
+o rezerwacje czekające na przydział. Pokoje o tym samym typie, pojemności
+i cenie są wymienne, więc ``group_combinations`` szuka najtańszych zestawów
+po grupach (typ, pojemność, cena), a nie po pojedynczych pokojach:
+przegląd z odcięciem (branch and bound) z dolnym ograniczeniem z relaksacji
+ciągłej - resztę miejsc wycenia po najniższej cenie za osobę.
+"""
+import heapq
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, Exists, F, Min, OuterRef
+
+from . import inventory, pricing
+from .models import Reservation, Room, RoomTypeInventory
+
+ACTIVE_STATUSES = ['pending', 'confirmed', 'checked_in']
+MAX_COMBINATIONS = 5
+
+
+def free_rooms(check_in, check_out, min_capacity=1):
+    """Pokoje bez kolizji terminów i poza naprawą (jedno zapytanie)."""
+    overlapping = Reservation.objects.filter(
+        room=OuterRef('pk'),
+        check_in__lt=check_out,
+        check_out__gt=check_in,
+        status__in=ACTIVE_STATUSES,
+    )
+    return (
+        Room.objects
+        .exclude(status='maintenance')
+        .filter(capacity__gte=min_capacity)
+        .exclude(Exists(overlapping))
+        .order_by('number')
+    )
+
+
+def type_limits(check_in, check_out):
+    """Liczba wolnych miejsc w typach według rejestru {typ: liczba}.
+
+    Typy, których rejestr nie obejmuje całego terminu (np. poza horyzontem),
+    są liczone z rezerwacji jak w ``inventory.free_count``.
+    """
+    nights = (check_out - check_in).days
+    rows = (
+        RoomTypeInventory.objects
+        .filter(date__gte=check_in, date__lt=check_out)
+        .values('room_type')
+        .annotate(free=Min(F('total') - F('booked') - F('out_of_order')), rows=Count('pk'))
+    )
+    limits = {row['room_type']: max(row['free'], 0) for row in rows if row['rows'] == nights}
+    for room_type, _ in Room.TYPE_CHOICES:
+        if room_type not in limits and nights > 0:
+            limits[room_type] = max(inventory.free_count(room_type, check_in, check_out), 0)
+    return limits
+
+
+class PriceCache:
+    """Cena pobytu liczona raz na (typ, cena bazowa) zamiast raz na pokój.
+
+    Wyceny pochodzą z core.pricing, więc powtórne wyszukanie terminu nie liczy ich od nowa.
+    """
+
+    def __init__(self, check_in, check_out):
+        self.check_in = check_in
+        self.check_out = check_out
+        self._prices = {}
+
+    def total(self, room):
+        key = (room.room_type, room.price)
+        if key not in self._prices:
+            self._prices[key] = pricing.quote(room.room_type, room.price, self.check_in, self.check_out)
+        return self._prices[key]
+
+
+def _groups(rooms, limits, prices):
+    """Grupy wymiennych pokoi: [(pojemność, cena, [pokoje])] posortowane po cenie za osobę."""
+    by_key = defaultdict(list)
+    for room in rooms:
+        by_key[(room.room_type, room.capacity, prices.total(room))].append(room)
+    taken = defaultdict(int)
+    groups = []
+    # Najpierw tańsze grupy, żeby limit typu zużywały pokoje, które i tak zostałyby wybrane
+    for (room_type, capacity, price), members in sorted(by_key.items(), key=lambda item: item[0][2] / item[0][1]):
+        limit = limits.get(room_type)
+        if limit is not None:
+            members = members[:max(limit - taken[room_type], 0)]
+            taken[room_type] += len(members)
+        if members:
+            groups.append((capacity, price, members))
+    return groups
+
+
+def _lower_bound(groups, start, need):
+    """Najniższy możliwy koszt pokrycia ``need`` miejsc grupami od ``start`` (relaksacja ciągła)."""
+    cost = Decimal('0')
+    for capacity, price, members in groups[start:]:
+        if len(members) * capacity >= need:
+            return cost + price * need / capacity
+        cost += price * len(members)
+        need -= len(members) * capacity
+    return None
+
+
+def group_combinations(guests, groups, max_rooms=None, limit=MAX_COMBINATIONS):
+    """Najtańsze zestawy liczności grup o łącznej pojemności >= ``guests``.
+
+    ``groups`` muszą być posortowane rosnąco po cenie za osobę (jak z ``_groups``).
+    Zestawy z pokojem zbędnym do pomieszczenia grupy są pomijane, ``max_rooms``
+    ogranicza liczbę pokoi w zestawie (domyślnie bez limitu). Zwraca listę
+    (koszt, liczba pokoi, [liczba pokoi z każdej grupy]) rosnąco po koszcie.
+    """
+    if max_rooms is None:
+        max_rooms = guests
+    best = []  # kopiec: (-koszt, -pokoje, nr, liczności) - na szczycie najdroższy zestaw
+    counts = [0] * len(groups)
+    # Największa pojemność pokoju w grupach od i-tej - do odcięcia po limicie pokoi
+    largest = [0] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        largest[i] = max(largest[i + 1], groups[i][0])
+    serial = 0
+
+    def visit(index, need, cost, rooms, smallest):
+        nonlocal serial
+        if need <= 0:
+            if need + smallest <= 0:
+                return  # jeden z pokoi jest zbędny
+            if len(best) < limit or cost < -best[0][0]:
+                serial += 1
+                heapq.heappush(best, (-cost, -rooms, serial, list(counts)))
+                if len(best) > limit:
+                    heapq.heappop(best)
+            return
+        if largest[index] * (max_rooms - rooms) < need:
+            return
+        lower = _lower_bound(groups, index, need)
+        if lower is None or (len(best) >= limit and cost + lower >= -best[0][0]):
+            return
+        capacity, price, members = groups[index]
+        most = min(len(members), max_rooms - rooms, -(-need // capacity))
+        for n in range(most, -1, -1):
+            counts[index] = n
+            visit(
+                index + 1, need - n * capacity, cost + price * n, rooms + n,
+                min(smallest, capacity) if n else smallest,
+            )
+        counts[index] = 0
+
+    visit(0, guests, Decimal('0'), 0, float('inf'))
+    best.sort(key=lambda entry: (-entry[0], -entry[1], entry[2]))
+    return [(-neg_cost, -neg_rooms, chosen) for neg_cost, neg_rooms, _, chosen in best]
+
+
+def search_groups(check_in, check_out, guests, max_rooms=None, limit=MAX_COMBINATIONS):
+    """Najtańsze zestawy wolnych pokoi dla grupy ``guests`` osób w terminie."""
+    prices = PriceCache(check_in, check_out)
+    groups = _groups(free_rooms(check_in, check_out), type_limits(check_in, check_out), prices)
+    result = []
+    for cost, _, chosen in group_combinations(guests, groups, max_rooms=max_rooms, limit=limit):
+        rooms = []
+        for (capacity, price, members), n in zip(groups, chosen):
+            rooms.extend((room, price) for room in members[:n])
+        result.append({
+            'total_price': cost,
+            'capacity': sum(room.capacity for room, _ in rooms),
+            'rooms': rooms,
+        })
+    return result
@@ -0,0 +1,92 @@
+"""Saldo rezerwacji: zdenormalizowane amount_paid / balance_due.
+
+Każdy zapis lub usunięcie płatności koryguje oba pola rezerwacji wyrażeniem
+F() w tej samej transakcji (sygnały w core.signals), więc listy i raporty
+czytają saldo wprost z wiersza rezerwacji zamiast sumować płatności.
+Rozjazdy (np. po zmianach masowych QuerySet.update) naprawia komenda
+``manage.py reconcile_balances``.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Payment, Reservation
+
+ZERO = Decimal('0.00')
+
+
+def payment_contribution(status, amount):
+    """Kwota, o jaką płatność zmniejsza saldo - liczą się tylko zrealizowane."""
+    if status != 'completed' or amount in (None, ''):
+        return ZERO
+    return Decimal(str(amount))
+
+
+def apply_payment_delta(reservation_id, delta, cached_reservation=None):
+    """Przesuwa wpłaty i saldo rezerwacji o delta jednym UPDATE."""
+    if not reservation_id or not delta:
+        return
+    Reservation.objects.filter(pk=reservation_id).update(
+        amount_paid=F('amount_paid') + delta,
+        balance_due=F('balance_due') - delta,
+    )
+    # Rezerwacja trzymana przez widok (payment.reservation) też ma być aktualna
+    if cached_reservation is not None and cached_reservation.pk == reservation_id:
+        cached_reservation.amount_paid = Decimal(cached_reservation.amount_paid or 0) + delta
+        cached_reservation.balance_due = Decimal(cached_reservation.balance_due or 0) - delta
+        loaded = getattr(cached_reservation, '_loaded_values', None)
+        if loaded is not None:
+            loaded['amount_paid'] = cached_reservation.amount_paid
+            loaded['balance_due'] = cached_reservation.balance_due
+
+
+def _paid_subquery():
+    paid = (
+        Payment.objects
+        .filter(reservation_id=OuterRef('pk'), payment_status='completed')
+        .values('reservation_id')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    return Coalesce(Subquery(paid), Value(ZERO), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def expected_balances():
+    """Rezerwacje z wyliczonymi od zera wpłatami i saldem (do porównania)."""
+    return Reservation.objects.annotate(
+        expected_paid=_paid_subquery(),
+    ).annotate(
+        expected_balance=Coalesce(F('total_price'), Value(ZERO)) - F('expected_paid'),
+    )
+
+
+def reconcile_balances(fix=False):
+    """Zwraca listę rozbieżności (id, zapisane, oczekiwane); z fix=True naprawia je.
+
+    Naprawa to jedno zbiorcze UPDATE z podzapytaniem po płatnościach.
+    """
+    mismatches = [
+        (row['pk'], row['amount_paid'], row['expected_paid'], row['balance_due'], row['expected_balance'])
+        for row in expected_balances().values('pk', 'amount_paid', 'expected_paid', 'balance_due', 'expected_balance')
+        if Decimal(row['amount_paid']) != Decimal(row['expected_paid'])
+        or Decimal(row['balance_due']) != Decimal(row['expected_balance'])
+    ]
+    if fix and mismatches:
+        paid = _paid_subquery()
+        Reservation.objects.filter(pk__in=[m[0] for m in mismatches]).update(
+            amount_paid=paid,
+            balance_due=Coalesce(F('total_price'), Value(ZERO)) - paid,
+        )
+    return mismatches
+
+
+def outstanding_balances():
+    """Nieopłacone rezerwacje od największego salda (indeks częściowy core_res_outstanding_idx)."""
+    return (
+        Reservation.objects
+        .filter(balance_due__gt=0)
+        .exclude(status='cancelled')
+        .select_related('guest__user', 'room')
+        .order_by('-balance_due')
+    )
@@ -0,0 +1,180 @@
+"""Kanały iCalendar (.ics) z dostępnością pokoi dla channel managerów i OTA.
+
+Kanał pokoju blokuje terminy aktywnych rezerwacji (a cały zakres, gdy pokój
+jest w naprawie), kanał typu - dni bez wolnego pokoju tego typu według
+rejestru RoomTypeInventory. Treść nie zawiera danych gości.
+
+Każda zmiana, która może zmienić kanał, podbija ``Room.calendar_version``
+(sygnały w core.signals, audyt nocny). Wersja kanału typu to suma wersji jego
+pokoi. Odpytanie kanału to jedno małe zapytanie o wersję: przy zgodnym ETag
+odpowiedź 304, a w przeciwnym razie treść z cache Django (klucz z wersją
+i datą), a dopiero przy jej braku - jedno zapytanie o rezerwacje i render.
+
+Adres kanału zawiera token (HMAC z SECRET_KEY), więc zna go tylko odbiorca,
+któremu hotel go przekazał.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Sum
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Reservation, Room, RoomTypeInventory
+
+ACTIVE_STATUSES = ['pending', 'confirmed', 'checked_in']
+CACHE_TIMEOUT = 24 * 3600
+
+
+# Wersje
+
+def bump_rooms(room_ids):
+    """Podbija wersję kalendarza pokoi (jedno UPDATE)."""
+    room_ids = {pk for pk in room_ids if pk is not None}
+    if room_ids:
+        Room.objects.filter(pk__in=room_ids).update(calendar_version=F('calendar_version') + 1)
+
+
+def bump_room_type(room_type):
+    """Rezerwacja bez przydzielonego pokoju zmienia kanał typu - podbija wszystkie jego pokoje."""
+    Room.objects.filter(room_type=room_type).update(calendar_version=F('calendar_version') + 1)
+
+
+def bump_for_reservations(rows):
+    """Podbija kalendarze dla rezerwacji [(room_id, room_type)] zmienionych masowo."""
+    bump_rooms(room_id for room_id, _ in rows)
+    for room_type in {room_type for room_id, room_type in rows if room_id is None}:
+        bump_room_type(room_type)
+
+
+def room_version(room_id):
+    return Room.objects.filter(pk=room_id).values_list('calendar_version', flat=True).first()
+
+
+def room_type_version(room_type):
+    totals = Room.objects.filter(room_type=room_type).aggregate(version=Sum('calendar_version'), rooms=Count('pk'))
+    if not totals['rooms']:
+        return None
+    return f"{totals['rooms']}.{totals['version']}"
+
+
+# Tokeny adresów
+
+def feed_token(kind, key):
+    return salted_hmac('core.calendars', f"{kind}:{key}").hexdigest()[:32]
+
+
+def check_token(kind, key, token):
+    return constant_time_compare(feed_token(kind, key), token or '')
+
+
+def room_feed_path(room):
+    return reverse('room_calendar', args=[room.pk, feed_token('room', room.pk)])
+
+
+def room_type_feed_path(room_type):
+    return reverse('room_type_calendar', args=[room_type, feed_token('type', room_type)])
+
+
+# Zablokowane terminy
+
+def _horizon():
+    today = timezone.localdate()
+    return today, today + timedelta(days=getattr(settings, 'CALENDAR_HORIZON_DAYS', 365))
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(block) for block in merged]
+
+
+def room_blocks(room):
+    """Zajęte przedziały [od, do) pokoju od dziś do horyzontu."""
+    today, horizon = _horizon()
+    ranges = list(
+        Reservation.objects.filter(
+            room=room, status__in=ACTIVE_STATUSES, check_out__gt=today, check_in__lt=horizon,
+        ).values_list('check_in', 'check_out')
+    )
+    if room.status == 'maintenance':
+        # Jak w rejestrze pokoi: pokój w naprawie jest niedostępny do odwołania
+        ranges.append((today, horizon))
+    return _merge((max(start, today), min(end, horizon)) for start, end in ranges)
+
+
+def room_type_blocks(room_type):
+    """Dni bez wolnego pokoju typu według rejestru, złączone w przedziały."""
+    today, horizon = _horizon()
+    days = (
+        RoomTypeInventory.objects
+        .filter(room_type=room_type, date__gte=today, date__lt=horizon)
+        .filter(total__lte=F('booked') + F('out_of_order'))
+        .values_list('date', flat=True)
+    )
+    return _merge((day, day + timedelta(days=1)) for day in days)
+
+
+# Render
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def render(name, uid_prefix, blocks):
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+    host = getattr(settings, 'CALENDAR_UID_DOMAIN', 'hotel.example')
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f"PRODID:-//{_escape(getattr(settings, 'HOTEL_NAME', 'Hotel'))}//Dostepnosc//PL",
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ]
+    for start, end in blocks:
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{uid_prefix}-{start:%Y%m%d}-{end:%Y%m%d}@{host}',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART;VALUE=DATE:{start:%Y%m%d}',
+            f'DTEND;VALUE=DATE:{end:%Y%m%d}',
+            'SUMMARY:Niedostępny',
+            'TRANSP:OPAQUE',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def etag(kind, key, version):
+    # Data w wersji: kanał zaczyna się od dziś, więc o północy zmienia się sam
+    return f'"{kind}-{key}-{version}-{timezone.localdate():%Y%m%d}"'
+
+
+def room_feed(room_id, version):
+    """Treść kanału pokoju w danej wersji (z cache)."""
+    key = f"ical:{etag('room', room_id, version)}"
+    body = cache.get(key)
+    if body is None:
+        room = Room.objects.get(pk=room_id)
+        body = render(f"Pokój {room.number}", f"room-{room.pk}", room_blocks(room))
+        cache.set(key, body, CACHE_TIMEOUT)
+    return body
+
+
+def room_type_feed(room_type, version):
+    """Treść kanału typu pokoju w danej wersji (z cache)."""
+    key = f"ical:{etag('type', room_type, version)}"
+    body = cache.get(key)
+    if body is None:
+        label = dict(Room.TYPE_CHOICES).get(room_type, room_type)
+        body = render(f"{label} - dostępność", f"type-{room_type}", room_type_blocks(room_type))
+        cache.set(key, body, CACHE_TIMEOUT)
+    return body
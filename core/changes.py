@@ -0,0 +1,177 @@
+"""Dziennik zmian (change data capture) rezerwacji, płatności i statusów pokoi.
+
+Każde utworzenie, zmiana i usunięcie zapisuje wiersz ChangeEvent w tej samej
+transakcji co sama zmiana - sygnały dla ``save()``/``delete()``, a ścieżki
+masowe (``QuerySet.update`` w audycie nocnym, zwalnianiu pokoi, płatnościach)
+wołają ``record_bulk`` z id zmienionych wierszy. Zdarzenie niesie stan obiektu
+po zmianie (przy usunięciu - ostatni stan) i listę zmienionych pól.
+
+Numer zdarzenia (``seq``) rośnie, więc odbiorca pamięta ostatni przetworzony
+i pobiera tylko nowsze: ``/api/changes?since=<seq>`` albo plik JSON Lines
+z ``manage.py export_changes``. Numer nie jest id wiersza: id przydziela się
+przy zapisie, a transakcje zatwierdzają się w innej kolejności, więc odbiorca
+mógłby przeskoczyć id z transakcji, która była jeszcze w toku. ``seq`` nadaje
+``publish`` (wołane przez ``feed``) tylko zdarzeniom już zatwierdzonym
+i zawsze większy od wszystkich nadanych wcześniej - zdarzenie zatwierdzone
+później dostaje numer później i żadne nie zostaje pominięte.
+"""
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import ChangeEvent, Payment, Reservation, Room, field_changed
+
+# Pola w zdarzeniach. Saldo rezerwacji (amount_paid, balance_due) wynika ze
+# zdarzeń płatności, a PIN rezerwacji nie opuszcza hotelu.
+TRACKED = {
+    'reservation': (Reservation, [
+        'guest_id', 'room_id', 'room_type', 'check_in', 'check_out', 'number_of_guests',
+        'status', 'total_price', 'payment_method', 'overdue', 'created_at',
+    ]),
+    'payment': (Payment, [
+        'reservation_id', 'amount', 'payment_date', 'payment_method', 'payment_status', 'transaction_id',
+    ]),
+    'room': (Room, ['number', 'room_type', 'capacity', 'price', 'status']),
+}
+ENTITIES = {model: entity for entity, (model, _) in TRACKED.items()}
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+# Klucz blokady doradczej PostgreSQL - numery nadaje naraz tylko jeden proces
+PUBLISH_LOCK_ID = 0x63686e67
+
+
+def _snapshot(instance, fields):
+    # Przez JSON z DjangoJSONEncoder - daty i kwoty zapisują się jako tekst
+    return json.loads(json.dumps({name: getattr(instance, name) for name in fields}, cls=DjangoJSONEncoder))
+
+
+def record(instance, action, only=None):
+    """Zapisuje zdarzenie dla obiektu. Zmiana bez zmienionych pól (``only``) jest pomijana."""
+    entity = ENTITIES[type(instance)]
+    fields = TRACKED[entity][1]
+    changed = []
+    if action == 'update':
+        changed = [name for name in (only or fields) if field_changed(instance, name)]
+        if not changed:
+            return None
+    return ChangeEvent.objects.create(
+        entity=entity, object_id=instance.pk, action=action,
+        data=_snapshot(instance, fields), changed=changed,
+    )
+
+
+def record_bulk(model, ids, changed):
+    """Zdarzenia ``update`` dla wierszy zmienionych przez ``QuerySet.update`` (jedno zapytanie o stan).
+
+    Zmiana samych pól spoza dziennika (np. blokad) nie zapisuje zdarzeń.
+    """
+    entity = ENTITIES[model]
+    fields = TRACKED[entity][1]
+    changed = [name for name in changed if name in fields]
+    if not ids or not changed:
+        return 0
+    rows = model.objects.filter(pk__in=ids).order_by('pk')
+    events = [
+        ChangeEvent(entity=entity, object_id=row.pk, action='update', data=_snapshot(row, fields), changed=changed)
+        for row in rows
+    ]
+    ChangeEvent.objects.bulk_create(events, batch_size=1000)
+    return len(events)
+
+
+def update_and_record(queryset, **values):
+    """``queryset.update(**values)`` ze zdarzeniami dla zmienionych wierszy. Zwraca ich liczbę."""
+    with transaction.atomic():
+        ids = list(queryset.values_list('pk', flat=True))
+        if not ids:
+            return 0
+        count = queryset.filter(pk__in=ids).update(**values)
+        record_bulk(queryset.model, ids, values.keys())
+    return count
+
+
+def publish():
+    """Nadaje kolejne ``seq`` zatwierdzonym zdarzeniom, które jeszcze go nie mają. Zwraca ich liczbę.
+
+    Zdarzenia z transakcji w toku nie są widoczne, więc dostaną numer przy
+    następnym wywołaniu - większy od wszystkich nadanych do tej pory.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_ID])
+        # Na SQLite transakcja IMMEDIATE już wyklucza równoległe nadawanie
+        pending = list(ChangeEvent.objects.filter(seq__isnull=True).order_by('pk').only('pk'))
+        if not pending:
+            return 0
+        last = ChangeEvent.objects.aggregate(last=Max('seq'))['last'] or 0
+        for number, event in enumerate(pending, start=last + 1):
+            event.seq = number
+        ChangeEvent.objects.bulk_update(pending, ['seq'], batch_size=1000)
+    return len(pending)
+
+
+def feed(since=0, limit=DEFAULT_LIMIT, entity=None):
+    """Zdarzenia po ``since`` (rosnąco po seq). Zwraca (zdarzenia, czy_jest_więcej)."""
+    limit = max(1, min(limit, MAX_LIMIT))
+    publish()
+    events = ChangeEvent.objects.filter(seq__gt=since).order_by('seq')
+    if entity:
+        events = events.filter(entity=entity)
+    page = list(events[:limit + 1])
+    return page[:limit], len(page) > limit
+
+
+def as_dict(event):
+    return {
+        'seq': event.seq,
+        'entity': event.entity,
+        'id': event.object_id,
+        'action': event.action,
+        'changed': event.changed,
+        'data': event.data,
+        'at': event.created_at.isoformat(),
+    }
+
+
+# Ujście do pliku
+
+def _read_cursor(path):
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return int(handle.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def export(path, batch_size=DEFAULT_LIMIT):
+    """Dopisuje nowe zdarzenia do pliku JSON Lines ``path``. Zwraca liczbę dopisanych.
+
+    Ostatni zapisany seq trafia do ``<path>.cursor`` dopiero po zapisaniu
+    zdarzeń na dysk - po awarii część zdarzeń może się powtórzyć (odbiorca
+    pomija seq, które już zna), ale żadne nie zginie.
+    """
+    path = str(path)
+    cursor_path = path + '.cursor'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    since = _read_cursor(cursor_path)
+    written = 0
+    while True:
+        events, has_more = feed(since, batch_size)
+        if not events:
+            return written
+        with open(path, 'a', encoding='utf-8') as handle:
+            for event in events:
+                handle.write(json.dumps(as_dict(event), ensure_ascii=False) + '\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+        since = events[-1].seq
+        with open(cursor_path + '.tmp', 'w', encoding='utf-8') as handle:
+            handle.write(str(since))
+        os.replace(cursor_path + '.tmp', cursor_path)
+        written += len(events)
+        if not has_more:
+            return written
@@ -12,10 +12,14 @@ urlpatterns = [
     path('reservations/<int:pk>/', views.employee_reservation_detail, name='reservation_detail'),
     path('guests/', views.employee_guests, name='guests'),
     path('guests/<int:pk>/', views.employee_guest_detail, name='guest_detail'),
+    path('search/', views.employee_search, name='search'),
     path('housekeeping/', views.employee_housekeeping, name='housekeeping'),
     path('maintenance/', views.employee_maintenance, name='maintenance'),
+    path('live/', views.employee_live_events, name='live_events'),
     path('pricing/', views.employee_pricing, name='pricing'),
     path('manager/employees/', views.manager_employees, name='manager_employees'),
     path('manager/reports/', views.manager_reports, name='manager_reports'),
     path('manager/reports/pdf/', views.manager_report_pdf, name='manager_report_pdf'),
+    path('manager/invoices/<int:year>/<int:month>/', views.manager_invoices_zip, name='manager_invoices_zip'),
+    path('manager/balances/', views.manager_outstanding_balances, name='manager_balances'),
 ]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Statystyki gościa: zdenormalizowane pobyty, noce, przychód i ostatnia wizyta.
+
+Pola GuestProfile (``stays_count``, ``nights_count``, ``lifetime_revenue``,
+``last_visit``) pozwalają recepcji sortować i filtrować listę gości jednym
+zapytaniem po indeksie zamiast sumować historię rezerwacji przy każdym widoku.
+Pobyt to rezerwacja zameldowana albo zakończona; przychód to zrealizowane
+płatności gościa.
+
+Sygnały (core.signals) przesuwają liczniki wyrażeniami F() o różnicę między
+poprzednim a obecnym stanem rezerwacji albo płatności - jedno UPDATE gościa
+w tej samej transakcji. Tylko cofnięcie pobytu przelicza ``last_visit`` od
+nowa. Archiwizacja (core.archive) przenosi wiersze bez zmiany sum, więc
+statystyk nie rusza. Rozjazdy (np. po zmianach masowych QuerySet.update)
+naprawia ``manage.py rebuild_guest_stats``.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ArchivedPayment, ArchivedReservation, GuestProfile, Payment, Reservation
+
+STAY_STATUSES = ('checked_in', 'completed')
+ZERO = Decimal('0.00')
+
+# Sortowania listy gości: (etykieta, kolejność, filtr) - każde odpowiada
+# indeksowi z GuestProfile.Meta.indexes; po wizycie tylko goście, którzy byli
+ORDERINGS = {
+    'revenue': ("Przychód", ('-lifetime_revenue', 'id'), {}),
+    'stays': ("Liczba pobytów", ('-stays_count', 'id'), {}),
+    'last_visit': ("Ostatnia wizyta", ('-last_visit', 'id'), {'last_visit__isnull': False}),
+}
+
+
+# Pobyty
+
+def stay(guest_id, status, check_in, check_out):
+    """(gość, noce, przyjazd) dla pobytu albo None, jeśli rezerwacja się nie odbyła."""
+    if guest_id is None or status not in STAY_STATUSES or not (check_in and check_out):
+        return None
+    return guest_id, max((check_out - check_in).days, 0), check_in
+
+
+def reservation_stay(reservation):
+    return stay(reservation.guest_id, reservation.status, reservation.check_in, reservation.check_out)
+
+
+def loaded_stay(reservation):
+    """Pobyt w stanie wczytanym z bazy (przed zmianą)."""
+    loaded = getattr(reservation, '_loaded_values', None)
+    if not loaded:
+        return None
+    return stay(loaded.get('guest_id'), loaded.get('status'), loaded.get('check_in'), loaded.get('check_out'))
+
+
+def _last_visit(guest_id):
+    visits = [
+        model.objects.filter(guest_id=guest_id, status__in=STAY_STATUSES).aggregate(last=Max('check_in'))['last']
+        for model in (Reservation, ArchivedReservation)
+    ]
+    return max((visit for visit in visits if visit), default=None)
+
+
+def _shift_stays(guest_id, removed, added):
+    values = {
+        'stays_count': F('stays_count') + int(added is not None) - int(removed is not None),
+        'nights_count': F('nights_count') + (added[1] if added else 0) - (removed[1] if removed else 0),
+    }
+    # Wizyta przybyła albo przesunęła się na później - wystarczy maksimum;
+    # cofnięta wizyta mogła być ostatnią, więc wtedy liczymy od nowa
+    recount = removed is not None and (added is None or added[2] < removed[2])
+    if added is not None and not recount:
+        visit = Value(added[2])
+        values['last_visit'] = Greatest(Coalesce('last_visit', visit), visit)
+    GuestProfile.objects.filter(pk=guest_id).update(**values)
+    if recount:
+        GuestProfile.objects.filter(pk=guest_id).update(last_visit=_last_visit(guest_id))
+
+
+def apply_stay_change(old, new):
+    """Przenosi pobyt w statystykach gości ze starego stanu do nowego."""
+    if old == new:
+        return
+    for guest_id in dict.fromkeys(s[0] for s in (old, new) if s):
+        _shift_stays(
+            guest_id,
+            old if old and old[0] == guest_id else None,
+            new if new and new[0] == guest_id else None,
+        )
+
+
+# Przychód
+
+def apply_revenue_delta(reservation_id, delta):
+    """Przesuwa przychód gościa rezerwacji o delta jednym UPDATE."""
+    if not reservation_id or not delta:
+        return
+    GuestProfile.objects.filter(reservations=reservation_id).update(
+        lifetime_revenue=F('lifetime_revenue') + delta,
+    )
+
+
+def move_revenue(reservation_id, old_guest_id, new_guest_id):
+    """Rezerwacja przepisana na innego gościa zabiera ze sobą swoje wpłaty."""
+    if old_guest_id == new_guest_id:
+        return
+    paid = Payment.objects.filter(
+        reservation_id=reservation_id, payment_status='completed',
+    ).aggregate(total=Sum('amount'))['total']
+    if not paid:
+        return
+    GuestProfile.objects.filter(pk=old_guest_id).update(lifetime_revenue=F('lifetime_revenue') - paid)
+    GuestProfile.objects.filter(pk=new_guest_id).update(lifetime_revenue=F('lifetime_revenue') + paid)
+
+
+# Przeliczenie od zera
+
+def expected_stats(guest_ids=None):
+    """Statystyki wyliczone z rezerwacji i płatności obu tabel: {guest_id: (pobyty, noce, przychód, wizyta)}."""
+    stats = defaultdict(lambda: [0, 0, ZERO, None])
+    for model in (Reservation, ArchivedReservation):
+        stays = model.objects.filter(status__in=STAY_STATUSES)
+        if guest_ids is not None:
+            stays = stays.filter(guest_id__in=guest_ids)
+        for guest_id, check_in, check_out in stays.values_list('guest_id', 'check_in', 'check_out').iterator():
+            row = stats[guest_id]
+            row[0] += 1
+            row[1] += max((check_out - check_in).days, 0)
+            row[3] = check_in if row[3] is None else max(row[3], check_in)
+    for model in (Payment, ArchivedPayment):
+        payments = model.objects.filter(payment_status='completed')
+        if guest_ids is not None:
+            payments = payments.filter(reservation__guest_id__in=guest_ids)
+        for row in payments.values('reservation__guest_id').annotate(total=Sum('amount')).order_by():
+            stats[row['reservation__guest_id']][2] += row['total']
+    return {guest_id: tuple(row) for guest_id, row in stats.items()}
+
+
+def rebuild(guest_ids=None, batch_size=1000):
+    """Przelicza statystyki gości (wszystkich albo ``guest_ids``). Zwraca liczbę poprawionych."""
+    expected = expected_stats(guest_ids)
+    empty = (0, 0, ZERO, None)
+    guests = GuestProfile.objects.only('stays_count', 'nights_count', 'lifetime_revenue', 'last_visit')
+    if guest_ids is not None:
+        guests = guests.filter(pk__in=guest_ids)
+    changed = []
+    for guest in guests.iterator():
+        stays, nights, revenue, visit = expected.get(guest.pk, empty)
+        current = (guest.stays_count, guest.nights_count, Decimal(guest.lifetime_revenue), guest.last_visit)
+        if current != (stays, nights, Decimal(revenue), visit):
+            guest.stays_count, guest.nights_count, guest.lifetime_revenue, guest.last_visit = stays, nights, revenue, visit
+            changed.append(guest)
+    GuestProfile.objects.bulk_update(
+        changed, ['stays_count', 'nights_count', 'lifetime_revenue', 'last_visit'], batch_size=batch_size,
+    )
+    return len(changed)
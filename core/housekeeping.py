@@ -0,0 +1,134 @@
+"""Kolejka housekeepingu ułożona według pilności.
+
+Dzisiejsze przyjazdy, wyjazdy i pobyty są dołączane do pokoi jako podzapytania
+EXISTS, więc cała tablica to jedno zapytanie (plus jedno po listę pokojówek).
+
+Pokój do sprzątania (``dirty``) znika z kolejki po ``mark_clean``. Pokój
+z gościem w trakcie pobytu dostaje serwis pobytowy raz dziennie - ``mark_serviced``
+zapisuje dzień serwisu bez zmiany statusu, więc zajęty pokój nie staje się wolny.
+"""
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Room, Reservation, EmployeeProfile
+
+PRIORITY_ARRIVAL = 1
+PRIORITY_DEPARTURE = 2
+PRIORITY_STAY_OVER = 3
+PRIORITY_OTHER = 4
+
+PRIORITY_LABELS = {
+    PRIORITY_ARRIVAL: 'Przyjazd dziś',
+    PRIORITY_DEPARTURE: 'Po wyjeździe',
+    PRIORITY_STAY_OVER: 'Serwis pobytowy',
+    PRIORITY_OTHER: 'Do sprzątania',
+}
+
+# Szacunkowy nakład pracy (pełne sprzątanie = 1) używany przy rozdziale zadań
+WORKLOAD = {
+    PRIORITY_ARRIVAL: 1.0,
+    PRIORITY_DEPARTURE: 1.0,
+    PRIORITY_STAY_OVER: 0.5,
+    PRIORITY_OTHER: 1.0,
+}
+
+
+def _room_priority(room):
+    if room.status == 'dirty':
+        if room.arrival_today:
+            return PRIORITY_ARRIVAL
+        if room.departure_today:
+            return PRIORITY_DEPARTURE
+        return PRIORITY_OTHER
+    return PRIORITY_STAY_OVER
+
+
+def housekeeping_queue(today=None):
+    """Pokoje wymagające obsługi, posortowane po pilności i numerze.
+
+    W kolejce są pokoje do sprzątania (``dirty``) oraz pokoje z trwającym
+    pobytem, w których dziś nie było jeszcze serwisu.
+    """
+    today = today or timezone.now().date()
+    same_room = Reservation.objects.filter(room=OuterRef('pk'))
+    rooms = (
+        Room.objects
+        .exclude(status='maintenance')
+        .annotate(
+            arrival_today=Exists(same_room.filter(check_in=today, status__in=['pending', 'confirmed'])),
+            # Wyjazd to wymeldowany gość - zameldowany w dniu wyjazdu jeszcze jest w pokoju
+            departure_today=Exists(same_room.filter(check_out=today, status='completed')),
+            stay_over=Exists(same_room.filter(check_in__lt=today, check_out__gt=today, status='checked_in')),
+        )
+        .filter(
+            Q(status='dirty')
+            | (Q(stay_over=True) & (Q(serviced_on__isnull=True) | Q(serviced_on__lt=today)))
+        )
+    )
+
+    queue = []
+    for room in rooms:
+        room.hk_priority = _room_priority(room)
+        room.hk_reason = PRIORITY_LABELS[room.hk_priority]
+        room.assigned_maid = None
+        queue.append(room)
+    queue.sort(key=lambda r: (r.hk_priority, r.number))
+    return queue
+
+
+def has_guest(room):
+    """Czy w pokoju mieszka zameldowany gość."""
+    return Reservation.objects.filter(room=room, status='checked_in').exists()
+
+
+def mark_clean(room, today=None):
+    """Pokój posprzątany. Zwraca nowy status pokoju.
+
+    Pokój z zameldowanym gościem nigdy nie staje się wolny (a więc dostępny
+    do rezerwacji) - zostaje zajęty, a sprzątanie liczy się jako dzisiejszy serwis.
+    """
+    if has_guest(room):
+        room.status = 'occupied'
+        room.save()
+        mark_serviced(room, today)
+    else:
+        room.status = 'available'
+        room.save()
+    return room.status
+
+
+def mark_serviced(room, today=None):
+    """Serwis pobytowy wykonany dziś - pokój zostaje zajęty, znika z dzisiejszej kolejki."""
+    room.serviced_on = today or timezone.now().date()
+    Room.objects.filter(pk=room.pk).update(serviced_on=room.serviced_on)
+
+
+def active_maids():
+    return list(
+        EmployeeProfile.objects.filter(role='maid', user__is_active=True)
+        .select_related('user')
+        .order_by('user__last_name', 'user__username')
+    )
+
+
+def assign_rooms(queue, maids):
+    """Rozdziela pokoje pokojówkom zachłannie - kolejne zadanie trafia do najmniej obciążonej.
+
+    Kolejka jest przetwarzana od najpilniejszych, więc pilne pokoje rozkładają
+    się równo między wszystkie osoby na zmianie. Zwraca obciążenie każdej z nich.
+    """
+    if not maids:
+        return []
+    loads = {maid.pk: 0.0 for maid in maids}
+    for room in queue:
+        maid = min(maids, key=lambda m: (loads[m.pk], m.pk))
+        room.assigned_maid = maid
+        loads[maid.pk] += WORKLOAD[room.hk_priority]
+    return [(maid, loads[maid.pk]) for maid in maids]
+
+
+def build_board(today=None, balance=True):
+    """Kompletna tablica housekeepingu: kolejka i (opcjonalnie) przydział pracy."""
+    queue = housekeeping_queue(today)
+    workload = assign_rooms(queue, active_maids()) if balance else []
+    return {'queue': queue, 'workload': workload}
@@ -0,0 +1,226 @@
+"""Dzienny rejestr pokoi według typu (RoomTypeInventory).
+
+Dla każdego typu pokoju i dnia w horyzoncie (jak w core.rates) rejestr trzyma
+liczbę pokoi (``total``), zajętych przez rezerwacje (``booked``) i wyłączonych
+z użytku (``out_of_order``). Rezerwacja zajmuje typ, a nie konkretny pokój,
+więc pytanie "czy jest wolny pokój typu X od A do B" to minimum z B-A wierszy,
+a rezerwacja może czekać na przydział pokoju do zameldowania (``assign_room``).
+
+Rejestr jest aktualizowany w tej samej transakcji co zapis rezerwacji
+i pokoju (sygnały w core.signals) wyrażeniami F(); ``manage.py rebuild_inventory``
+przelicza go od zera i przesuwa horyzont.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Exists, F, Min, OuterRef
+from django.utils import timezone
+
+from . import rates
+from .models import Reservation, Room, RoomTypeInventory
+
+ACTIVE_STATUSES = ['pending', 'confirmed', 'checked_in']
+
+
+def footprint(room_type, check_in, check_out, status):
+    """Zakres nocy zajmowany przez rezerwację albo None, jeśli nie zajmuje pokoju."""
+    if status not in ACTIVE_STATUSES or not (room_type and check_in and check_out) or check_in >= check_out:
+        return None
+    return room_type, check_in, check_out
+
+
+def reservation_footprint(reservation):
+    return footprint(reservation.room_type, reservation.check_in, reservation.check_out, reservation.status)
+
+
+def loaded_footprint(reservation):
+    """Zakres zajmowany przez rezerwację w stanie wczytanym z bazy (przed zmianą)."""
+    loaded = getattr(reservation, '_loaded_values', None)
+    if not loaded:
+        return None
+    return footprint(loaded.get('room_type'), loaded.get('check_in'), loaded.get('check_out'), loaded.get('status'))
+
+
+def _shift_booked(span, delta):
+    room_type, check_in, check_out = span
+    RoomTypeInventory.objects.filter(
+        room_type=room_type, date__gte=check_in, date__lt=check_out,
+    ).update(booked=F('booked') + delta)
+
+
+def apply_change(old, new):
+    """Przenosi rezerwację w rejestrze ze starego zakresu do nowego (dwa UPDATE lub żaden)."""
+    if old == new:
+        return
+    if old:
+        _shift_booked(old, -1)
+    if new:
+        _shift_booked(new, 1)
+
+
+def adjust_rooms(room_type, total=0, out_of_order=0, from_date=None):
+    """Zmiana liczby pokoi typu (nowy/usunięty pokój, naprawa) od dziś w przód."""
+    if not (total or out_of_order):
+        return
+    RoomTypeInventory.objects.filter(
+        room_type=room_type, date__gte=from_date or timezone.now().date(),
+    ).update(total=F('total') + total, out_of_order=F('out_of_order') + out_of_order)
+
+
+def available_rooms(room_type, check_in, check_out):
+    """Najmniejsza liczba wolnych pokoi typu w nocach [check_in, check_out).
+
+    Zwraca None, jeśli rejestr nie obejmuje całego zakresu (np. poza horyzontem).
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        return None
+    result = RoomTypeInventory.objects.filter(
+        room_type=room_type, date__gte=check_in, date__lt=check_out,
+    ).aggregate(
+        free=Min(F('total') - F('booked') - F('out_of_order')),
+        rows=Count('pk'),
+    )
+    if result['rows'] != nights:
+        return None
+    return result['free']
+
+
+def _free_rooms_query(room_type, check_in, check_out, exclude_reservation=None):
+    overlapping = Reservation.objects.filter(
+        room=OuterRef('pk'),
+        check_in__lt=check_out,
+        check_out__gt=check_in,
+        status__in=ACTIVE_STATUSES,
+    )
+    if exclude_reservation is not None:
+        overlapping = overlapping.exclude(pk=exclude_reservation.pk)
+    return (
+        Room.objects
+        .filter(room_type=room_type)
+        .exclude(status='maintenance')
+        .exclude(Exists(overlapping))
+    )
+
+
+def _lock(room_type, check_in, check_out):
+    # Rezerwacje tego samego typu w nakładających się terminach czekają na siebie
+    # do końca transakcji (PostgreSQL); SQLite i tak szereguje zapisy
+    list(
+        RoomTypeInventory.objects.select_for_update()
+        .filter(room_type=room_type, date__gte=check_in, date__lt=check_out)
+        .values_list('pk', flat=True)
+    )
+
+
+def is_available(room_type, check_in, check_out, count=1, lock=False):
+    """Czy w całym zakresie jest co najmniej ``count`` wolnych pokoi typu.
+
+    Z ``lock=True`` (w transakcji zapisującej rezerwację) blokuje wiersze
+    rejestru, więc równoległa rezerwacja nie zajmie tego samego miejsca.
+    """
+    if lock:
+        _lock(room_type, check_in, check_out)
+    return free_count(room_type, check_in, check_out) >= count
+
+
+def free_count(room_type, check_in, check_out):
+    """Liczba wolnych pokoi typu w terminie - z rejestru, a poza nim z rezerwacji."""
+    free = available_rooms(room_type, check_in, check_out)
+    if free is None:
+        # Poza rejestrem: sprawdzenie po rezerwacjach (pokoje bez przydziału też zajmują typ)
+        unassigned = Reservation.objects.filter(
+            room__isnull=True, room_type=room_type,
+            check_in__lt=check_out, check_out__gt=check_in, status__in=ACTIVE_STATUSES,
+        ).count()
+        free = _free_rooms_query(room_type, check_in, check_out).count() - unassigned
+    return free
+
+
+def room_is_free(room, check_in, check_out, exclude_reservation=None):
+    """Czy konkretny pokój nie ma kolidującej rezerwacji w terminie."""
+    overlapping = Reservation.objects.filter(
+        room=room, check_in__lt=check_out, check_out__gt=check_in, status__in=ACTIVE_STATUSES,
+    )
+    if exclude_reservation is not None:
+        overlapping = overlapping.exclude(pk=exclude_reservation.pk)
+    return not overlapping.exists()
+
+
+def can_book_room(room, check_in, check_out):
+    """Czy można zarezerwować konkretny pokój: wolny w terminie i z miejscem w rejestrze typu.
+
+    Sam brak kolizji na pokoju nie wystarcza - rezerwacje na typ bez przydziału
+    też zajmują pokoje typu, a rezerwacja ponad rejestr zostawiłaby je bez
+    pokoju przy zameldowaniu. Wywoływać w transakcji zapisującej rezerwację.
+    """
+    return (
+        room.status != 'maintenance'
+        and room_is_free(room, check_in, check_out)
+        and is_available(room.room_type, check_in, check_out, lock=True)
+    )
+
+
+def assign_room(reservation):
+    """Wybiera wolny pokój typu rezerwacji na cały pobyt (najniższy numer) albo None."""
+    return (
+        _free_rooms_query(reservation.room_type, reservation.check_in, reservation.check_out, reservation)
+        .order_by('number')
+        .first()
+    )
+
+
+def rebuild(start=None, end=None):
+    """Przelicza rejestr od zera w zakresie dat (domyślnie cały horyzont) jednym upsertem."""
+    first, last = rates.horizon()
+    start = max(start or first, first)
+    end = min(end or last, last)
+    if start > end:
+        return 0
+    days = (end - start).days + 1
+    today = timezone.now().date()
+    room_types = [t for t, _ in Room.TYPE_CHOICES]
+
+    totals = {t: 0 for t in room_types}
+    broken = {t: 0 for t in room_types}
+    for room_type, status in Room.objects.values_list('room_type', 'status'):
+        totals[room_type] = totals.get(room_type, 0) + 1
+        if status == 'maintenance':
+            broken[room_type] = broken.get(room_type, 0) + 1
+
+    # Tablica różnic: +1 w dniu przyjazdu, -1 w dniu wyjazdu
+    booked = {t: [0] * (days + 1) for t in room_types}
+    reservations = Reservation.objects.filter(
+        check_in__lte=end, check_out__gt=start, status__in=ACTIVE_STATUSES,
+    ).values_list('room_type', 'check_in', 'check_out')
+    for room_type, check_in, check_out in reservations:
+        diff = booked.setdefault(room_type, [0] * (days + 1))
+        diff[max((check_in - start).days, 0)] += 1
+        diff[min((check_out - start).days, days)] -= 1
+
+    rows = []
+    for room_type in room_types:
+        running = 0
+        for i in range(days):
+            running += booked[room_type][i]
+            day = start + timedelta(days=i)
+            rows.append(RoomTypeInventory(
+                room_type=room_type,
+                date=day,
+                total=totals[room_type],
+                booked=running,
+                out_of_order=broken[room_type] if day >= today else 0,
+            ))
+    RoomTypeInventory.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['room_type', 'date'],
+        update_fields=['total', 'booked', 'out_of_order'],
+    )
+    return len(rows)
+
+
+def rebuild_all():
+    first, _ = rates.horizon()
+    removed, _ = RoomTypeInventory.objects.filter(date__lt=first).delete()
+    return rebuild(), removed
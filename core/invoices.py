@@ -0,0 +1,187 @@
+"""Faktury PDF: renderowane raz na wersję rezerwacji i trzymane na dysku.
+
+Wersję wyznacza skrót SHA-256 z danych drukowanych na fakturze (cena, status,
+gość, pokój, termin, płatności). Plik ``invoice_<id>_<skrót>.pdf`` w katalogu
+``INVOICE_CACHE_DIR`` jest ważny dopóki dane się nie zmienią, a skrót służy
+też jako ETag - powtórne pobranie kończy się odpowiedzią 304 albo wysłaniem
+gotowego pliku bez ponownego renderowania.
+
+Tryb wsadowy (``month_invoices``) renderuje brakujące faktury miesiąca
+równolegle w puli procesów; ``stream_zip`` składa z nich archiwum ZIP
+wysyłane strumieniowo.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+
+from . import pdf
+from .models import ArchivedReservation, Reservation
+
+# Zmiana wyglądu faktury (core.pdf) unieważnia wszystkie zapisane pliki
+LAYOUT_VERSION = 2
+
+
+def invoice_queryset():
+    """Rezerwacje ze wszystkim, czego potrzebuje faktura (2 zapytania na dowolną liczbę)."""
+    return Reservation.objects.select_related('guest__user', 'room').prefetch_related('payments')
+
+
+def invoice_context(reservation):
+    """Dane faktury jako prosty słownik (serializowalny, przekazywany do procesów roboczych)."""
+    payments = sorted(reservation.payments.all(), key=lambda p: (p.payment_date, p.pk))
+    completed = [p.payment_date for p in payments if p.payment_status == 'completed']
+    # Data wystawienia wynika z danych (ostatnia wpłata), a nie z dnia pobrania,
+    # inaczej każda doba unieważniałaby zapisane pliki
+    issued = max(completed) if completed else reservation.created_at.date()
+    user = reservation.guest.user
+    return {
+        'id': reservation.pk,
+        'hotel': pdf.hotel_name(),
+        'issued': issued.isoformat(),
+        'guest_first_name': user.first_name,
+        'guest_last_name': user.last_name,
+        'guest_email': user.email,
+        'room_number': reservation.room.number if reservation.room_id else '-',
+        'room_type': reservation.get_room_type_display(),
+        'check_in': reservation.check_in.isoformat(),
+        'check_out': reservation.check_out.isoformat(),
+        'number_of_guests': reservation.number_of_guests,
+        'status': reservation.get_status_display(),
+        'payment_method': reservation.get_payment_method_display(),
+        'total_price': str(reservation.total_price),
+        'amount_paid': str(reservation.amount_paid),
+        'balance_due': str(reservation.balance_due),
+        'payments': [
+            {
+                'id': p.pk,
+                'date': p.payment_date.isoformat(),
+                'amount': str(p.amount),
+                'method': p.get_payment_method_display(),
+                'status': p.get_payment_status_display(),
+            }
+            for p in payments
+        ],
+    }
+
+
+def invoice_fingerprint(data):
+    payload = json.dumps({'layout': LAYOUT_VERSION, 'data': data}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cache_dir():
+    return Path(settings.INVOICE_CACHE_DIR)
+
+
+def cached_path(data, fingerprint):
+    return cache_dir() / f"invoice_{data['id']}_{fingerprint}.pdf"
+
+
+def store(data, fingerprint, content):
+    """Zapisuje plik atomowo (tymczasowy + rename) i usuwa starsze wersje tej faktury."""
+    path = cached_path(data, fingerprint)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    for old in path.parent.glob(f"invoice_{data['id']}_*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def get_or_render(data, fingerprint=None):
+    """Ścieżka do aktualnej faktury - renderuje ją tylko, jeśli nie ma jej na dysku."""
+    fingerprint = fingerprint or invoice_fingerprint(data)
+    path = cached_path(data, fingerprint)
+    if not path.exists():
+        path = store(data, fingerprint, pdf.render_invoice(data))
+    return path
+
+
+def month_reservations(year, month):
+    """Rezerwacje rozliczane w danym miesiącu (wg daty wyjazdu), bez anulowanych - także z archiwum."""
+    archived = ArchivedReservation.objects.select_related('guest__user', 'room').prefetch_related('payments')
+    querysets = [
+        queryset
+        .filter(check_out__year=year, check_out__month=month)
+        .exclude(status='cancelled')
+        .order_by('check_out', 'pk')
+        for queryset in (invoice_queryset(), archived)
+    ]
+    return sorted(chain(*querysets), key=lambda r: (r.check_out, r.pk))
+
+
+def month_invoices(year, month, workers=None):
+    """Generator (nazwa pliku, bajty PDF) dla wszystkich faktur miesiąca.
+
+    Faktury z dysku są czytane od razu, brakujące renderuje pula procesów.
+    """
+    items = []
+    for reservation in month_reservations(year, month):
+        data = invoice_context(reservation)
+        items.append((data, invoice_fingerprint(data)))
+
+    missing = [(data, fp) for data, fp in items if not cached_path(data, fp).exists()]
+    if missing:
+        workers = workers or getattr(settings, 'INVOICE_RENDER_WORKERS', None) or os.cpu_count()
+        if workers > 1 and len(missing) > 1:
+            # Każdy proces rejestruje czcionki i buduje szablony raz, przed pierwszą fakturą
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing)),
+                                     initializer=pdf.warm, initargs=pdf.font_paths()) as pool:
+                rendered = pool.map(pdf.render_invoice, [data for data, _ in missing], chunksize=4)
+                for (data, fp), content in zip(missing, rendered):
+                    store(data, fp, content)
+        else:
+            for data, fp in missing:
+                store(data, fp, pdf.render_invoice(data))
+
+    for data, fp in items:
+        yield f"faktura_{data['id']}.pdf", cached_path(data, fp).read_bytes()
+
+
+class _ZipSink(io.RawIOBase):
+    """Niepozycjonowalny strumień zbierający kolejne fragmenty archiwum."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        chunk = b''.join(self._chunks)
+        self._chunks = []
+        return chunk
+
+
+def stream_zip(entries):
+    """Składa archiwum ZIP z par (nazwa, bajty) i oddaje je fragmentami.
+
+    PDF-y są już skompresowane, więc pliki są zapisywane bez kompresji (ZIP_STORED).
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, content in entries:
+            archive.writestr(name, content)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()
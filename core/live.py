@@ -0,0 +1,195 @@
+"""Kanał zmian na żywo (Server-Sent Events) dla tablic recepcji, housekeepingu i techników.
+
+Sygnały Room/Reservation publikują po zatwierdzeniu transakcji małe zdarzenia
+(delty) do brokera, a widok ``employee:live_events`` przekazuje je otwartym
+tablicom przez SSE. Widok jest asynchroniczny i przeznaczony do pracy pod ASGI
+(config.asgi) - pod WSGI każde połączenie blokowałoby wątek serwera.
+
+Broker wybiera ustawienie ``LIVE_BROKER``:
+
+* ``core.live.InProcessBroker`` - rozgłaszanie w obrębie jednego procesu,
+* ``core.live.SpoolBroker`` - lokalny zamiennik brokera między procesami
+  (np. Redis pub/sub): zdarzenia trafiają do pliku ``LIVE_SPOOL_PATH``,
+  który każdy proces śledzi i rozsyła dalej swoim subskrybentom.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Kolejka zdarzeń jednego połączenia SSE, związana z jego pętlą asyncio."""
+
+    def __init__(self, broker, loop, max_queue):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def _put(self, event):
+        # Wolny klient traci najstarsze zdarzenia zamiast blokować publikujących
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Rozgłasza zdarzenia do subskrybentów w bieżącym procesie."""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Tworzy subskrypcję; wywoływać z wnętrza działającej pętli asyncio."""
+        subscription = Subscription(self, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, event):
+        """Przekazuje zdarzenie lokalnym subskrybentom (bezpieczne z dowolnego wątku)."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # Pętla już zamknięta - połączenie zniknęło bez sprzątania
+                self.unsubscribe(subscription)
+
+    def publish(self, event):
+        self.dispatch(event)
+
+
+class SpoolBroker(InProcessBroker):
+    """Broker między procesami oparty o plik JSON lines (zamiennik Redis pub/sub)."""
+
+    def __init__(self, path=None, poll_interval=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.path = str(path or settings.LIVE_SPOOL_PATH)
+        self.poll_interval = poll_interval
+        self._tail_thread = None
+
+    def publish(self, event):
+        line = json.dumps(event, default=str) + '\n'
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Krótki zapis w trybie append jest atomowy między procesami
+        with open(self.path, 'a', encoding='utf-8') as spool:
+            spool.write(line)
+
+    def subscribe(self):
+        self._ensure_tail()
+        return super().subscribe()
+
+    def _ensure_tail(self):
+        with self._lock:
+            if self._tail_thread is not None:
+                return
+            self._tail_thread = threading.Thread(target=self._tail, name='live-spool-tail', daemon=True)
+        self._tail_thread.start()
+
+    def _tail(self):
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        while True:
+            time.sleep(self.poll_interval)
+            if not os.path.exists(self.path):
+                continue
+            size = os.path.getsize(self.path)
+            if size < offset:
+                # Plik został obcięty/zrotowany
+                offset = 0
+            if size == offset:
+                continue
+            with open(self.path, 'rb') as spool:
+                spool.seek(offset)
+                chunk = spool.read()
+            # Ostatnia linia może być jeszcze niedopisana
+            complete, newline, _ = chunk.rpartition(b'\n')
+            if not newline:
+                continue
+            offset += len(complete) + 1
+            for line in complete.decode('utf-8').split('\n'):
+                if line:
+                    self.dispatch(json.loads(line))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'LIVE_BROKER', 'core.live.InProcessBroker'))()
+    return _broker
+
+
+def publish(event):
+    """Publikuje zdarzenie; błąd kanału na żywo nie może zepsuć zapisu danych."""
+    try:
+        get_broker().publish(event)
+    except Exception:
+        logger.exception("Nie udało się opublikować zdarzenia %s", event.get('type'))
+
+
+def room_event(room):
+    return {
+        'type': 'room',
+        'id': room.pk,
+        'number': room.number,
+        'status': room.status,
+        'status_display': room.get_status_display(),
+    }
+
+
+def reservation_event(reservation):
+    return {
+        'type': 'reservation',
+        'id': reservation.pk,
+        'room_id': reservation.room_id,
+        'status': reservation.status,
+        'status_display': reservation.get_status_display(),
+        'check_in': reservation.check_in.isoformat() if reservation.check_in else None,
+        'check_out': reservation.check_out.isoformat() if reservation.check_out else None,
+    }
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def event_stream(broker, keepalive=15):
+    """Generator odpowiedzi SSE: zdarzenia z brokera i komentarze podtrzymujące połączenie."""
+    subscription = broker.subscribe()
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        subscription.close()
@@ -0,0 +1,82 @@
+"""Zgłoszenia usterek: otwieranie, zamykanie, tablica działu technicznego i statystyki."""
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, FilteredRelation, Q
+from django.utils import timezone
+
+from .models import MaintenanceTicket, Room
+
+
+def open_ticket(room, reporter, source, title, description=''):
+    """Dopisuje nowe zgłoszenie i przełącza pokój w tryb naprawy."""
+    ticket = MaintenanceTicket.objects.create(
+        room=room,
+        reporter=reporter if reporter and reporter.is_authenticated else None,
+        source=source,
+        title=title[:200],
+        description=description or '',
+    )
+    if room.status != 'maintenance':
+        room.status = 'maintenance'
+        room.save()
+    return ticket
+
+
+def close_room_tickets(room):
+    """Zamyka wszystkie otwarte zgłoszenia pokoju. Zwraca liczbę zamkniętych."""
+    return MaintenanceTicket.objects.filter(room=room, status='open').update(
+        status='closed', closed_at=timezone.now()
+    )
+
+
+def maintenance_board():
+    """Pokoje w naprawie z ich otwartymi zgłoszeniami - jedno zapytanie (LEFT JOIN po indeksie status, room)."""
+    rows = (
+        Room.objects
+        .annotate(open_ticket=FilteredRelation('tickets', condition=Q(tickets__status='open')))
+        .filter(Q(status='maintenance') | Q(open_ticket__isnull=False))
+        .order_by('number', 'open_ticket__opened_at')
+        .values(
+            'id', 'number', 'status',
+            'open_ticket__id', 'open_ticket__title', 'open_ticket__description',
+            'open_ticket__source', 'open_ticket__opened_at',
+        )
+    )
+    source_labels = dict(MaintenanceTicket.SOURCE_CHOICES)
+    board = {}
+    for row in rows:
+        room = board.setdefault(row['id'], {
+            'id': row['id'], 'number': row['number'], 'status': row['status'], 'tickets': [],
+        })
+        if row['open_ticket__id']:
+            room['tickets'].append({
+                'id': row['open_ticket__id'],
+                'title': row['open_ticket__title'],
+                'description': row['open_ticket__description'],
+                'source': source_labels.get(row['open_ticket__source'], row['open_ticket__source']),
+                'opened_at': row['open_ticket__opened_at'],
+            })
+    return list(board.values())
+
+
+def repair_stats(since=None):
+    """Średni czas naprawy i liczba zgłoszeń (agregat SQL)."""
+    tickets = MaintenanceTicket.objects.all()
+    if since:
+        tickets = tickets.filter(opened_at__gte=since)
+    duration = ExpressionWrapper(F('closed_at') - F('opened_at'), output_field=DurationField())
+    return tickets.aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(status='open')),
+        mean_time_to_repair=Avg(duration, filter=Q(status='closed')),
+    )
+
+
+def tickets_per_room(since=None, limit=10):
+    """Pokoje z największą liczbą zgłoszeń (GROUP BY w SQL)."""
+    tickets = MaintenanceTicket.objects.all()
+    if since:
+        tickets = tickets.filter(opened_at__gte=since)
+    return list(
+        tickets.values('room__number')
+        .annotate(total=Count('id'), open=Count('id', filter=Q(status='open')))
+        .order_by('-total', 'room__number')[:limit]
+    )
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import archive
+
+
+class Command(BaseCommand):
+    help = "Przenosi zakończone i anulowane rezerwacje (z płatnościami) do archiwum (zwykle robi to worker run_tasks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, help="Dni od wyjazdu (domyślnie ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--batch-size', type=int, help="Rezerwacje w paczce (domyślnie ARCHIVE_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options['older_than'] is not None:
+            cutoff = timezone.localdate() - timedelta(days=options['older_than'])
+        moved = archive.archive(cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Przeniesiono do archiwum {moved} rezerwacji."))
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import changes
+
+
+class Command(BaseCommand):
+    help = "Dopisuje nowe zdarzenia dziennika zmian do pliku JSON Lines (ujście dla systemów zewnętrznych)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Plik docelowy (domyślnie CHANGE_SINK_PATH)")
+        parser.add_argument('--follow', action='store_true', help="Działa stale, dopisując nowe zdarzenia")
+        parser.add_argument('--interval', type=float, default=5, help="Odstęp sprawdzania w trybie --follow (s)")
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.CHANGE_SINK_PATH
+        while True:
+            written = changes.export(output)
+            if written or not options['follow']:
+                self.stdout.write(self.style.SUCCESS(f"Dopisano {written} zdarzeń do {output}."))
+            if not options['follow']:
+                return
+            time.sleep(options['interval'])
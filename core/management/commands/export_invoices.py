@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import invoices, pdf
+
+
+class Command(BaseCommand):
+    help = "Zapisuje do archiwum ZIP wszystkie faktury z danego miesiąca (renderowanie równoległe)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Miesiąc w formacie RRRR-MM (domyślnie bieżący)")
+        parser.add_argument('--output', help="Plik wynikowy (domyślnie faktury_RRRR_MM.zip)")
+        parser.add_argument('--workers', type=int, help="Liczba procesów renderujących")
+
+    def handle(self, *args, **options):
+        if not pdf.available():
+            raise CommandError("Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
+
+        if options['month']:
+            try:
+                year, month = (int(part) for part in options['month'].split('-'))
+            except ValueError:
+                raise CommandError("Miesiąc podaj w formacie RRRR-MM.")
+            if not 1 <= month <= 12:
+                raise CommandError("Nieprawidłowy miesiąc.")
+        else:
+            today = timezone.now().date()
+            year, month = today.year, today.month
+
+        output = options['output'] or f"faktury_{year}_{month:02d}.zip"
+        count = 0
+
+        def counted(entries):
+            nonlocal count
+            for entry in entries:
+                count += 1
+                yield entry
+
+        with open(output, 'wb') as archive:
+            for chunk in invoices.stream_zip(counted(invoices.month_invoices(year, month, options['workers']))):
+                archive.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Zapisano {count} faktur do {output}."))
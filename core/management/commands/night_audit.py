@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Zamyka dobę hotelową: niestawienia, przekroczone wyjazdy, przychód za noc "
+        "i statusy pokoi (uruchamiać raz na dobę, po północy)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Zamykana doba (RRRR-MM-DD), domyślnie wczorajsza")
+
+    def handle(self, *args, **options):
+        audit_date = None
+        if options['date']:
+            try:
+                audit_date = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("Nieprawidłowa data, użyj formatu RRRR-MM-DD.")
+
+        summary = audit.run(audit_date)
+        seconds = (summary.finished_at - summary.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Audyt doby {summary.audit_date} ({seconds:.2f} s): niestawienia {summary.no_shows}, "
+            f"przekroczone wyjazdy {summary.overdue}, noce {summary.postings} ({summary.revenue} PLN), "
+            f"pokoje zajęte +{summary.rooms_occupied}, do sprzątania +{summary.rooms_released}."
+        ))
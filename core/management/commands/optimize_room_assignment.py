@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import assignment
+from core.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Przydziela pokoje przyszłym rezerwacjom (oczekującym i potwierdzonym) tak, "
+        "aby wolne okna były jak najdłuższe. Domyślnie tylko pokazuje zmiany."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room-type', choices=[t for t, _ in Room.TYPE_CHOICES], help="Tylko ten typ pokoju")
+        parser.add_argument('--from', dest='start', help="Pierwszy dzień (RRRR-MM-DD), domyślnie dziś")
+        parser.add_argument('--apply', action='store_true', help="Zapisz nowy przydział")
+
+    def handle(self, *args, **options):
+        start = None
+        if options['start']:
+            try:
+                start = date.fromisoformat(options['start'])
+            except ValueError:
+                raise CommandError("Nieprawidłowa data, użyj formatu RRRR-MM-DD.")
+
+        room_types = [options['room_type']] if options['room_type'] else [t for t, _ in Room.TYPE_CHOICES]
+        for room_type in room_types:
+            result, changes, applied = assignment.optimize_room_type(room_type, start=start, apply=options['apply'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Typ: {room_type}"))
+            for reservation, old_room, new_room in changes:
+                old_number = old_room.number if old_room else '-'
+                self.stdout.write(
+                    f"  #{reservation.pk} {reservation.check_in} - {reservation.check_out}: "
+                    f"{old_number} -> {new_room.number}"
+                )
+            for reservation_id in result.unplaced:
+                self.stdout.write(self.style.WARNING(f"  #{reservation_id}: brak wolnego pokoju, bez zmian"))
+
+            before, after = result.before, result.after
+            self.stdout.write(
+                f"  Krótkie luki: {before['short_gaps']} -> {after['short_gaps']} "
+                f"({before['short_gap_nights']} -> {after['short_gap_nights']} nocy), "
+                f"najdłuższe wolne okno: {before['longest_free_block']} -> {after['longest_free_block']} nocy"
+            )
+            if applied:
+                self.stdout.write(self.style.SUCCESS(f"  Zapisano {len(changes)} zmian."))
+            elif options['apply'] and changes:
+                self.stdout.write(self.style.WARNING("  Nowy przydział nie zmniejsza rozdrobnienia - pominięto."))
+            elif changes:
+                self.stdout.write(f"  {len(changes)} zmian do zapisania (uruchom z --apply).")
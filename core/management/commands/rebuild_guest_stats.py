@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import guest_stats
+
+
+class Command(BaseCommand):
+    help = "Przelicza od zera statystyki gości (pobyty, noce, przychód, ostatnia wizyta) z rezerwacji i archiwum."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--guest', type=int, action='append', dest='guests', help="Tylko gość o podanym id (można powtórzyć)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = guest_stats.rebuild(options['guests'])
+        if fixed:
+            self.stdout.write(self.style.SUCCESS(f"Poprawiono statystyki {fixed} gości."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Statystyki gości są zgodne."))
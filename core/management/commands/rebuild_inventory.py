@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import inventory, rates
+
+
+class Command(BaseCommand):
+    help = "Przelicza rejestr pokoi według typu na cały horyzont i usuwa minione dni (uruchamiać raz na dobę)."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written, removed = inventory.rebuild_all()
+        first, last = rates.horizon()
+        self.stdout.write(self.style.SUCCESS(
+            f"Zapisano {written} wierszy rejestru ({first} - {last}), usunięto {removed} minionych."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Przebudowuje indeks wyszukiwania pełnotekstowego (rezerwacje, goście, pokoje)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Liczba dokumentów zapisywanych naraz")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = search.rebuild_index(batch_size=options['batch_size'])
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count}")
+        self.stdout.write(self.style.SUCCESS("Indeks wyszukiwania przebudowany."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import billing
+
+
+class Command(BaseCommand):
+    help = "Porównuje zapisane salda rezerwacji z sumą płatności i opcjonalnie je naprawia."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Zapisz przeliczone wartości")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            mismatches = billing.reconcile_balances(fix=options['fix'])
+        for pk, paid, expected_paid, balance, expected_balance in mismatches:
+            self.stdout.write(
+                f"Rezerwacja #{pk}: wpłacono {paid} (powinno {expected_paid}), "
+                f"saldo {balance} (powinno {expected_balance})"
+            )
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Wszystkie salda są zgodne."))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Naprawiono {len(mismatches)} sald."))
+        else:
+            self.stdout.write(self.style.WARNING(f"Rozbieżności: {len(mismatches)}. Uruchom z --fix, aby naprawić."))
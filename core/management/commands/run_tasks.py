@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core import taskqueue
+
+
+class Command(BaseCommand):
+    help = "Worker kolejki zadań: wykonuje zadania z bazy i zakłada zadania okresowe (TASK_SCHEDULE)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help="Liczba równoległych zadań (domyślnie TASK_WORKERS)")
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help="Pula wątków (domyślnie) albo procesów - dla zadań obciążających CPU")
+        parser.add_argument('--poll', type=float, help="Odstęp sprawdzania kolejki w sekundach (domyślnie TASK_POLL_INTERVAL)")
+        parser.add_argument('--once', action='store_true', help="Wykonaj zaległe zadania i zakończ")
+
+    def handle(self, *args, **options):
+        worker = taskqueue.Worker(workers=options['workers'], pool=options['pool'], poll_interval=options['poll'])
+        self.stdout.write(f"Worker: {worker.workers} x {worker.pool}, kolejka co {worker.poll_interval} s.")
+        try:
+            processed = worker.run(once=options['once'])
+        except KeyboardInterrupt:
+            self.stdout.write("Przerwano - niedokończone zadania wrócą do kolejki po upływie blokady.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Wykonano {processed} zadań."))
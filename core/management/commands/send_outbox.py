@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import notifications
+
+
+class Command(BaseCommand):
+    help = "Wysyła zaległe powiadomienia ze skrzynki nadawczej (zwykle robi to worker run_tasks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Wiadomości na połączenie (domyślnie OUTBOX_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        sent, failed = notifications.send_all(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wysłano {sent} wiadomości, nieudanych prób: {failed}."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import payments
+
+
+class Command(BaseCommand):
+    help = "Rozlicza oczekujące płatności online przez bramkę (zwykle robi to worker run_tasks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Płatności w paczce (domyślnie PAYMENT_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        counts = payments.settle_all(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Zrealizowane: {counts['completed']}, odrzucone: {counts['failed']}, do ponowienia: {counts['retried']}."
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import replica
+
+
+class Command(BaseCommand):
+    help = "Kopiuje bazę główną SQLite do pliku repliki (lokalna replika do odczytu raportów i API)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--follow', action='store_true', help="Działa stale, odświeżając replikę")
+        parser.add_argument('--interval', type=float, default=5, help="Odstęp odświeżania w trybie --follow (s)")
+
+    def handle(self, *args, **options):
+        while True:
+            # Zamknięte połączenia Django nie trzymają repliki podczas podmiany
+            connections.close_all()
+            started = time.perf_counter()
+            try:
+                replica.sync_sqlite()
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if not options['follow']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Replika odświeżona w {(time.perf_counter() - started) * 1000:.0f} ms."
+                ))
+                return
+            time.sleep(options['interval'])
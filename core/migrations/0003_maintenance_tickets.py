@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-19 12:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def import_room_notes(apps, schema_editor):
+    """Uwagi pokoi w naprawie stają się otwartymi zgłoszeniami."""
+    Room = apps.get_model('core', 'Room')
+    MaintenanceTicket = apps.get_model('core', 'MaintenanceTicket')
+    tickets = [
+        MaintenanceTicket(room=room, source='reception', title='Zgłoszenie z uwag pokoju', description=room.notes)
+        for room in Room.objects.filter(status='maintenance').exclude(notes='')
+    ]
+    MaintenanceTicket.objects.bulk_create(tickets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('reception', 'Recepcja'), ('housekeeping', 'Housekeeping'), ('maintenance', 'Dział techniczny')], default='reception', max_length=20, verbose_name='Źródło')),
+                ('title', models.CharField(max_length=200, verbose_name='Tytuł')),
+                ('description', models.TextField(blank=True, default='', verbose_name='Opis')),
+                ('opened_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Otwarto')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='Zamknięto')),
+                ('status', models.CharField(choices=[('open', 'Otwarte'), ('closed', 'Zamknięte')], default='open', max_length=10, verbose_name='Status')),
+                ('reporter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reported_tickets', to=settings.AUTH_USER_MODEL, verbose_name='Zgłaszający')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='core.room', verbose_name='Pokój')),
+            ],
+            options={
+                'verbose_name': 'Zgłoszenie usterki',
+                'verbose_name_plural': 'Zgłoszenia usterek',
+                'indexes': [models.Index(fields=['status', 'room'], name='core_ticket_status_room_idx')],
+            },
+        ),
+        migrations.RunPython(import_room_notes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-19 12:32
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def populate_balances(apps, schema_editor):
+    from decimal import Decimal
+    from django.db.models import Sum
+
+    Reservation = apps.get_model('core', 'Reservation')
+    Payment = apps.get_model('core', 'Payment')
+    paid = dict(
+        Payment.objects.filter(payment_status='completed')
+        .values('reservation_id').annotate(total=Sum('amount'))
+        .values_list('reservation_id', 'total')
+    )
+    reservations = list(Reservation.objects.only('id', 'total_price'))
+    for reservation in reservations:
+        reservation.amount_paid = paid.get(reservation.id) or Decimal('0.00')
+        reservation.balance_due = (reservation.total_price or Decimal('0.00')) - reservation.amount_paid
+    Reservation.objects.bulk_update(reservations, ['amount_paid', 'balance_due'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_maintenance_tickets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='Wpłacono'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='balance_due',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='Do zapłaty'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(models.OrderBy(models.F('balance_due'), descending=True), condition=models.Q(('balance_due__gt', 0)), name='core_res_outstanding_idx'),
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
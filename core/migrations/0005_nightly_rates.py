@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 12:41
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_reservation_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NightlyRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('multiplier', models.DecimalField(decimal_places=2, default=Decimal('1.00'), max_digits=4, verbose_name='Mnożnik ceny')),
+                ('price_from', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cena od')),
+                ('rooms_total', models.PositiveIntegerField(default=0, verbose_name='Liczba pokoi')),
+            ],
+            options={
+                'verbose_name': 'Stawka dzienna',
+                'verbose_name_plural': 'Stawki dzienne',
+                'indexes': [models.Index(fields=['date', 'room_type'], name='core_nightlyrate_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room_type', 'date'), name='core_nightlyrate_type_date_uniq')],
+            },
+        ),
+    ]
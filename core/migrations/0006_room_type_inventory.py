@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-19 12:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_room_types(apps, schema_editor):
+    from django.db.models import OuterRef, Subquery
+
+    Reservation = apps.get_model('core', 'Reservation')
+    Room = apps.get_model('core', 'Room')
+    Reservation.objects.filter(room__isnull=False).update(
+        room_type=Subquery(Room.objects.filter(pk=OuterRef('room_id')).values('room_type')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_nightly_rates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='room_type',
+            field=models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], default='double', max_length=20, verbose_name='Typ pokoju'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='core.room', verbose_name='Pokój'),
+        ),
+        migrations.CreateModel(
+            name='RoomTypeInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('total', models.IntegerField(default=0, verbose_name='Pokoje')),
+                ('booked', models.IntegerField(default=0, verbose_name='Zarezerwowane')),
+                ('out_of_order', models.IntegerField(default=0, verbose_name='Wyłączone')),
+            ],
+            options={
+                'verbose_name': 'Stan pokoi',
+                'verbose_name_plural': 'Stan pokoi',
+                'constraints': [models.UniqueConstraint(fields=('room_type', 'date'), name='core_inventory_type_date_uniq')],
+            },
+        ),
+        migrations.RunPython(copy_room_types, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_room_type_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='room_pinned',
+            field=models.BooleanField(default=False, help_text='Optymalizator przydziału nie przeniesie tej rezerwacji do innego pokoju.', verbose_name='Pokój przypięty'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 6.0 on 2026-10-19 12:52
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_reservation_room_pinned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NightAuditRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audit_date', models.DateField(unique=True, verbose_name='Zamykana doba')),
+                ('started_at', models.DateTimeField(verbose_name='Rozpoczęto')),
+                ('finished_at', models.DateTimeField(verbose_name='Zakończono')),
+                ('no_shows', models.PositiveIntegerField(default=0, verbose_name='Niestawienia')),
+                ('overdue', models.PositiveIntegerField(default=0, verbose_name='Przekroczone wyjazdy')),
+                ('postings', models.PositiveIntegerField(default=0, verbose_name='Zaksięgowane noce')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Przychód z pokoi')),
+                ('rooms_occupied', models.PositiveIntegerField(default=0, verbose_name='Pokoje oznaczone jako zajęte')),
+                ('rooms_released', models.PositiveIntegerField(default=0, verbose_name='Pokoje zwolnione')),
+            ],
+            options={
+                'verbose_name': 'Audyt nocny',
+                'verbose_name_plural': 'Audyty nocne',
+                'ordering': ['-audit_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RevenuePosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju')),
+                ('date', models.DateField(verbose_name='Noc')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kwota')),
+                ('posted_at', models.DateTimeField(auto_now_add=True, verbose_name='Zaksięgowano')),
+            ],
+            options={
+                'verbose_name': 'Przychód za noc',
+                'verbose_name_plural': 'Przychody za noce',
+            },
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='overdue',
+            field=models.BooleanField(default=False, verbose_name='Przekroczony wyjazd'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Oczekująca'), ('confirmed', 'Potwierdzona'), ('checked_in', 'Zameldowany'), ('completed', 'Zakończona'), ('cancelled', 'Anulowana'), ('no_show', 'Niestawienie się')], default='pending', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'check_in'], name='core_res_status_checkin_idx'),
+        ),
+        migrations.AddField(
+            model_name='revenueposting',
+            name='reservation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_postings', to='core.reservation', verbose_name='Rezerwacja'),
+        ),
+        migrations.AddField(
+            model_name='revenueposting',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_postings', to='core.room', verbose_name='Pokój'),
+        ),
+        migrations.AddIndex(
+            model_name='revenueposting',
+            index=models.Index(fields=['date', 'room_type'], name='core_posting_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='revenueposting',
+            constraint=models.UniqueConstraint(fields=('reservation', 'date'), name='core_posting_res_date_uniq'),
+        ),
+    ]
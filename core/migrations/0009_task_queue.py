@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-19 12:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_night_audit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodicTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Nazwa')),
+                ('task', models.CharField(max_length=200, verbose_name='Zadanie')),
+                ('cron', models.CharField(max_length=100, verbose_name='Harmonogram (cron)')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Argumenty')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Argumenty nazwane')),
+                ('enabled', models.BooleanField(default=True, verbose_name='Aktywne')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Ostatnie uruchomienie')),
+                ('next_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Następne uruchomienie')),
+            ],
+            options={
+                'verbose_name': 'Zadanie okresowe',
+                'verbose_name_plural': 'Zadania okresowe',
+            },
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Zadanie')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Argumenty')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Argumenty nazwane')),
+                ('status', models.CharField(choices=[('queued', 'W kolejce'), ('running', 'W trakcie'), ('done', 'Wykonane'), ('failed', 'Nieudane')], default='queued', max_length=10, verbose_name='Status')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Wykonać od')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Próby')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Limit prób')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=64, verbose_name='Worker')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Blokada do')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Ostatni błąd')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Utworzono')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Zakończono')),
+            ],
+            options={
+                'verbose_name': 'Zadanie',
+                'verbose_name_plural': 'Zadania',
+                'indexes': [models.Index(fields=['status', 'run_at'], name='core_task_status_run_at_idx')],
+            },
+        ),
+    ]
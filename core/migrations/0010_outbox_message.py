@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 12:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('reservation_confirmation', 'Potwierdzenie rezerwacji'), ('reservation_cancelled', 'Anulowanie rezerwacji')], max_length=40, verbose_name='Rodzaj')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Odbiorca')),
+                ('subject', models.CharField(max_length=200, verbose_name='Temat')),
+                ('body', models.TextField(verbose_name='Treść')),
+                ('status', models.CharField(choices=[('pending', 'Do wysłania'), ('sending', 'Wysyłana'), ('sent', 'Wysłana'), ('failed', 'Nieudana')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Próby')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Następna próba')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Blokada do')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Ostatni błąd')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Utworzono')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Wysłano')),
+                ('reservation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_messages', to='core.reservation', verbose_name='Rezerwacja')),
+            ],
+            options={
+                'verbose_name': 'Wiadomość do wysłania',
+                'verbose_name_plural': 'Wiadomości do wysłania',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='kind',
+            field=models.CharField(choices=[('reservation_confirmation', 'Potwierdzenie rezerwacji'), ('reservation_cancelled', 'Anulowanie rezerwacji'), ('account_invite', 'Zaproszenie do konta')], max_length=40, verbose_name='Rodzaj'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_outbox_account_invite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Próby rozliczenia'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Klucz idempotencji'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='last_error',
+            field=models.TextField(blank=True, verbose_name='Ostatni błąd'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Zablokowana do'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Następna próba'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_status', 'next_attempt_at'], name='core_pay_status_next_idx'),
+        ),
+    ]
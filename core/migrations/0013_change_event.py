@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 13:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_payment_settlement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('reservation', 'Rezerwacja'), ('payment', 'Płatność'), ('room', 'Pokój')], max_length=20, verbose_name='Typ obiektu')),
+                ('object_id', models.BigIntegerField(verbose_name='ID obiektu')),
+                ('action', models.CharField(choices=[('create', 'Utworzenie'), ('update', 'Zmiana'), ('delete', 'Usunięcie')], max_length=10, verbose_name='Operacja')),
+                ('changed', models.JSONField(blank=True, default=list, verbose_name='Zmienione pola')),
+                ('data', models.JSONField(default=dict, verbose_name='Stan obiektu')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Zapisano')),
+            ],
+            options={
+                'verbose_name': 'Zdarzenie zmiany',
+                'verbose_name_plural': 'Dziennik zmian',
+                'indexes': [models.Index(fields=['entity', 'object_id'], name='core_change_entity_obj_idx')],
+            },
+        ),
+    ]
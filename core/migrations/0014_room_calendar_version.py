@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_change_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='calendar_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Wersja kalendarza'),
+        ),
+    ]
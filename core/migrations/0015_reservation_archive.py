@@ -0,0 +1,92 @@
+# Generated by Django 6.0 on 2026-10-19 13:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_room_calendar_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReservation',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju')),
+                ('check_in', models.DateField(verbose_name='Data zameldowania')),
+                ('check_out', models.DateField(verbose_name='Data wymeldowania')),
+                ('number_of_guests', models.IntegerField(default=1, verbose_name='Liczba gości')),
+                ('status', models.CharField(choices=[('pending', 'Oczekująca'), ('confirmed', 'Potwierdzona'), ('checked_in', 'Zameldowany'), ('completed', 'Zakończona'), ('cancelled', 'Anulowana'), ('no_show', 'Niestawienie się')], max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField(verbose_name='Utworzono')),
+                ('total_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cena całkowita')),
+                ('payment_method', models.CharField(choices=[('cash', 'Gotówka'), ('online', 'Online')], default='cash', max_length=10, verbose_name='Metoda płatności')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notatki')),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='Wpłacono')),
+                ('balance_due', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='Do zapłaty')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Zarchiwizowano')),
+                ('guest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reservations', to='core.guestprofile', verbose_name='Gość')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reservations', to='core.room', verbose_name='Pokój')),
+            ],
+            options={
+                'verbose_name': 'Rezerwacja archiwalna',
+                'verbose_name_plural': 'Rezerwacje archiwalne',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kwota')),
+                ('payment_date', models.DateField(verbose_name='Data płatności')),
+                ('payment_method', models.CharField(choices=[('cash', 'Gotówka'), ('card', 'Karta'), ('transfer', 'Przelew'), ('online', 'Online')], max_length=10, verbose_name='Metoda płatności')),
+                ('payment_status', models.CharField(choices=[('pending', 'Oczekująca'), ('completed', 'Zrealizowana'), ('failed', 'Nieudana')], max_length=10, verbose_name='Status płatności')),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True, verbose_name='ID transakcji')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='core.archivedreservation', verbose_name='Rezerwacja')),
+            ],
+            options={
+                'verbose_name': 'Płatność archiwalna',
+                'verbose_name_plural': 'Płatności archiwalne',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedRevenuePosting',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju')),
+                ('date', models.DateField(verbose_name='Noc')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kwota')),
+                ('posted_at', models.DateTimeField(verbose_name='Zaksięgowano')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_postings', to='core.archivedreservation', verbose_name='Rezerwacja')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_revenue_postings', to='core.room', verbose_name='Pokój')),
+            ],
+            options={
+                'verbose_name': 'Przychód za noc (archiwum)',
+                'verbose_name_plural': 'Przychody za noce (archiwum)',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedreservation',
+            index=models.Index(fields=['guest', 'created_at'], name='core_arch_res_guest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedreservation',
+            index=models.Index(fields=['check_out'], name='core_arch_res_checkout_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedreservation',
+            index=models.Index(fields=['status', 'created_at'], name='core_arch_res_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpayment',
+            index=models.Index(fields=['payment_status', 'payment_date'], name='core_arch_pay_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrevenueposting',
+            index=models.Index(fields=['date', 'room_type'], name='core_arch_posting_date_idx'),
+        ),
+    ]
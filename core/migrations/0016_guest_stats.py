@@ -0,0 +1,75 @@
+# Generated by Django 6.0 on 2026-10-19 13:23
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_guest_stats(apps, schema_editor):
+    from collections import defaultdict
+    from django.db.models import Sum
+
+    GuestProfile = apps.get_model('core', 'GuestProfile')
+    stats = defaultdict(lambda: [0, 0, Decimal('0.00'), None])
+    for name in ('Reservation', 'ArchivedReservation'):
+        stays = apps.get_model('core', name).objects.filter(status__in=['checked_in', 'completed'])
+        for guest_id, check_in, check_out in stays.values_list('guest_id', 'check_in', 'check_out'):
+            row = stats[guest_id]
+            row[0] += 1
+            row[1] += max((check_out - check_in).days, 0)
+            row[3] = check_in if row[3] is None else max(row[3], check_in)
+    for name in ('Payment', 'ArchivedPayment'):
+        paid = (
+            apps.get_model('core', name).objects.filter(payment_status='completed')
+            .values('reservation__guest_id').annotate(total=Sum('amount')).order_by()
+        )
+        for row in paid:
+            stats[row['reservation__guest_id']][2] += row['total']
+    guests = list(GuestProfile.objects.filter(pk__in=list(stats)).only('id'))
+    for guest in guests:
+        guest.stays_count, guest.nights_count, guest.lifetime_revenue, guest.last_visit = stats[guest.pk]
+    GuestProfile.objects.bulk_update(guests, ['stays_count', 'nights_count', 'lifetime_revenue', 'last_visit'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_reservation_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guestprofile',
+            name='last_visit',
+            field=models.DateField(blank=True, null=True, verbose_name='Ostatnia wizyta'),
+        ),
+        migrations.AddField(
+            model_name='guestprofile',
+            name='lifetime_revenue',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Przychód'),
+        ),
+        migrations.AddField(
+            model_name='guestprofile',
+            name='nights_count',
+            field=models.IntegerField(default=0, verbose_name='Noce'),
+        ),
+        migrations.AddField(
+            model_name='guestprofile',
+            name='stays_count',
+            field=models.IntegerField(default=0, verbose_name='Pobyty'),
+        ),
+        migrations.AddIndex(
+            model_name='guestprofile',
+            index=models.Index(fields=['-lifetime_revenue', 'id'], name='core_guest_revenue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestprofile',
+            index=models.Index(fields=['-stays_count', 'id'], name='core_guest_stays_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestprofile',
+            index=models.Index(condition=models.Q(('last_visit__isnull', False)), fields=['-last_visit', 'id'], name='core_guest_last_visit_idx'),
+        ),
+        migrations.RunPython(populate_guest_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_guest_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='serviced_on',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Serwis pobytowy'),
+        ),
+    ]
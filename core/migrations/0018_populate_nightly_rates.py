@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-19 13:45
+
+from django.db import migrations
+
+
+def populate_nightly_rates(apps, schema_editor):
+    from datetime import timedelta
+    from decimal import Decimal
+    from django.conf import settings
+    from django.db.models import Count, Min, Q
+    from django.utils import timezone
+
+    Room = apps.get_model('core', 'Room')
+    SeasonPrice = apps.get_model('core', 'SeasonPrice')
+    NightlyRate = apps.get_model('core', 'NightlyRate')
+    start = timezone.now().date()
+    days = getattr(settings, 'NIGHTLY_RATE_HORIZON_DAYS', 548)
+    end = start + timedelta(days=days - 1)
+
+    stats = {
+        row['room_type']: (row['min_price'], row['total'])
+        for row in Room.objects.values('room_type').annotate(
+            min_price=Min('price'), total=Count('pk', filter=~Q(status='maintenance')),
+        )
+    }
+    seen = set()
+    seasons = []
+    prices = (
+        SeasonPrice.objects.filter(season__start_date__lte=end, season__end_date__gte=start)
+        .order_by('pk')
+        .values_list('season_id', 'room_type', 'season__start_date', 'season__end_date', 'price_multiplier')
+    )
+    for season_id, room_type, season_start, season_end, multiplier in prices:
+        if (season_id, room_type) not in seen:
+            seen.add((season_id, room_type))
+            seasons.append((room_type, season_start, season_end, multiplier))
+
+    rows = []
+    for room_type in ('single', 'double', 'suite'):
+        multipliers = [Decimal('1.00')] * days
+        for season_type, season_start, season_end, multiplier in seasons:
+            if season_type != room_type:
+                continue
+            for i in range(max((season_start - start).days, 0), min((season_end - start).days, days - 1) + 1):
+                multipliers[i] = max(multipliers[i], multiplier)
+        min_price, total = stats.get(room_type, (None, 0))
+        for i, multiplier in enumerate(multipliers):
+            rows.append(NightlyRate(
+                room_type=room_type,
+                date=start + timedelta(days=i),
+                multiplier=multiplier,
+                price_from=round(min_price * multiplier, 2) if min_price is not None else None,
+                rooms_total=total,
+            ))
+    NightlyRate.objects.filter(date__gte=start).delete()
+    NightlyRate.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_room_serviced_on'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_nightly_rates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,205 @@
+# Generated by Django 6.0 on 2026-10-19 13:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_populate_nightly_rates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='employeeprofile',
+            options={'verbose_name': 'Pracownik', 'verbose_name_plural': 'Pracownicy'},
+        ),
+        migrations.AlterModelOptions(
+            name='guestprofile',
+            options={'verbose_name': 'Gość', 'verbose_name_plural': 'Goście'},
+        ),
+        migrations.AlterModelOptions(
+            name='payment',
+            options={'verbose_name': 'Płatność', 'verbose_name_plural': 'Płatności'},
+        ),
+        migrations.AlterModelOptions(
+            name='reservation',
+            options={'verbose_name': 'Rezerwacja', 'verbose_name_plural': 'Rezerwacje'},
+        ),
+        migrations.AlterModelOptions(
+            name='room',
+            options={'verbose_name': 'Pokój', 'verbose_name_plural': 'Pokoje'},
+        ),
+        migrations.AlterModelOptions(
+            name='season',
+            options={'verbose_name': 'Sezon', 'verbose_name_plural': 'Sezony'},
+        ),
+        migrations.AlterModelOptions(
+            name='seasonprice',
+            options={'verbose_name': 'Cena sezonowa', 'verbose_name_plural': 'Ceny sezonowe'},
+        ),
+        migrations.AlterField(
+            model_name='employeeprofile',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=15, null=True, verbose_name='Numer telefonu'),
+        ),
+        migrations.AlterField(
+            model_name='employeeprofile',
+            name='role',
+            field=models.CharField(choices=[('receptionist', 'Recepcjonista'), ('manager', 'Kierownik'), ('maid', 'Pokojówka'), ('technician', 'Pracownik techniczny')], default='receptionist', max_length=20, verbose_name='Stanowisko'),
+        ),
+        migrations.AlterField(
+            model_name='employeeprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='employee_profile', to=settings.AUTH_USER_MODEL, verbose_name='Użytkownik'),
+        ),
+        migrations.AlterField(
+            model_name='guestprofile',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=15, null=True, verbose_name='Numer telefonu'),
+        ),
+        migrations.AlterField(
+            model_name='guestprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='guest_profile', to=settings.AUTH_USER_MODEL, verbose_name='Użytkownik'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kwota'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_date',
+            field=models.DateField(default=django.utils.timezone.now, verbose_name='Data płatności'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_method',
+            field=models.CharField(choices=[('cash', 'Gotówka'), ('card', 'Karta'), ('transfer', 'Przelew'), ('online', 'Online')], default='cash', max_length=10, verbose_name='Metoda płatności'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_status',
+            field=models.CharField(choices=[('pending', 'Oczekująca'), ('completed', 'Zrealizowana'), ('failed', 'Nieudana')], default='completed', max_length=10, verbose_name='Status płatności'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='reservation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='core.reservation', verbose_name='Rezerwacja'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='transaction_id',
+            field=models.CharField(blank=True, max_length=100, null=True, verbose_name='ID transakcji'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='check_in',
+            field=models.DateField(verbose_name='Data zameldowania'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='check_out',
+            field=models.DateField(verbose_name='Data wymeldowania'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Utworzono'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='guest',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='core.guestprofile', verbose_name='Gość'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='notes',
+            field=models.TextField(blank=True, help_text='Notatki do rezerwacji (np. uszkodzenia, dodatkowe opłaty)', null=True, verbose_name='Notatki'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='number_of_guests',
+            field=models.IntegerField(default=1, verbose_name='Liczba gości'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='payment_method',
+            field=models.CharField(choices=[('cash', 'Gotówka'), ('online', 'Online')], default='cash', max_length=10, verbose_name='Metoda płatności'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='reservation_pin',
+            field=models.CharField(blank=True, max_length=6, null=True, verbose_name='PIN'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cena całkowita'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='capacity',
+            field=models.IntegerField(default=2, verbose_name='Pojemność'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='notes',
+            field=models.TextField(blank=True, default='', verbose_name='Uwagi'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='number',
+            field=models.CharField(max_length=10, unique=True, verbose_name='Numer pokoju'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='price',
+            field=models.DecimalField(decimal_places=2, help_text='Cena bazowa za noc', max_digits=10, verbose_name='Cena'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='room_type',
+            field=models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], default='double', max_length=20, verbose_name='Typ pokoju'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='status',
+            field=models.CharField(choices=[('available', 'Wolny'), ('occupied', 'Zajęty'), ('dirty', 'Do sprzątania'), ('maintenance', 'W naprawie')], default='available', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AlterField(
+            model_name='season',
+            name='end_date',
+            field=models.DateField(verbose_name='Data końcowa'),
+        ),
+        migrations.AlterField(
+            model_name='season',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Nazwa sezonu'),
+        ),
+        migrations.AlterField(
+            model_name='season',
+            name='start_date',
+            field=models.DateField(verbose_name='Data początkowa'),
+        ),
+        migrations.AlterField(
+            model_name='seasonprice',
+            name='price_multiplier',
+            field=models.DecimalField(decimal_places=2, default=1.0, help_text='Mnożnik ceny bazowej (np. 1.5 dla +50%)', max_digits=4, verbose_name='Mnożnik ceny'),
+        ),
+        migrations.AlterField(
+            model_name='seasonprice',
+            name='room_type',
+            field=models.CharField(choices=[('single', 'Jednoosobowy'), ('double', 'Dwuosobowy'), ('suite', 'Apartament')], max_length=20, verbose_name='Typ pokoju'),
+        ),
+        migrations.AlterField(
+            model_name='seasonprice',
+            name='season',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='core.season', verbose_name='Sezon'),
+        ),
+    ]
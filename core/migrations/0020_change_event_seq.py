@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+def number_existing_events(apps, schema_editor):
+    """Dotychczasowe zdarzenia zachowują numer równy id - kursory odbiorców pozostają ważne."""
+    ChangeEvent = apps.get_model('core', 'ChangeEvent')
+    ChangeEvent.objects.update(seq=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_model_verbose_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changeevent',
+            name='seq',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Numer kolejny'),
+        ),
+        migrations.RunPython(number_existing_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-19 13:50
+
+from django.db import migrations
+
+
+def populate_room_type_inventory(apps, schema_editor):
+    from datetime import timedelta
+    from django.conf import settings
+    from django.utils import timezone
+
+    Room = apps.get_model('core', 'Room')
+    Reservation = apps.get_model('core', 'Reservation')
+    RoomTypeInventory = apps.get_model('core', 'RoomTypeInventory')
+    start = timezone.now().date()
+    days = getattr(settings, 'NIGHTLY_RATE_HORIZON_DAYS', 548)
+    end = start + timedelta(days=days - 1)
+    room_types = ('single', 'double', 'suite')
+
+    totals = {t: 0 for t in room_types}
+    broken = {t: 0 for t in room_types}
+    for room_type, status in Room.objects.values_list('room_type', 'status'):
+        totals[room_type] = totals.get(room_type, 0) + 1
+        if status == 'maintenance':
+            broken[room_type] = broken.get(room_type, 0) + 1
+
+    booked = {t: [0] * (days + 1) for t in room_types}
+    reservations = Reservation.objects.filter(
+        check_in__lte=end, check_out__gt=start, status__in=['pending', 'confirmed', 'checked_in'],
+    ).values_list('room_type', 'check_in', 'check_out')
+    for room_type, check_in, check_out in reservations:
+        diff = booked.setdefault(room_type, [0] * (days + 1))
+        diff[max((check_in - start).days, 0)] += 1
+        diff[min((check_out - start).days, days)] -= 1
+
+    rows = []
+    for room_type in room_types:
+        running = 0
+        for i in range(days):
+            running += booked[room_type][i]
+            rows.append(RoomTypeInventory(
+                room_type=room_type,
+                date=start + timedelta(days=i),
+                total=totals[room_type],
+                booked=running,
+                out_of_order=broken[room_type],
+            ))
+    RoomTypeInventory.objects.filter(date__gte=start).delete()
+    RoomTypeInventory.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_change_event_seq'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_room_type_inventory, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from datetime import timedelta
 from django.utils import timezone
 from decimal import Decimal
@@ -7,16 +9,41 @@ from decimal import Decimal
 # Modele Użytkowników
 
 class GuestProfile(models.Model):
+    STATS_FIELDS = ('stays_count', 'nights_count', 'lifetime_revenue', 'last_visit')
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='guest_profile', verbose_name="Użytkownik")
     phone_number = models.CharField(max_length=15, blank=True, null=True, verbose_name="Numer telefonu")
+    # Statystyki zdenormalizowane - utrzymywane przez core.guest_stats przy zmianach rezerwacji i płatności
+    stays_count = models.IntegerField(default=0, verbose_name="Pobyty")
+    nights_count = models.IntegerField(default=0, verbose_name="Noce")
+    lifetime_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name="Przychód")
+    last_visit = models.DateField(blank=True, null=True, verbose_name="Ostatnia wizyta")
 
     class Meta:
         verbose_name = "Gość"
         verbose_name_plural = "Goście"
+        indexes = [
+            # Sortowanie listy gości (employee_guests) czyta wprost z indeksu
+            models.Index(fields=['-lifetime_revenue', 'id'], name='core_guest_revenue_idx'),
+            models.Index(fields=['-stays_count', 'id'], name='core_guest_stays_idx'),
+            models.Index(
+                fields=['-last_visit', 'id'], name='core_guest_last_visit_idx',
+                condition=models.Q(last_visit__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} (Gość)"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Statystyki należą do core.guest_stats - nieaktualna kopia w pamięci
+            # (np. formularz profilu) nie może nadpisać zmian z sygnałów
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name not in self.STATS_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 class EmployeeProfile(models.Model):
     ROLE_CHOICES = (
         ('receptionist', 'Recepcjonista'),
@@ -37,6 +64,15 @@ class EmployeeProfile(models.Model):
 
 # Pokoje i Sezony
 
+def _remember_db_values(instance, field_names, values):
+    """Zapamiętuje wartości pól wczytane z bazy - sygnały porównują je z bieżącymi."""
+    instance._loaded_values = dict(zip(field_names, values))
+
+
+def field_changed(instance, attname):
+    loaded = getattr(instance, '_loaded_values', None)
+    return loaded is None or loaded.get(attname) != getattr(instance, attname)
+
 class Room(models.Model):
     TYPE_CHOICES = (
         ('single', 'Jednoosobowy'),
@@ -56,6 +92,10 @@ class Room(models.Model):
     room_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='double', verbose_name="Typ pokoju")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available', verbose_name="Status")
     notes = models.TextField(blank=True, default='', verbose_name="Uwagi")
+    # Podbijana przy zmianach wpływających na kanał iCal (core.calendars)
+    calendar_version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Wersja kalendarza")
+    # Dzień ostatniego serwisu pobytowego (core.housekeeping) - bez zmiany statusu zajętego pokoju
+    serviced_on = models.DateField(blank=True, null=True, editable=False, verbose_name="Serwis pobytowy")
 
     class Meta:
         verbose_name = "Pokój"
@@ -64,6 +104,26 @@ class Room(models.Model):
     def __str__(self):
         return f"Pokój {self.number} ({self.get_room_type_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _remember_db_values(instance, field_names, values)
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # calendar_version i serviced_on zapisują UPDATE-y z core.calendars
+            # i core.housekeeping - nieaktualna kopia w pamięci nie może ich cofnąć
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('calendar_version', 'serviced_on')
+            ]
+        # Zapis pokoju i zdarzenia dziennika zmian (sygnał) w jednej transakcji
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        names = [f.attname for f in self._meta.concrete_fields]
+        _remember_db_values(self, names, [getattr(self, n) for n in names])
+
 class Season(models.Model):
     name = models.CharField(max_length=100, verbose_name="Nazwa sezonu")
     start_date = models.DateField(verbose_name="Data początkowa")
@@ -76,6 +136,17 @@ class Season(models.Model):
     def __str__(self):
         return f"{self.name} ({self.start_date} - {self.end_date})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _remember_db_values(instance, field_names, values)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        names = [f.attname for f in self._meta.concrete_fields]
+        _remember_db_values(self, names, [getattr(self, n) for n in names])
+
 class SeasonPrice(models.Model):
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='prices', verbose_name="Sezon")
     room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
@@ -88,6 +159,60 @@ class SeasonPrice(models.Model):
     def __str__(self):
         return f"{self.season.name} - {self.get_room_type_display()} (x{self.price_multiplier})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _remember_db_values(instance, field_names, values)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        names = [f.attname for f in self._meta.concrete_fields]
+        _remember_db_values(self, names, [getattr(self, n) for n in names])
+
+class NightlyRate(models.Model):
+    """Zmaterializowana stawka typu pokoju na jedną noc (patrz core.rates)."""
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
+    date = models.DateField(verbose_name="Data")
+    multiplier = models.DecimalField(max_digits=4, decimal_places=2, default=Decimal('1.00'), verbose_name="Mnożnik ceny")
+    price_from = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Cena od")
+    rooms_total = models.PositiveIntegerField(default=0, verbose_name="Liczba pokoi")
+
+    class Meta:
+        verbose_name = "Stawka dzienna"
+        verbose_name_plural = "Stawki dzienne"
+        constraints = [
+            models.UniqueConstraint(fields=['room_type', 'date'], name='core_nightlyrate_type_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'room_type'], name='core_nightlyrate_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_room_type_display()} {self.date}: x{self.multiplier}"
+
+class RoomTypeInventory(models.Model):
+    """Dzienny stan pokoi danego typu: do sprzedaży, zarezerwowane, wyłączone (patrz core.inventory)."""
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
+    date = models.DateField(verbose_name="Data")
+    total = models.IntegerField(default=0, verbose_name="Pokoje")
+    booked = models.IntegerField(default=0, verbose_name="Zarezerwowane")
+    out_of_order = models.IntegerField(default=0, verbose_name="Wyłączone")
+
+    class Meta:
+        verbose_name = "Stan pokoi"
+        verbose_name_plural = "Stan pokoi"
+        constraints = [
+            models.UniqueConstraint(fields=['room_type', 'date'], name='core_inventory_type_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_room_type_display()} {self.date}: {self.available}/{self.total}"
+
+    @property
+    def available(self):
+        return self.total - self.booked - self.out_of_order
+
 # Rezerwacje
 
 class Reservation(models.Model):
@@ -97,6 +222,7 @@ class Reservation(models.Model):
         ('checked_in', 'Zameldowany'),
         ('completed', 'Zakończona'),
         ('cancelled', 'Anulowana'),
+        ('no_show', 'Niestawienie się'),
     )
     PAYMENT_CHOICES = (
         ('cash', 'Gotówka'),
@@ -104,7 +230,10 @@ class Reservation(models.Model):
     )
 
     guest = models.ForeignKey(GuestProfile, on_delete=models.CASCADE, related_name='reservations', verbose_name="Gość")
-    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='reservations', verbose_name="Pokój")
+    # Pokój może zostać przydzielony dopiero przy zameldowaniu - wtedy liczy się typ (core.inventory)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, null=True, blank=True, related_name='reservations', verbose_name="Pokój")
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, default='double', verbose_name="Typ pokoju")
+    room_pinned = models.BooleanField(default=False, verbose_name="Pokój przypięty", help_text="Optymalizator przydziału nie przeniesie tej rezerwacji do innego pokoju.")
     check_in = models.DateField(verbose_name="Data zameldowania")
     check_out = models.DateField(verbose_name="Data wymeldowania")
     number_of_guests = models.IntegerField(default=1, verbose_name="Liczba gości")
@@ -114,14 +243,59 @@ class Reservation(models.Model):
     reservation_pin = models.CharField(max_length=6, blank=True, null=True, verbose_name="PIN")
     payment_method = models.CharField(max_length=10, choices=PAYMENT_CHOICES, default='cash', verbose_name="Metoda płatności")
     notes = models.TextField(blank=True, null=True, help_text="Notatki do rezerwacji (np. uszkodzenia, dodatkowe opłaty)", verbose_name="Notatki")
+    # Pola zdenormalizowane - utrzymywane przez core.billing przy każdej zmianie płatności
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), verbose_name="Wpłacono")
+    balance_due = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), verbose_name="Do zapłaty")
+    # Ustawiane przez audyt nocny (core.audit) - gość zameldowany po terminie wyjazdu
+    overdue = models.BooleanField(default=False, verbose_name="Przekroczony wyjazd")
 
     class Meta:
         verbose_name = "Rezerwacja"
         verbose_name_plural = "Rezerwacje"
+        indexes = [
+            models.Index(fields=['status', 'check_in'], name='core_res_status_checkin_idx'),
+            models.Index(
+                F('balance_due').desc(), name='core_res_outstanding_idx',
+                condition=models.Q(balance_due__gt=0),
+            ),
+        ]
     
     def __str__(self):
         return f"Rezerwacja {self.id} - {self.guest.user.username}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _remember_db_values(instance, field_names, values)
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.room_id is not None and 'room' in self._state.fields_cache:
+            self.room_type = self.room.room_type
+        elif self.room_id is not None and field_changed(self, 'room_id'):
+            self.room_type = Room.objects.values_list('room_type', flat=True).get(pk=self.room_id)
+        total = Decimal(self.total_price or 0)
+        with transaction.atomic():
+            if self._state.adding:
+                self.balance_due = total - Decimal(self.amount_paid or 0)
+                super().save(*args, **kwargs)
+            else:
+                # amount_paid należy do płatności - nieaktualna kopia w pamięci
+                # nie może nadpisać wpłat zapisanych w międzyczasie
+                update_fields = kwargs.pop('update_fields', None)
+                if update_fields is None:
+                    update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+                update_fields = [f for f in update_fields if f != 'amount_paid']
+                if 'balance_due' not in update_fields:
+                    update_fields.append('balance_due')
+                self.balance_due = Value(total) - F('amount_paid')
+                try:
+                    super().save(*args, update_fields=update_fields, **kwargs)
+                finally:
+                    self.balance_due = total - Decimal(self.amount_paid or 0)
+        names = [f.attname for f in self._meta.concrete_fields]
+        _remember_db_values(self, names, [getattr(self, n) for n in names])
+
     @property
     def is_paid(self):
         return self.status in ['confirmed', 'checked_in', 'completed']
@@ -133,7 +307,7 @@ class Reservation(models.Model):
             nights = (self.check_out - self.check_in).days
             if nights > 0:
                 return round(self.total_price / nights, 2)
-        return self.room.price
+        return self.room.price if self.room_id else None
 
 class Payment(models.Model):
     PAYMENT_METHODS = (
@@ -153,33 +327,329 @@ class Payment(models.Model):
     payment_method = models.CharField(max_length=10, choices=PAYMENT_METHODS, default='cash', verbose_name="Metoda płatności")
     payment_status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='completed', verbose_name="Status płatności")
     transaction_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="ID transakcji")
+    # Rozliczenie płatności online w tle (core.payments)
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True, verbose_name="Klucz idempotencji")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Próby rozliczenia")
+    next_attempt_at = models.DateTimeField(null=True, blank=True, verbose_name="Następna próba")
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name="Zablokowana do")
+    last_error = models.TextField(blank=True, verbose_name="Ostatni błąd")
 
     class Meta:
         verbose_name = "Płatność"
         verbose_name_plural = "Płatności"
+        indexes = [
+            models.Index(fields=['payment_status', 'next_attempt_at'], name='core_pay_status_next_idx'),
+        ]
 
     def __str__(self):
         return f"Płatność {self.id} ({self.amount} PLN)"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _remember_db_values(instance, field_names, values)
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Zapis płatności i korekta salda rezerwacji (sygnał) w jednej transakcji
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        names = [f.attname for f in self._meta.concrete_fields]
+        _remember_db_values(self, names, [getattr(self, n) for n in names])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+# Zgłoszenia usterek
+
+class MaintenanceTicket(models.Model):
+    """Zgłoszenie usterki pokoju. Rekordy są tylko dopisywane i zamykane, nigdy nadpisywane."""
+    SOURCE_CHOICES = (
+        ('reception', 'Recepcja'),
+        ('housekeeping', 'Housekeeping'),
+        ('maintenance', 'Dział techniczny'),
+    )
+    STATUS_CHOICES = (
+        ('open', 'Otwarte'),
+        ('closed', 'Zamknięte'),
+    )
+
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='tickets', verbose_name="Pokój")
+    reporter = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reported_tickets', verbose_name="Zgłaszający")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='reception', verbose_name="Źródło")
+    title = models.CharField(max_length=200, verbose_name="Tytuł")
+    description = models.TextField(blank=True, default='', verbose_name="Opis")
+    opened_at = models.DateTimeField(default=timezone.now, verbose_name="Otwarto")
+    closed_at = models.DateTimeField(blank=True, null=True, verbose_name="Zamknięto")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open', verbose_name="Status")
+
+    class Meta:
+        verbose_name = "Zgłoszenie usterki"
+        verbose_name_plural = "Zgłoszenia usterek"
+        indexes = [
+            models.Index(fields=['status', 'room'], name='core_ticket_status_room_idx'),
+        ]
+
+    def __str__(self):
+        return f"Usterka {self.id} - pokój {self.room_id}: {self.title}"
+
+# Audyt nocny
+
+class RevenuePosting(models.Model):
+    """Przychód za jedną noc pobytu zaksięgowany przez audyt nocny."""
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='revenue_postings', verbose_name="Rezerwacja")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='revenue_postings', verbose_name="Pokój")
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
+    date = models.DateField(verbose_name="Noc")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kwota")
+    posted_at = models.DateTimeField(auto_now_add=True, verbose_name="Zaksięgowano")
+
+    class Meta:
+        verbose_name = "Przychód za noc"
+        verbose_name_plural = "Przychody za noce"
+        constraints = [
+            models.UniqueConstraint(fields=['reservation', 'date'], name='core_posting_res_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'room_type'], name='core_posting_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date}: rezerwacja {self.reservation_id} ({self.amount} PLN)"
+
+
+class NightAuditRun(models.Model):
+    """Podsumowanie jednego zamknięcia doby (manage.py night_audit)."""
+    audit_date = models.DateField(unique=True, verbose_name="Zamykana doba")
+    started_at = models.DateTimeField(verbose_name="Rozpoczęto")
+    finished_at = models.DateTimeField(verbose_name="Zakończono")
+    no_shows = models.PositiveIntegerField(default=0, verbose_name="Niestawienia")
+    overdue = models.PositiveIntegerField(default=0, verbose_name="Przekroczone wyjazdy")
+    postings = models.PositiveIntegerField(default=0, verbose_name="Zaksięgowane noce")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name="Przychód z pokoi")
+    rooms_occupied = models.PositiveIntegerField(default=0, verbose_name="Pokoje oznaczone jako zajęte")
+    rooms_released = models.PositiveIntegerField(default=0, verbose_name="Pokoje zwolnione")
+
+    class Meta:
+        verbose_name = "Audyt nocny"
+        verbose_name_plural = "Audyty nocne"
+        ordering = ['-audit_date']
+
+    def __str__(self):
+        return f"Audyt {self.audit_date}"
+
+# Kolejka zadań (core.taskqueue)
+
+class Task(models.Model):
+    """Zadanie odłożone do wykonania przez ``manage.py run_tasks``."""
+    STATUS_CHOICES = (
+        ('queued', 'W kolejce'),
+        ('running', 'W trakcie'),
+        ('done', 'Wykonane'),
+        ('failed', 'Nieudane'),
+    )
+
+    name = models.CharField(max_length=200, verbose_name="Zadanie")
+    args = models.JSONField(default=list, blank=True, verbose_name="Argumenty")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="Argumenty nazwane")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name="Status")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Wykonać od")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Próby")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Limit prób")
+    locked_by = models.CharField(max_length=64, blank=True, default='', verbose_name="Worker")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Blokada do")
+    last_error = models.TextField(blank=True, default='', verbose_name="Ostatni błąd")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Utworzono")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Zakończono")
+
+    class Meta:
+        verbose_name = "Zadanie"
+        verbose_name_plural = "Zadania"
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='core_task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class PeriodicTask(models.Model):
+    """Harmonogram zadania cyklicznego w składni cron (minuta godzina dzień miesiąc dzień_tygodnia)."""
+    name = models.CharField(max_length=100, unique=True, verbose_name="Nazwa")
+    task = models.CharField(max_length=200, verbose_name="Zadanie")
+    cron = models.CharField(max_length=100, verbose_name="Harmonogram (cron)")
+    args = models.JSONField(default=list, blank=True, verbose_name="Argumenty")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="Argumenty nazwane")
+    enabled = models.BooleanField(default=True, verbose_name="Aktywne")
+    last_run_at = models.DateTimeField(blank=True, null=True, verbose_name="Ostatnie uruchomienie")
+    next_run_at = models.DateTimeField(blank=True, null=True, verbose_name="Następne uruchomienie")
+
+    class Meta:
+        verbose_name = "Zadanie okresowe"
+        verbose_name_plural = "Zadania okresowe"
+
+    def __str__(self):
+        return f"{self.name} ({self.cron})"
+
+    def clean(self):
+        from .taskqueue import Cron
+        try:
+            Cron(self.cron)
+        except ValueError as e:
+            raise ValidationError({'cron': str(e)})
+
+# Powiadomienia (core.notifications)
+
+class OutboxMessage(models.Model):
+    """Wiadomość zapisana w tej samej transakcji co zmiana rezerwacji, wysyłana w tle."""
+    KIND_CHOICES = (
+        ('reservation_confirmation', 'Potwierdzenie rezerwacji'),
+        ('reservation_cancelled', 'Anulowanie rezerwacji'),
+        ('account_invite', 'Zaproszenie do konta'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Do wysłania'),
+        ('sending', 'Wysyłana'),
+        ('sent', 'Wysłana'),
+        ('failed', 'Nieudana'),
+    )
+
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES, verbose_name="Rodzaj")
+    reservation = models.ForeignKey(Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_messages', verbose_name="Rezerwacja")
+    recipient = models.EmailField(verbose_name="Odbiorca")
+    subject = models.CharField(max_length=200, verbose_name="Temat")
+    body = models.TextField(verbose_name="Treść")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Próby")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Następna próba")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Blokada do")
+    last_error = models.TextField(blank=True, default='', verbose_name="Ostatni błąd")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Utworzono")
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name="Wysłano")
+
+    class Meta:
+        verbose_name = "Wiadomość do wysłania"
+        verbose_name_plural = "Wiadomości do wysłania"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} -> {self.recipient}"
+
+# Archiwum (core.archive) - zakończone, anulowane i niezrealizowane rezerwacje
+# przeniesione z tabel bieżących razem z płatnościami i zaksięgowanymi nocami. Identyfikatory są
+# zachowane, więc odwołania (np. w dzienniku zmian) nadal wskazują ten sam obiekt.
+
+class ArchivedReservation(models.Model):
+    # Szablony odróżniają rezerwację z archiwum od bieżącej
+    archived = True
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    guest = models.ForeignKey(GuestProfile, on_delete=models.CASCADE, related_name='archived_reservations', verbose_name="Gość")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_reservations', verbose_name="Pokój")
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
+    check_in = models.DateField(verbose_name="Data zameldowania")
+    check_out = models.DateField(verbose_name="Data wymeldowania")
+    number_of_guests = models.IntegerField(default=1, verbose_name="Liczba gości")
+    status = models.CharField(max_length=20, choices=Reservation.STATUS_CHOICES, verbose_name="Status")
+    created_at = models.DateTimeField(verbose_name="Utworzono")
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Cena całkowita")
+    payment_method = models.CharField(max_length=10, choices=Reservation.PAYMENT_CHOICES, default='cash', verbose_name="Metoda płatności")
+    notes = models.TextField(blank=True, null=True, verbose_name="Notatki")
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), verbose_name="Wpłacono")
+    balance_due = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), verbose_name="Do zapłaty")
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name="Zarchiwizowano")
+
+    class Meta:
+        verbose_name = "Rezerwacja archiwalna"
+        verbose_name_plural = "Rezerwacje archiwalne"
+        indexes = [
+            models.Index(fields=['guest', 'created_at'], name='core_arch_res_guest_idx'),
+            models.Index(fields=['check_out'], name='core_arch_res_checkout_idx'),
+            models.Index(fields=['status', 'created_at'], name='core_arch_res_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Rezerwacja {self.id} (archiwum)"
+
+
+class ArchivedPayment(models.Model):
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    reservation = models.ForeignKey(ArchivedReservation, on_delete=models.CASCADE, related_name='payments', verbose_name="Rezerwacja")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kwota")
+    payment_date = models.DateField(verbose_name="Data płatności")
+    payment_method = models.CharField(max_length=10, choices=Payment.PAYMENT_METHODS, verbose_name="Metoda płatności")
+    payment_status = models.CharField(max_length=10, choices=Payment.STATUS_CHOICES, verbose_name="Status płatności")
+    transaction_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="ID transakcji")
+
+    class Meta:
+        verbose_name = "Płatność archiwalna"
+        verbose_name_plural = "Płatności archiwalne"
+        indexes = [
+            models.Index(fields=['payment_status', 'payment_date'], name='core_arch_pay_status_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Płatność {self.id} ({self.amount} PLN, archiwum)"
+
+
+class ArchivedRevenuePosting(models.Model):
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    reservation = models.ForeignKey(ArchivedReservation, on_delete=models.CASCADE, related_name='revenue_postings', verbose_name="Rezerwacja")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_revenue_postings', verbose_name="Pokój")
+    room_type = models.CharField(max_length=20, choices=Room.TYPE_CHOICES, verbose_name="Typ pokoju")
+    date = models.DateField(verbose_name="Noc")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kwota")
+    posted_at = models.DateTimeField(verbose_name="Zaksięgowano")
+
+    class Meta:
+        verbose_name = "Przychód za noc (archiwum)"
+        verbose_name_plural = "Przychody za noce (archiwum)"
+        indexes = [
+            models.Index(fields=['date', 'room_type'], name='core_arch_posting_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date}: rezerwacja {self.reservation_id} ({self.amount} PLN, archiwum)"
+
 # Funkcja obliczająca cenę rezerwacji
 
 def compute_reservation_price(reservation):
     """Oblicza cenę rezerwacji, sprawdzając czy data pobytu wpada w zdefiniowane sezony."""
     room = reservation.room
+    if room is not None:
+        room_type, base_price = room.room_type, room.price
+    else:
+        # Rezerwacja na typ pokoju (bez przydziału) - cena najtańszego pokoju tego typu
+        room_type = reservation.room_type
+        base_price = Room.objects.filter(room_type=room_type).aggregate(price=models.Min('price'))['price'] or Decimal('0.00')
     start_date = reservation.check_in
     end_date = reservation.check_out
 
+    # Szybka ścieżka: mnożniki z tabeli NightlyRate, jeśli pokrywa cały pobyt
+    nights = (end_date - start_date).days
+    if nights > 0:
+        multipliers = list(
+            NightlyRate.objects
+            .filter(room_type=room_type, date__gte=start_date, date__lt=end_date)
+            .values_list('multiplier', flat=True)
+        )
+        if len(multipliers) == nights:
+            return round(sum((base_price * m for m in multipliers), Decimal('0.00')), 2)
+
     total_price = Decimal('0.00')
     current_date = start_date
     
 
     while current_date < end_date:
-        day_price = room.price
+        day_price = base_price
         active_seasons = Season.objects.filter(start_date__lte=current_date, end_date__gte=current_date)
 
         multiplier = Decimal('1.0')
         for season in active_seasons:
-            season_price = SeasonPrice.objects.filter(season=season, room_type=room.room_type).first()
+            season_price = SeasonPrice.objects.filter(season=season, room_type=room_type).first()
             if season_price:
                 if season_price.price_multiplier > multiplier:
                     multiplier = season_price.price_multiplier
@@ -187,4 +657,63 @@ def compute_reservation_price(reservation):
         total_price += day_price * multiplier
         current_date += timedelta(days=1)
         
-    return round(total_price, 2)
\ No newline at end of file
+    return round(total_price, 2)
+
+# Dziennik zmian (core.changes)
+
+class ChangeEvent(models.Model):
+    """Zdarzenie dziennika zmian (core.changes) - tylko dopisywane, ``seq`` nadawany po zatwierdzeniu."""
+    ENTITY_CHOICES = (
+        ('reservation', 'Rezerwacja'),
+        ('payment', 'Płatność'),
+        ('room', 'Pokój'),
+    )
+    ACTION_CHOICES = (
+        ('create', 'Utworzenie'),
+        ('update', 'Zmiana'),
+        ('delete', 'Usunięcie'),
+    )
+
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES, verbose_name="Typ obiektu")
+    object_id = models.BigIntegerField(verbose_name="ID obiektu")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Operacja")
+    changed = models.JSONField(default=list, blank=True, verbose_name="Zmienione pola")
+    data = models.JSONField(default=dict, verbose_name="Stan obiektu")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Zapisano")
+    seq = models.BigIntegerField(null=True, blank=True, unique=True, editable=False, verbose_name="Numer kolejny")
+
+    class Meta:
+        verbose_name = "Zdarzenie zmiany"
+        verbose_name_plural = "Dziennik zmian"
+        indexes = [
+            models.Index(fields=['entity', 'object_id'], name='core_change_entity_obj_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.entity} {self.object_id} {self.action}"
+
+
+# Wyszukiwanie pełnotekstowe
+
+class SearchDocument(models.Model):
+    """Zdenormalizowany dokument indeksu wyszukiwania (patrz core.search)."""
+    KIND_CHOICES = (
+        ('reservation', 'Rezerwacja'),
+        ('guest', 'Gość'),
+        ('room', 'Pokój'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Typ obiektu")
+    object_id = models.BigIntegerField(verbose_name="ID obiektu")
+    content = models.TextField(verbose_name="Treść")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Zaktualizowano")
+
+    class Meta:
+        verbose_name = "Dokument wyszukiwania"
+        verbose_name_plural = "Dokumenty wyszukiwania"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='core_searchdocument_kind_object_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id}"
@@ -0,0 +1,152 @@
+"""Powiadomienia e-mail przez skrzynkę nadawczą (transactional outbox).
+
+Widok zapisuje wiadomość (OutboxMessage) w tej samej transakcji co zmianę
+rezerwacji, więc wiadomość istnieje wtedy i tylko wtedy, gdy zmiana została
+zatwierdzona, a odpowiedź nie czeka na serwer pocztowy. Po zatwierdzeniu
+budzony jest nadawca (zadanie ``core.tasks.send_outbox`` w kolejce, a jako
+zabezpieczenie także co 5 minut z TASK_SCHEDULE), który wysyła zaległe
+wiadomości paczkami przez jedno połączenie backendu poczty Django (lokalnie
+plik lub konsola).
+
+Wolny serwer poczty ogranicza ``EMAIL_TIMEOUT`` na operację i ``OUTBOX_SEND_DEADLINE``
+na całą paczkę - niewysłane wiadomości wracają do kolejki dla następnego przebiegu.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboxMessage, Task
+
+logger = logging.getLogger(__name__)
+
+SENDER_TASK = 'core.tasks.send_outbox'
+RETRY_DELAYS = [60, 300, 1800, 7200]
+
+
+def _queue(kind, reservation, template):
+    user = reservation.guest.user
+    return _create(kind, user, template, {'reservation': reservation}, reservation)
+
+
+def _create(kind, user, template, context, reservation=None):
+    if not user.email:
+        return None
+    context = {**context, 'user': user, 'hotel': getattr(settings, 'HOTEL_NAME', 'Hotel')}
+    message = OutboxMessage.objects.create(
+        kind=kind,
+        reservation=reservation,
+        recipient=user.email,
+        subject=render_to_string(f'emails/{template}_subject.txt', context).strip(),
+        body=render_to_string(f'emails/{template}.txt', context),
+    )
+    transaction.on_commit(wake_sender)
+    return message
+
+
+def reservation_confirmation(reservation):
+    """Potwierdzenie z numerem rezerwacji, terminem, kwotą i PIN-em."""
+    return _queue('reservation_confirmation', reservation, 'reservation_confirmation')
+
+
+def reservation_cancelled(reservation):
+    return _queue('reservation_cancelled', reservation, 'reservation_cancelled')
+
+
+def account_invite(user, claim_url, reservation=None):
+    """Link do ustawienia hasła dla konta założonego przy rezerwacji (core.accounts)."""
+    return _create('account_invite', user, 'account_invite', {'claim_url': claim_url}, reservation)
+
+
+def wake_sender():
+    """Odkłada wysyłkę do kolejki zadań, chyba że już na nią czeka."""
+    from . import tasks
+    if not Task.objects.filter(name=SENDER_TASK, status='queued').exists():
+        tasks.send_outbox.delay()
+
+
+def _claim(limit):
+    now = timezone.now()
+    # Wiadomości po przerwanym przebiegu (minęła blokada) wracają do puli
+    OutboxMessage.objects.filter(status='sending', locked_until__lt=now).update(status='pending', locked_until=None)
+    ids = list(
+        OutboxMessage.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    lock = now + timedelta(seconds=getattr(settings, 'OUTBOX_SEND_DEADLINE', 60) * 2)
+    OutboxMessage.objects.filter(pk__in=ids, status='pending').update(
+        status='sending', locked_until=lock, attempts=F('attempts') + 1,
+    )
+    return list(OutboxMessage.objects.filter(pk__in=ids, status='sending', locked_until=lock).order_by('pk'))
+
+
+def send_pending(batch_size=None, deadline=None):
+    """Wysyła zaległe wiadomości jedną paczką. Zwraca (wysłane, nieudane)."""
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+    deadline = deadline if deadline is not None else getattr(settings, 'OUTBOX_SEND_DEADLINE', 60)
+    batch = _claim(batch_size)
+    if not batch:
+        return 0, 0
+
+    started = time.monotonic()
+    sent, failed = [], []
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as exc:
+        logger.warning("Brak połączenia z serwerem poczty: %s", exc)
+        connection, failed = None, [(message, exc) for message in batch]
+        batch = []
+
+    try:
+        for index, message in enumerate(batch):
+            if time.monotonic() - started > deadline:
+                # Reszta paczki czeka na kolejny przebieg - bez zużycia próby
+                OutboxMessage.objects.filter(pk__in=[m.pk for m in batch[index:]]).update(
+                    status='pending', locked_until=None, attempts=F('attempts') - 1,
+                )
+                break
+            email = EmailMessage(message.subject, message.body, from_email, [message.recipient], connection=connection)
+            try:
+                email.send()
+            except Exception as exc:
+                failed.append((message, exc))
+            else:
+                sent.append(message.pk)
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if sent:
+        OutboxMessage.objects.filter(pk__in=sent).update(
+            status='sent', sent_at=timezone.now(), locked_until=None, last_error='',
+        )
+    now = timezone.now()
+    for message, exc in failed:
+        if message.attempts > len(RETRY_DELAYS):
+            changes = {'status': 'failed'}
+        else:
+            changes = {'status': 'pending', 'next_attempt_at': now + timedelta(seconds=RETRY_DELAYS[message.attempts - 1])}
+        OutboxMessage.objects.filter(pk=message.pk).update(locked_until=None, last_error=str(exc)[:1000], **changes)
+    return len(sent), len(failed)
+
+
+def send_all(batch_size=None):
+    """Wysyła paczkami, dopóki są zaległe wiadomości. Zwraca (wysłane, nieudane)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_pending(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if not sent:
+            return total_sent, total_failed
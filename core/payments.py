@@ -0,0 +1,245 @@
+"""Płatności online: idempotentne przyjęcie i rozliczenie w tle przez bramkę.
+
+Widok tylko zakłada płatność ``pending`` z kluczem idempotencji z formularza
+(``start``) - ponowne wysłanie tego samego formularza zwraca tę samą płatność,
+a rezerwacja ma najwyżej jedną płatność online w toku. Po zatwierdzeniu
+transakcji budzony jest rozliczający (zadanie ``core.tasks.settle_payments``,
+także co minutę z harmonogramu), który przejmuje płatności paczkami, pyta
+bramkę (``PAYMENT_GATEWAY``) poza transakcją, a wyniki całej paczki zapisuje
+w jednej transakcji: zrealizowana płatność koryguje saldo (sygnały
+core.signals) i potwierdza oczekującą rezerwację. Płatność za rezerwację
+anulowaną w międzyczasie (np. przez recepcję) kończy się błędem bez
+obciążania karty; gość nie może anulować rezerwacji z płatnością w toku.
+
+Bramka dostaje klucz idempotencji płatności, więc ponowienie po błędzie sieci
+nie obciąży karty drugi raz. Lokalnie działa ``FakeGateway``.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import changes
+from .models import Payment, Reservation, Task
+
+logger = logging.getLogger(__name__)
+
+SETTLER_TASK = 'core.tasks.settle_payments'
+RETRY_DELAYS = [30, 120, 600, 1800]
+# Rezerwacje, za które można pobrać płatność - anulowanej czy zakończonej już nie
+PAYABLE_STATUSES = ('pending', 'confirmed', 'checked_in')
+
+
+# Bramki
+
+class GatewayError(Exception):
+    """Błąd przejściowy bramki (sieć, przekroczony czas) - płatność zostanie ponowiona."""
+
+
+@dataclass
+class ChargeResult:
+    approved: bool
+    reference: str = ''
+    error: str = ''
+
+
+class Gateway:
+    """Interfejs bramki płatności: ``charge`` obciąża kwotą płatności.
+
+    Odmowa (np. brak środków) to ``ChargeResult(approved=False)``, błąd
+    przejściowy - wyjątek. Ten sam ``payment.idempotency_key`` musi dawać ten
+    sam wynik.
+    """
+
+    def charge(self, payment):
+        raise NotImplementedError
+
+
+class FakeGateway(Gateway):
+    """Bramka testowa: akceptuje kwoty do ``decline_above`` po ``latency`` sekundach."""
+
+    def __init__(self, latency=0.0, decline_above=None):
+        self.latency = latency
+        self.decline_above = decline_above
+        self._charges = {}
+
+    def charge(self, payment):
+        if payment.idempotency_key in self._charges:
+            return self._charges[payment.idempotency_key]
+        if self.latency:
+            time.sleep(self.latency)
+        if self.decline_above is not None and payment.amount > self.decline_above:
+            result = ChargeResult(approved=False, error="Odmowa: przekroczony limit karty")
+        else:
+            result = ChargeResult(approved=True, reference=f"FAKE-{uuid.uuid4().hex[:16]}")
+        self._charges[payment.idempotency_key] = result
+        return result
+
+
+_gateways = {}
+
+
+def get_gateway():
+    path = getattr(settings, 'PAYMENT_GATEWAY', 'core.payments.FakeGateway')
+    options = getattr(settings, 'PAYMENT_GATEWAY_OPTIONS', {})
+    key = (path, repr(sorted(options.items())))
+    if key not in _gateways:
+        _gateways[key] = import_string(path)(**options)
+    return _gateways[key]
+
+
+# Przyjęcie płatności
+
+def start(reservation, idempotency_key):
+    """Zakłada płatność online za saldo rezerwacji. Zwraca (płatność, czy nowa).
+
+    Rzuca ValueError, gdy brak klucza, klucz należy do innej rezerwacji,
+    rezerwacja jest anulowana lub zakończona albo nie ma czego płacić.
+    """
+    if not idempotency_key or len(idempotency_key) > 64:
+        raise ValueError("Nieprawidłowy klucz płatności. Odśwież stronę i spróbuj ponownie.")
+
+    with transaction.atomic():
+        # Blokada wiersza rezerwacji szereguje równoległe wysłania formularza
+        reservation = Reservation.objects.select_for_update().get(pk=reservation.pk)
+        existing = Payment.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            if existing.reservation_id != reservation.pk:
+                raise ValueError("Nieprawidłowy klucz płatności. Odśwież stronę i spróbuj ponownie.")
+            return existing, False
+        in_flight = reservation.payments.filter(payment_method='online', payment_status='pending').first()
+        if in_flight is not None:
+            return in_flight, False
+        if reservation.status not in PAYABLE_STATUSES:
+            raise ValueError("Tej rezerwacji nie można już opłacić.")
+        if reservation.balance_due <= 0:
+            raise ValueError("Rezerwacja jest już opłacona.")
+
+        try:
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    reservation=reservation,
+                    amount=reservation.balance_due,
+                    payment_method='online',
+                    payment_status='pending',
+                    idempotency_key=idempotency_key,
+                    next_attempt_at=timezone.now(),
+                )
+        except IntegrityError:
+            return Payment.objects.get(idempotency_key=idempotency_key), False
+        transaction.on_commit(wake_settler)
+    return payment, True
+
+
+def in_progress(reservation):
+    return reservation.payments.filter(payment_method='online', payment_status='pending').exists()
+
+
+def wake_settler():
+    """Odkłada rozliczenie do kolejki zadań, chyba że już na nie czeka."""
+    from . import tasks
+    if not Task.objects.filter(name=SETTLER_TASK, status='queued').exists():
+        tasks.settle_payments.delay()
+
+
+# Rozliczenie
+
+def _claim(limit):
+    now = timezone.now()
+    ids = list(
+        Payment.objects.filter(payment_status='pending', payment_method='online', next_attempt_at__lte=now)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+        .order_by('next_attempt_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    lock = now + timedelta(seconds=getattr(settings, 'PAYMENT_LOCK_TIMEOUT', 300))
+    Payment.objects.filter(pk__in=ids, payment_status='pending').filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    ).update(locked_until=lock, attempts=F('attempts') + 1)
+    return list(Payment.objects.filter(pk__in=ids, locked_until=lock).order_by('pk'))
+
+
+def _apply(payment, result, now):
+    mine = Payment.objects.filter(pk=payment.pk, payment_status='pending', locked_until=payment.locked_until)
+    if isinstance(result, Exception):
+        max_attempts = getattr(settings, 'PAYMENT_MAX_ATTEMPTS', len(RETRY_DELAYS) + 1)
+        if payment.attempts >= max_attempts:
+            outcome = {'payment_status': 'failed'}
+        else:
+            delay = RETRY_DELAYS[min(payment.attempts, len(RETRY_DELAYS)) - 1]
+            outcome = {'next_attempt_at': now + timedelta(seconds=delay)}
+        changes.update_and_record(mine, locked_until=None, last_error=str(result)[:1000], **outcome)
+        return 'failed' if 'payment_status' in outcome else 'retried'
+    if not result.approved:
+        changes.update_and_record(mine, payment_status='failed', locked_until=None, last_error=result.error)
+        return 'failed'
+
+    # Wiersz czytany ponownie pod blokadą: płatność rozliczona już przez inny
+    # przebieg (po wygaśnięciu blokady) nie zostanie zaksięgowana drugi raz
+    payment = Payment.objects.select_for_update().filter(pk=payment.pk, payment_status='pending').first()
+    if payment is None:
+        return 'completed'
+    # Zapis przez save(): sygnał koryguje saldo rezerwacji
+    payment.payment_status = 'completed'
+    payment.transaction_id = result.reference
+    payment.payment_date = timezone.localdate(now)
+    payment.locked_until = None
+    payment.last_error = ''
+    payment.save()
+    reservation = Reservation.objects.select_for_update().get(pk=payment.reservation_id)
+    if reservation.status == 'pending':
+        reservation.status = 'confirmed'
+        reservation.save()
+    return 'completed'
+
+
+def settle_pending(batch_size=None):
+    """Rozlicza jedną paczkę płatności. Zwraca {'completed': n, 'failed': n, 'retried': n}."""
+    batch = _claim(batch_size or getattr(settings, 'PAYMENT_BATCH_SIZE', 50))
+    counts = {'completed': 0, 'failed': 0, 'retried': 0}
+    if not batch:
+        return counts
+
+    gateway = get_gateway()
+    payable = set(
+        Reservation.objects.filter(pk__in={p.reservation_id for p in batch}, status__in=PAYABLE_STATUSES)
+        .values_list('pk', flat=True)
+    )
+    results = []
+    for payment in batch:
+        if payment.reservation_id not in payable:
+            # Rezerwację anulowano po założeniu płatności - karta nie jest obciążana
+            results.append((payment, ChargeResult(approved=False, error="Rezerwacja anulowana - płatność nie została pobrana")))
+            continue
+        try:
+            result = gateway.charge(payment)
+        except Exception as exc:
+            logger.warning("Bramka płatności: błąd dla płatności #%s: %s", payment.pk, exc)
+            result = exc
+        results.append((payment, result))
+
+    now = timezone.now()
+    with transaction.atomic():
+        for payment, result in results:
+            counts[_apply(payment, result, now)] += 1
+    return counts
+
+
+def settle_all(batch_size=None):
+    """Rozlicza paczkami, dopóki są płatności gotowe do rozliczenia. Zwraca łączne liczniki."""
+    totals = {'completed': 0, 'failed': 0, 'retried': 0}
+    while True:
+        counts = settle_pending(batch_size)
+        for key, value in counts.items():
+            totals[key] += value
+        if not any(counts.values()):
+            return totals
@@ -0,0 +1,315 @@
+"""Rysowanie dokumentów PDF (reportlab).
+
+Czcionka Unicode (domyślnie DejaVu Sans) jest rejestrowana raz na proces,
+więc polskie znaki trafiają do PDF bez transliteracji. ``PdfRenderer`` buduje
+raz style akapitów, style tabel i szablon strony (nagłówek, stopka z numerem
+strony) i renderuje nimi dowolnie wiele dokumentów - ``get_renderer()`` zwraca
+rozgrzany renderer bieżącego wątku.
+
+Moduł nie importuje modeli - funkcje renderujące dostają gotowe słowniki
+z danymi, dzięki czemu można je uruchamiać w procesach roboczych
+(ProcessPoolExecutor, z ``warm`` jako initializer) bez konfigurowania Django.
+Gdy żadna czcionka TTF nie jest dostępna, renderer wraca do Helvetiki
+i usuwa polskie znaki (``clean_text``).
+"""
+import importlib.util
+import io
+import logging
+import os
+import threading
+from xml.sax.saxutils import escape
+
+# reportlab ładuje się przy pierwszym renderowaniu (load_reportlab), a nie przy
+# imporcie modułu - import trwa kilkadziesiąt ms i zajmuje pamięć każdego
+# workera i polecenia manage.py, choć PDF-y renderuje tylko część z nich
+canvas = colors = A4 = ParagraphStyle = mm = pdfmetrics = TTFont = None
+BaseDocTemplate = Frame = PageTemplate = Paragraph = Spacer = Table = TableStyle = None
+
+logger = logging.getLogger(__name__)
+
+# Nazwa w nagłówku, gdy ani dane dokumentu, ani ustawienia Django jej nie podają
+HOTEL_NAME = "Hotel XYZ"
+
+FONT_NAME = 'HMSSans'
+FONT_NAME_BOLD = 'HMSSans-Bold'
+
+# Szukane po kolei, jeśli PDF_FONT_PATH nie wskazuje pliku
+FONT_CANDIDATES = [
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/TTF/DejaVuSans.ttf', '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/dejavu/DejaVuSans.ttf', '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'),
+    ('/Library/Fonts/Arial Unicode.ttf', '/Library/Fonts/Arial Unicode.ttf'),
+    ('C:\\Windows\\Fonts\\arial.ttf', 'C:\\Windows\\Fonts\\arialbd.ttf'),
+]
+
+_PL_TRANSLATION = str.maketrans(
+    'ąćęłńóśźżĄĆĘŁŃÓŚŹŻ',
+    'acelnoszzACELNOSZZ',
+)
+
+
+_available = None
+
+
+def available():
+    """Czy reportlab jest zainstalowany (bez importowania go)."""
+    global _available
+    if _available is None:
+        _available = importlib.util.find_spec('reportlab') is not None
+    return _available
+
+
+def load_reportlab():
+    """Importuje reportlab do modułu przy pierwszym użyciu (kolejne wywołania nic nie robią)."""
+    global canvas, colors, A4, ParagraphStyle, mm, pdfmetrics, TTFont
+    global BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle
+    if canvas is not None:
+        return
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import (
+        BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle,
+    )
+    # Na końcu - znacznik, że wszystkie nazwy są już ustawione
+    from reportlab.pdfgen import canvas
+
+
+def clean_text(text):
+    """Usuwa polskie znaki (tylko dla czcionek bez Unicode, np. Helvetica)."""
+    if not text:
+        return ""
+    return str(text).translate(_PL_TRANSLATION)
+
+
+_font_lock = threading.Lock()
+_registered_fonts = None
+
+
+def font_paths():
+    """Ścieżki czcionek z ustawień Django (PDF_FONT_PATH, PDF_FONT_BOLD_PATH), jeśli są skonfigurowane."""
+    try:
+        from django.conf import settings
+        regular = getattr(settings, 'PDF_FONT_PATH', None)
+        bold = getattr(settings, 'PDF_FONT_BOLD_PATH', None)
+    except Exception:
+        return None, None
+    return (str(regular) if regular else None), (str(bold) if bold else None)
+
+
+def hotel_name():
+    """Nazwa hotelu z ustawień Django (HOTEL_NAME) - ta sama co w e-mailach i kanałach iCal."""
+    try:
+        from django.conf import settings
+        return str(getattr(settings, 'HOTEL_NAME', None) or HOTEL_NAME)
+    except Exception:
+        return HOTEL_NAME
+
+
+def register_fonts(regular=None, bold=None):
+    """Rejestruje czcionkę Unicode raz na proces; zwraca (zwykła, pogrubiona, unicode)."""
+    global _registered_fonts
+    if _registered_fonts is not None:
+        return _registered_fonts
+    load_reportlab()
+    with _font_lock:
+        if _registered_fonts is not None:
+            return _registered_fonts
+        candidates = ([(regular, bold or regular)] if regular else []) + FONT_CANDIDATES
+        for regular_path, bold_path in candidates:
+            if not os.path.exists(regular_path):
+                continue
+            try:
+                pdfmetrics.registerFont(TTFont(FONT_NAME, regular_path))
+                bold_path = bold_path if bold_path and os.path.exists(bold_path) else regular_path
+                pdfmetrics.registerFont(TTFont(FONT_NAME_BOLD, bold_path))
+            except Exception:
+                logger.exception("Nie udało się wczytać czcionki %s", regular_path)
+                continue
+            _registered_fonts = (FONT_NAME, FONT_NAME_BOLD, True)
+            break
+        else:
+            logger.warning("Brak czcionki TTF - PDF-y będą generowane Helvetiką bez polskich znaków")
+            _registered_fonts = ('Helvetica', 'Helvetica-Bold', False)
+    return _registered_fonts
+
+
+class PdfRenderer:
+    """Renderer dokumentów z jednym zestawem czcionek, stylów i szablonem strony.
+
+    Instancja nie jest bezpieczna wątkowo (szablon strony jest współdzielony
+    między kolejnymi dokumentami) - używać przez ``get_renderer()``.
+    """
+
+    def __init__(self, regular=None, bold=None):
+        self.font, self.font_bold, self.unicode = register_fonts(regular, bold)
+        self.margin = 20 * mm
+        self.page_width, self.page_height = A4
+
+        self.styles = {
+            'title': ParagraphStyle('title', fontName=self.font_bold, fontSize=16, leading=20, spaceAfter=4 * mm),
+            'heading': ParagraphStyle('heading', fontName=self.font_bold, fontSize=11, leading=14,
+                                      spaceBefore=5 * mm, spaceAfter=2 * mm),
+            'body': ParagraphStyle('body', fontName=self.font, fontSize=10, leading=13),
+            'total': ParagraphStyle('total', fontName=self.font_bold, fontSize=13, leading=17,
+                                    spaceBefore=6 * mm, alignment=2),
+        }
+        self.table_styles = {
+            # Tabela klucz - wartość (dane nabywcy, szczegóły rezerwacji, wskaźniki raportu)
+            'details': TableStyle([
+                ('FONTNAME', (0, 0), (-1, -1), self.font),
+                ('FONTNAME', (0, 0), (0, -1), self.font_bold),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+                ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+            ]),
+            # Tabela z nagłówkiem (płatności)
+            'grid': TableStyle([
+                ('FONTNAME', (0, 0), (-1, -1), self.font),
+                ('FONTNAME', (0, 0), (-1, 0), self.font_bold),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e9ecef')),
+                ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+            ]),
+        }
+
+        frame = Frame(
+            self.margin, self.margin + 10 * mm,
+            self.page_width - 2 * self.margin, self.page_height - 2 * self.margin - 25 * mm,
+            id='content', leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0,
+        )
+        self.page_template = PageTemplate(id='page', frames=[frame], onPage=self._decorate_page)
+
+    def text(self, value):
+        """Tekst gotowy do Paragraph: escapowany i (bez czcionki Unicode) bez polskich znaków."""
+        value = '' if value is None else str(value)
+        return escape(value if self.unicode else clean_text(value))
+
+    def text_plain(self, value):
+        """Tekst do rysowania wprost na płótnie lub w komórce tabeli."""
+        value = '' if value is None else str(value)
+        return value if self.unicode else clean_text(value)
+
+    def _decorate_page(self, c, doc):
+        c.saveState()
+        top = self.page_height - self.margin
+        c.setFont(self.font_bold, 12)
+        c.drawString(self.margin, top, self.text_plain(doc.hotel))
+        c.setFont(self.font, 9)
+        c.drawRightString(self.page_width - self.margin, top, self.text_plain(doc.title))
+        c.setStrokeColor(colors.grey)
+        c.line(self.margin, top - 3 * mm, self.page_width - self.margin, top - 3 * mm)
+        c.line(self.margin, self.margin + 5 * mm, self.page_width - self.margin, self.margin + 5 * mm)
+        c.drawString(self.margin, self.margin, self.text_plain(doc.footer))
+        c.drawRightString(self.page_width - self.margin, self.margin, self.text_plain(f"Strona {doc.page}"))
+        c.restoreState()
+
+    def _build(self, story, title, footer='', hotel=None):
+        buffer = io.BytesIO()
+        hotel = hotel or hotel_name()
+        doc = BaseDocTemplate(
+            buffer, pagesize=A4, title=title, author=hotel,
+            leftMargin=self.margin, rightMargin=self.margin, topMargin=self.margin, bottomMargin=self.margin,
+        )
+        doc.footer = footer
+        doc.hotel = hotel
+        doc.addPageTemplates([self.page_template])
+        doc.build(story)
+        return buffer.getvalue()
+
+    def _details(self, rows):
+        width = self.page_width - 2 * self.margin
+        # Zwykłe napisy zamiast Paragraph - krótkie wartości nie wymagają łamania,
+        # a pomijają parsowanie znaczników przy każdym dokumencie
+        table = Table(
+            [[self.text_plain(k), self.text_plain(v)] for k, v in rows],
+            colWidths=[0.35 * width, 0.65 * width],
+        )
+        table.setStyle(self.table_styles['details'])
+        return table
+
+    def render_invoice(self, data):
+        """Faktura ze słownika z core.invoices.invoice_context; zwraca bajty PDF."""
+        title = f"Faktura / Rachunek #{data['id']}"
+        story = [
+            Paragraph(self.text(title), self.styles['title']),
+            Paragraph(self.text(f"Data wystawienia: {data['issued']}"), self.styles['body']),
+            Paragraph(self.text("Nabywca"), self.styles['heading']),
+            self._details([
+                ("Imię i nazwisko", f"{data['guest_first_name']} {data['guest_last_name']}"),
+                ("E-mail", data['guest_email']),
+            ]),
+            Paragraph(self.text("Szczegóły rezerwacji"), self.styles['heading']),
+            self._details([
+                ("Pokój", f"{data['room_number']} ({data['room_type']})"),
+                ("Termin", f"{data['check_in']} - {data['check_out']}"),
+                ("Liczba gości", data['number_of_guests']),
+                ("Status", data['status']),
+                ("Metoda płatności", data['payment_method']),
+            ]),
+        ]
+        if data['payments']:
+            story.append(Paragraph(self.text("Płatności"), self.styles['heading']))
+            rows = [[self.text_plain(h) for h in ("Data", "Metoda", "Kwota [PLN]", "Status")]]
+            rows += [
+                [p['date'], self.text_plain(p['method']), p['amount'], self.text_plain(p['status'])]
+                for p in data['payments']
+            ]
+            payments = Table(rows, colWidths=None, hAlign='LEFT')
+            payments.setStyle(self.table_styles['grid'])
+            story.append(payments)
+        story += [
+            Paragraph(self.text(f"Razem: {data['total_price']} PLN"), self.styles['total']),
+            Spacer(1, 2 * mm),
+            Paragraph(
+                self.text(f"Wpłacono: {data['amount_paid']} PLN, do zapłaty: {data['balance_due']} PLN"),
+                self.styles['body'],
+            ),
+        ]
+        return self._build(story, title, footer=f"Rezerwacja #{data['id']}", hotel=data.get('hotel'))
+
+    def render_report(self, data):
+        """Raport managerski ze słownika (miesiąc, przychód, obłożenie); zwraca bajty PDF."""
+        title = f"Raport Managerski - {data['month']}"
+        story = [
+            Paragraph(self.text(title), self.styles['title']),
+            Paragraph(self.text(f"Wygenerowano: {data['generated']}"), self.styles['body']),
+            Paragraph(self.text("Wskaźniki"), self.styles['heading']),
+            self._details([
+                ("Przychód (miesiąc)", f"{data['monthly_revenue']} PLN"),
+                ("Obłożenie (teraz)", f"{data['occupancy_rate']}%"),
+                ("Zajęte pokoje", f"{data['occupied_rooms']} / {data['total_rooms']}"),
+            ]),
+        ]
+        return self._build(story, title, footer=f"Wygenerowano: {data['generated']}", hotel=data.get('hotel'))
+
+
+_local = threading.local()
+
+
+def get_renderer():
+    """Rozgrzany renderer bieżącego wątku (czcionki i szablony budowane tylko raz)."""
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = _local.renderer = PdfRenderer(*font_paths())
+    return renderer
+
+
+def warm(regular=None, bold=None):
+    """Initializer procesu roboczego: rejestruje czcionki i buduje renderer przed pierwszym zadaniem."""
+    if regular:
+        register_fonts(regular, bold)
+    get_renderer()
+
+
+def render_invoice(data):
+    return get_renderer().render_invoice(data)
+
+
+def render_report(data):
+    return get_renderer().render_report(data)
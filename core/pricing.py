@@ -0,0 +1,142 @@
+"""Wyceny pobytów zapamiętywane między żądaniami.
+
+Cena pobytu zależy tylko od (typ pokoju, cena bazowa, przyjazd, wyjazd) i od
+cennika, więc ``quote`` zapamiętuje wynik ``compute_reservation_price`` w
+ograniczonym LRU w procesie (``PRICE_QUOTE_LRU_SIZE``) i w cache Django
+(wspólnym dla procesów, jeśli skonfigurowano np. Redis). Powtórne wyszukanie
+popularnego terminu nie odpytuje bazy.
+
+Klucze zawierają globalną wersję cennika trzymaną w cache Django. Zmiana
+sezonu, ceny sezonowej albo ceny/typu pokoju podbija ją od razu i ponownie po
+zatwierdzeniu transakcji (sygnały w core.signals) - wyceny policzone
+w międzyczasie ze starych danych trafiają pod nieaktualną już wersję.
+Wersja zaczyna się od znacznika czasu, więc po wyczyszczeniu cache nie wraca
+do wartości, pod którą mogą leżeć stare wyceny.
+"""
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+
+from . import replica
+from .models import Reservation, Room, compute_reservation_price
+
+VERSION_KEY = 'pricing:version'
+CACHE_TIMEOUT = 24 * 3600
+
+_lock = threading.Lock()
+_local = OrderedDict()
+_stats = {'hits': 0, 'shared_hits': 0, 'misses': 0}
+
+
+# Wersja cennika
+
+def version():
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Brak klucza (wyczyszczony cache) - nowa wersja od bieżącego czasu
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+
+
+def invalidate():
+    """Unieważnia wszystkie wyceny - teraz i po zatwierdzeniu bieżącej transakcji."""
+    _bump()
+    transaction.on_commit(_bump)
+
+
+# LRU w procesie
+
+def _local_get(key):
+    with _lock:
+        if key not in _local:
+            return None
+        _local.move_to_end(key)
+        return _local[key]
+
+
+def _local_set(key, value):
+    size = getattr(settings, 'PRICE_QUOTE_LRU_SIZE', 4096)
+    with _lock:
+        _local[key] = value
+        _local.move_to_end(key)
+        while len(_local) > size:
+            _local.popitem(last=False)
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def _memoize(key, compute):
+    value = _local_get(key)
+    if value is not None:
+        _count('hits')
+        return value
+    shared_key = 'pricing:' + ':'.join(str(part) for part in key)
+    value = cache.get(shared_key)
+    if value is not None:
+        _count('shared_hits')
+    else:
+        _count('misses')
+        # Wycena trafia pod bieżącą wersję cennika, więc liczy się z bazy
+        # głównej - opóźniona replika mogłaby jeszcze mieć stary cennik
+        with replica.reading_replica(False):
+            value = compute()
+        cache.set(shared_key, value, CACHE_TIMEOUT)
+    _local_set(key, value)
+    return value
+
+
+# Wyceny
+
+def quote(room_type, base_price, check_in, check_out):
+    """Cena pobytu w pokoju typu ``room_type`` o cenie bazowej ``base_price``."""
+    def compute():
+        room = Room(room_type=room_type, price=base_price)
+        return compute_reservation_price(Reservation(room=room, check_in=check_in, check_out=check_out))
+    return _memoize(('quote', version(), room_type, base_price, check_in, check_out), compute)
+
+
+def type_base_price(room_type):
+    """Cena bazowa rezerwacji na typ - najtańszy pokój typu (jak w compute_reservation_price)."""
+    def compute():
+        return Room.objects.filter(room_type=room_type).aggregate(price=Min('price'))['price'] or Decimal('0.00')
+    return _memoize(('base', version(), room_type), compute)
+
+
+def reservation_price(reservation):
+    """Zamiennik ``compute_reservation_price`` korzystający z zapamiętanych wycen."""
+    if reservation.room_id is not None:
+        room = reservation.room
+        return quote(room.room_type, room.price, reservation.check_in, reservation.check_out)
+    room_type = reservation.room_type
+    return quote(room_type, type_base_price(room_type), reservation.check_in, reservation.check_out)
+
+
+def stats():
+    """Liczniki tego procesu: trafienia w LRU, w cache Django, chybienia i rozmiar LRU."""
+    with _lock:
+        return {**_stats, 'size': len(_local), 'version': cache.get(VERSION_KEY)}
+
+
+def clear():
+    """Czyści LRU i liczniki tego procesu (testy, benchmarki)."""
+    with _lock:
+        _local.clear()
+        for name in _stats:
+            _stats[name] = 0
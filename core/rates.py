@@ -0,0 +1,197 @@
+"""Tabela stawek dziennych (NightlyRate) i kalendarz najniższych cen.
+
+Dla każdego typu pokoju i każdej nocy w horyzoncie ``NIGHTLY_RATE_HORIZON_DAYS``
+(domyślnie ok. 18 miesięcy) tabela trzyma mnożnik sezonowy, cenę "od"
+(najtańszy pokój danego typu razy mnożnik) i liczbę pokoi. Sygnały Season /
+SeasonPrice przeliczają tylko zakres dat zmienionego sezonu, zmiany pokoi
+aktualizują cenę "od" jednym UPDATE, a komenda ``rebuild_nightly_rates``
+przesuwa horyzont i usuwa minione dni. Migracja wypełnia tabelę przy
+instalacji, a kalendarz uzupełnia brakujący miesiąc sam (``ensure``).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import NightlyRate, Reservation, Room, SeasonPrice
+
+ONE = Decimal('1.00')
+ACTIVE_STATUSES = ['pending', 'confirmed', 'checked_in']
+
+
+def horizon(today=None):
+    """Zakres dat [pierwsza, ostatnia] utrzymywany w tabeli."""
+    today = today or timezone.now().date()
+    return today, today + timedelta(days=getattr(settings, 'NIGHTLY_RATE_HORIZON_DAYS', 548) - 1)
+
+
+def _room_type_stats(room_types):
+    stats = {t: (None, 0) for t in room_types}
+    # Pokoje w naprawie nie są do wynajęcia - cena "od" jak w wycenie rezerwacji na typ
+    rows = (
+        Room.objects.filter(room_type__in=room_types)
+        .values('room_type')
+        .annotate(min_price=Min('price'), total=Count('pk', filter=~Q(status='maintenance')))
+    )
+    for row in rows:
+        stats[row['room_type']] = (row['min_price'], row['total'])
+    return stats
+
+
+def _season_multipliers(start, end, room_types):
+    """Lista (typ, od, do, mnożnik) sezonów zachodzących na zakres.
+
+    Jak w compute_reservation_price liczy się pierwsza cena sezonu dla typu.
+    """
+    seen = set()
+    result = []
+    prices = (
+        SeasonPrice.objects
+        .filter(season__start_date__lte=end, season__end_date__gte=start, room_type__in=room_types)
+        .order_by('pk')
+        .values_list('season_id', 'room_type', 'season__start_date', 'season__end_date', 'price_multiplier')
+    )
+    for season_id, room_type, season_start, season_end, multiplier in prices:
+        if (season_id, room_type) in seen:
+            continue
+        seen.add((season_id, room_type))
+        result.append((room_type, season_start, season_end, multiplier))
+    return result
+
+
+def rebuild(start=None, end=None, room_types=None, batch_size=1000):
+    """Przelicza stawki w zakresie dat (przyciętym do horyzontu) jednym upsertem.
+
+    Zwraca liczbę zapisanych wierszy.
+    """
+    first, last = horizon()
+    start = max(start or first, first)
+    end = min(end or last, last)
+    if start > end:
+        return 0
+    room_types = list(room_types or [t for t, _ in Room.TYPE_CHOICES])
+
+    stats = _room_type_stats(room_types)
+    seasons = _season_multipliers(start, end, room_types)
+    days = (end - start).days + 1
+
+    rows = []
+    for room_type in room_types:
+        multipliers = [ONE] * days
+        for season_type, season_start, season_end, multiplier in seasons:
+            if season_type != room_type:
+                continue
+            lo = max((season_start - start).days, 0)
+            hi = min((season_end - start).days, days - 1)
+            for i in range(lo, hi + 1):
+                if multiplier > multipliers[i]:
+                    multipliers[i] = multiplier
+        min_price, total = stats[room_type]
+        for i, multiplier in enumerate(multipliers):
+            rows.append(NightlyRate(
+                room_type=room_type,
+                date=start + timedelta(days=i),
+                multiplier=multiplier,
+                price_from=round(min_price * multiplier, 2) if min_price is not None else None,
+                rooms_total=total,
+            ))
+
+    NightlyRate.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['room_type', 'date'],
+        update_fields=['multiplier', 'price_from', 'rooms_total'],
+    )
+    return len(rows)
+
+
+def rebuild_all():
+    """Pełne przeliczenie horyzontu i usunięcie minionych dni."""
+    first, _ = horizon()
+    removed, _ = NightlyRate.objects.filter(date__lt=first).delete()
+    return rebuild(), removed
+
+
+def ensure(start, end):
+    """Uzupełnia brakujące stawki w zakresie dat (np. przed pierwszym ``rebuild_nightly_rates``).
+
+    Zwraca liczbę przeliczonych wierszy - 0, gdy zakres (przycięty do horyzontu) jest pełny.
+    """
+    first, last = horizon()
+    start, end = max(start, first), min(end, last)
+    if start > end:
+        return 0
+    expected = ((end - start).days + 1) * len(Room.TYPE_CHOICES)
+    if NightlyRate.objects.filter(date__gte=start, date__lte=end).count() >= expected:
+        return 0
+    return rebuild(start, end)
+
+
+def refresh_room_types(room_types):
+    """Po zmianie pokoi: nowa cena "od" i liczba pokoi dla przyszłych dni (UPDATE na typ)."""
+    first, _ = horizon()
+    for room_type, (min_price, total) in _room_type_stats(list(room_types)).items():
+        price_from = None
+        if min_price is not None:
+            price_from = ExpressionWrapper(
+                F('multiplier') * Value(min_price),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+        NightlyRate.objects.filter(room_type=room_type, date__gte=first).update(
+            price_from=price_from, rooms_total=total,
+        )
+
+
+def month_calendar(year, month, room_type=None, guests=1):
+    """Najniższa cena i liczba wolnych pokoi dla każdego dnia miesiąca.
+
+    Stawki, zajętość (podzapytanie po typie rezerwacji - także tych bez
+    przydzielonego pokoju) i filtr pojemności
+    są liczone w jednym zapytaniu po zakresie indeksu (date, room_type).
+    """
+    first = date(year, month, 1)
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    ensure(first, last)
+
+    booked = (
+        Reservation.objects
+        .filter(
+            room_type=OuterRef('room_type'),
+            check_in__lte=OuterRef('date'),
+            check_out__gt=OuterRef('date'),
+            status__in=ACTIVE_STATUSES,
+        )
+        .values('room_type')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    rates = (
+        NightlyRate.objects
+        .filter(date__gte=first, date__lte=last, price_from__isnull=False)
+        .filter(room_type__in=Room.objects.filter(capacity__gte=guests).values('room_type'))
+        .annotate(booked=Coalesce(Subquery(booked, output_field=IntegerField()), 0))
+        .order_by('date', 'price_from')
+    )
+    if room_type:
+        rates = rates.filter(room_type=room_type)
+
+    days = {}
+    for rate in rates:
+        open_rooms = max(rate.rooms_total - rate.booked, 0)
+        day = days.setdefault(rate.date, {'date': rate.date.isoformat(), 'price_from': None, 'room_type': None, 'open_rooms': 0})
+        day['open_rooms'] += open_rooms
+        # Wiersze są posortowane po cenie - pierwszy typ z wolnym pokojem jest najtańszy
+        if open_rooms and day['price_from'] is None:
+            day['price_from'] = str(rate.price_from)
+            day['room_type'] = rate.room_type
+
+    result = []
+    current = first
+    while current <= last:
+        result.append(days.get(current, {'date': current.isoformat(), 'price_from': None, 'room_type': None, 'open_rooms': 0}))
+        current += timedelta(days=1)
+    return result
@@ -0,0 +1,137 @@
+"""Odczyty z repliki bazy dla raportów, eksportów, kanałów i API dostępności.
+
+Widoki oznaczone ``@replica_reads`` czytają modele aplikacji core z aliasu
+``REPLICA_DATABASE`` (domyślnie ``replica``) - raporty i eksporty nie konkurują
+wtedy z zapisami rezerwacji o bazę główną. Wszystko inne zostaje na bazie
+głównej: zapisy, odczyty po pierwszym zapisie w żądaniu, sesje i konta
+użytkowników.
+
+Replika jest opóźniona, więc sesja, w której coś zapisano, czyta z bazy
+głównej jeszcze przez ``REPLICA_PIN_SECONDS`` sekund - np. rezerwacja
+i przekierowanie na jej szczegóły albo zmiana cennika i jego podgląd.
+
+Bez ``DJANGO_DB_REPLICA_*`` alias ``replica`` wskazuje tę samą bazę co
+``default``, a routing jest wyłączony (``REPLICA_READS``). Lokalnie replikę
+może udawać drugi plik SQLite odświeżany przez ``manage.py sync_replica``.
+"""
+import contextvars
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_SESSION_KEY = 'replica_pinned_until'
+REPLICA_APPS = {'core'}
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    if not getattr(settings, 'REPLICA_READS', False) or alias not in settings.DATABASES:
+        return None
+    return alias
+
+
+def replica_reads(view_func):
+    """Dekorator widoku tylko do odczytu, który może czytać z repliki"""
+    view_func.replica_reads = True
+    return view_func
+
+
+@contextmanager
+def reading_replica(enabled=True):
+    """Odczyty w bloku z repliki (``enabled=True``) albo z bazy głównej."""
+    token = _reads.set(enabled)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+class ReplicaRouter:
+    """Router baz: odczyty core z repliki tylko w widokach ``@replica_reads``."""
+
+    def db_for_read(self, model, **hints):
+        if not _reads.get() or model._meta.app_label not in REPLICA_APPS:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replika to kopia tej samej bazy
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Schemat repliki pochodzi z bazy głównej (replikacja albo sync_replica)
+        return db == DEFAULT_DB_ALIAS
+
+
+def pin(request):
+    """Kolejne odczyty tej sesji z bazy głównej przez REPLICA_PIN_SECONDS."""
+    if hasattr(request, 'session'):
+        request.session[PIN_SESSION_KEY] = time.time() + getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaMiddleware:
+    """Włącza odczyty z repliki dla widoków ``@replica_reads`` i przypina sesję po zapisie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        wrote = []
+
+        def track_writes(execute, sql, params, many, context):
+            if not wrote and sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+                # Dalsze odczyty żądania muszą widzieć ten zapis
+                wrote.append(True)
+                _reads.set(False)
+            return execute(sql, params, many, context)
+
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(track_writes):
+                response = self.get_response(request)
+            if wrote:
+                pin(request)
+            return response
+        finally:
+            if request.replica_token is not None:
+                _reads.reset(request.replica_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (getattr(view_func, 'replica_reads', False) and request.method in ('GET', 'HEAD')
+                and replica_alias() is not None and not is_pinned(request)):
+            request.replica_token = _reads.set(True)
+        return None
+
+
+def sync_sqlite(source=DEFAULT_DB_ALIAS, target=None):
+    """Kopiuje bazę SQLite ``source`` do pliku repliki (API kopii zapasowej SQLite)."""
+    target = target or getattr(settings, 'REPLICA_DATABASE', 'replica')
+    source_db, target_db = settings.DATABASES[source], settings.DATABASES[target]
+    for db in (source_db, target_db):
+        if db['ENGINE'] != 'django.db.backends.sqlite3':
+            raise ValueError("sync_replica obsługuje tylko bazy SQLite - replikę PostgreSQL utrzymuje serwer.")
+    if str(source_db['NAME']) == str(target_db['NAME']):
+        raise ValueError("Replika wskazuje tę samą bazę co baza główna (ustaw DJANGO_DB_REPLICA_NAME).")
+    timeout = source_db.get('OPTIONS', {}).get('timeout', 5)
+    src = sqlite3.connect(str(source_db['NAME']), timeout=timeout)
+    dst = sqlite3.connect(str(target_db['NAME']), timeout=timeout)
+    try:
+        # Spójna migawka bazy głównej, podmieniana w replice w jednej transakcji
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
@@ -0,0 +1,192 @@
+"""Wyszukiwanie pełnotekstowe rezerwacji, gości i pokoi.
+
+Każdy obiekt ma jeden wiersz SearchDocument ze zlepioną treścią do
+przeszukania (dla pokoi także treść zgłoszeń usterek). Na SQLite nad tabelą działa wirtualna tabela FTS5
+synchronizowana triggerami (migracja 0002), na PostgreSQL indeks GIN na
+to_tsvector. Pozostałe bazy (lub SQLite bez FTS5) korzystają z LIKE.
+
+Indeks jest aktualizowany przyrostowo przez sygnały (core.signals)
+i przebudowywany komendą ``manage.py rebuild_search_index``.
+"""
+import re
+import unicodedata
+
+from django.db import connection, OperationalError
+
+from .models import SearchDocument, Reservation, GuestProfile, Room
+
+FTS_TABLE = 'core_searchdocument_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# Litery bez rozkładu NFKD, których nie usuwa remove_diacritics
+EXTRA_FOLDING = str.maketrans({'ł': 'l', 'Ł': 'L'})
+
+_fts_broken = False
+
+
+def normalize(text):
+    """Sprowadza tekst do ASCII bez polskich znaków, żeby 'lozko' trafiało w 'łóżko'."""
+    decomposed = unicodedata.normalize('NFKD', str(text).translate(EXTRA_FOLDING))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _join(*parts):
+    return normalize(' '.join(str(p) for p in parts if p not in (None, '')))
+
+
+def _guest_text(guest):
+    user = guest.user
+    return _join(user.first_name, user.last_name, user.username, user.email, guest.phone_number)
+
+
+def reservation_content(reservation):
+    room_number = reservation.room.number if reservation.room_id else ''
+    return _join(
+        reservation.id,
+        f"#{reservation.id}",
+        reservation.reservation_pin,
+        room_number,
+        _guest_text(reservation.guest),
+        reservation.notes,
+    )
+
+
+def guest_content(guest):
+    return _guest_text(guest)
+
+
+def room_content(room):
+    tickets = [f"{t.title} {t.description}" for t in room.tickets.all()]
+    return _join(room.number, room.get_room_type_display(), room.notes, *tickets)
+
+
+def _store(kind, object_id, content):
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=object_id, defaults={'content': content}
+    )
+
+
+def index_reservation(reservation):
+    _store('reservation', reservation.pk, reservation_content(reservation))
+
+
+def index_guest(guest):
+    _store('guest', guest.pk, guest_content(guest))
+
+
+def index_room(room):
+    _store('room', room.pk, room_content(room))
+
+
+def remove_document(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """Przebudowuje cały indeks od zera. Zwraca liczbę dokumentów wg typu."""
+    SearchDocument.objects.all().delete()
+    counts = {}
+    sources = (
+        ('reservation', Reservation.objects.select_related('guest__user', 'room'), reservation_content),
+        ('guest', GuestProfile.objects.select_related('user'), guest_content),
+        ('room', Room.objects.prefetch_related('tickets'), room_content),
+    )
+    for kind, queryset, build in sources:
+        batch = []
+        counts[kind] = 0
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(SearchDocument(kind=kind, object_id=obj.pk, content=build(obj)))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                counts[kind] += len(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch)
+            counts[kind] += len(batch)
+
+    if connection.vendor == 'sqlite' and not _fts_broken:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        except OperationalError:
+            pass
+    return counts
+
+
+def _tokens(query):
+    return TOKEN_RE.findall(normalize(query or ''))[:10]
+
+
+def _match_sqlite(tokens, limit):
+    # Każdy token jako prefiks w cudzysłowie - AND wszystkich tokenów
+    expression = ' '.join(f'"{t}"*' for t in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT d.kind, d.object_id FROM {FTS_TABLE} f "
+            f"JOIN core_searchdocument d ON d.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY f.rank LIMIT %s",
+            [expression, limit],
+        )
+        return cursor.fetchall()
+
+
+def _match_postgresql(tokens, limit):
+    expression = ' & '.join(f'{t}:*' for t in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT kind, object_id FROM core_searchdocument "
+            "WHERE to_tsvector('simple', content) @@ to_tsquery('simple', %s) "
+            "ORDER BY ts_rank(to_tsvector('simple', content), to_tsquery('simple', %s)) DESC "
+            "LIMIT %s",
+            [expression, expression, limit],
+        )
+        return cursor.fetchall()
+
+
+def _match_like(tokens, limit):
+    queryset = SearchDocument.objects.all()
+    for token in tokens:
+        queryset = queryset.filter(content__icontains=token)
+    return list(queryset.order_by('-updated_at').values_list('kind', 'object_id')[:limit])
+
+
+def _fts_unavailable(exc):
+    message = str(exc)
+    return 'no such module: fts5' in message or f'no such table: {FTS_TABLE}' in message
+
+
+def match(query, limit=50):
+    """Zwraca listę (kind, object_id) pasujących dokumentów, od najlepszych."""
+    global _fts_broken
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    try:
+        if connection.vendor == 'sqlite' and not _fts_broken:
+            return _match_sqlite(tokens, limit)
+        if connection.vendor == 'postgresql':
+            return _match_postgresql(tokens, limit)
+    except OperationalError as exc:
+        # Tylko SQLite bez rozszerzenia FTS5 (migracja nie utworzyła wtedy tabeli)
+        # przechodzi na stałe na LIKE; inne błędy (blokada, zerwane połączenie)
+        # nie mogą wyłączyć indeksu
+        if connection.vendor != 'sqlite' or not _fts_unavailable(exc):
+            raise
+        _fts_broken = True
+    return _match_like(tokens, limit)
+
+
+def search(query, limit=50):
+    """Wyszukuje obiekty i zwraca je pogrupowane, w kolejności trafności."""
+    ids = {'reservation': [], 'guest': [], 'room': []}
+    for kind, object_id in match(query, limit):
+        ids[kind].append(object_id)
+
+    def ordered(queryset, wanted):
+        found = queryset.in_bulk(wanted)
+        return [found[pk] for pk in wanted if pk in found]
+
+    return {
+        'reservations': ordered(Reservation.objects.select_related('guest__user', 'room'), ids['reservation']),
+        'guests': ordered(GuestProfile.objects.select_related('user'), ids['guest']),
+        'rooms': ordered(Room.objects.all(), ids['room']),
+    }
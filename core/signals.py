@@ -1,19 +1,409 @@
-from django.db.models.signals import pre_delete
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
-from .models import Reservation, Room
+from .models import (
+    Reservation, Room, GuestProfile, MaintenanceTicket, Payment, Season, SeasonPrice, field_changed,
+)
+from . import search, live, billing, rates, inventory, changes, calendars, pricing, guest_stats
+
+
+# Pokój zwalnia się po zatwierdzeniu usunięcia rezerwacji - wycofana transakcja
+# (albo savepoint) odrzuca callback on_commit razem z jego pokojami. Masowe
+# usuwanie w bloku ``bulk_room_release`` zbiera pokoje i zwalnia je jednym UPDATE.
+_bulk_release = threading.local()
+
+
+def _release_rooms(using, room_ids):
+    active = Reservation.objects.using(using).filter(
+        room=OuterRef('pk'),
+        status__in=['pending', 'confirmed', 'checked_in'],
+    )
+    with transaction.atomic(using=using):
+        changes.update_and_record(
+            Room.objects.using(using)
+            .filter(id__in=room_ids, status__in=['reserved', 'occupied'])
+            .exclude(Exists(active)),
+            status='available',
+        )
+
+
+@contextmanager
+def bulk_room_release(using=None):
+    """Rezerwacje usunięte w bloku zwalniają pokoje jednym callbackiem po zatwierdzeniu."""
+    using = using or DEFAULT_DB_ALIAS
+    previous = getattr(_bulk_release, 'room_ids', None)
+    room_ids = _bulk_release.room_ids = set()
+    try:
+        yield
+    finally:
+        _bulk_release.room_ids = previous
+    # Tylko gdy blok zakończył się bez wyjątku
+    if room_ids:
+        transaction.on_commit(partial(_release_rooms, using, room_ids), using=using)
 
 
 @receiver(pre_delete, sender=Reservation)
-def release_room_on_reservation_delete(sender, instance, **kwargs):
+def release_room_on_reservation_delete(sender, instance, using=None, **kwargs):
     """Sygnał wywoływany przed usunięciem rezerwacji - zwalnia pokój jeśli potrzeba"""
-    room_id = instance.room_id
-    room_status = instance.room.status
+    if instance.room_id is None:
+        return
+    room_ids = getattr(_bulk_release, 'room_ids', None)
+    if room_ids is not None:
+        room_ids.add(instance.room_id)
+        return
+    transaction.on_commit(partial(_release_rooms, using, {instance.room_id}), using=using)
+
+
+# Indeks wyszukiwania
+
+@receiver(post_save, sender=Reservation)
+def index_reservation_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_reservation(instance)
+
+
+@receiver(post_save, sender=GuestProfile)
+def index_guest_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_guest(instance)
+
+
+@receiver(post_save, sender=Room)
+def index_room_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_room(instance)
+
+
+@receiver(post_save, sender=MaintenanceTicket)
+def index_room_on_ticket_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_room(instance.room)
+
+
+USER_SEARCH_FIELDS = frozenset({'first_name', 'last_name', 'email', 'username'})
+
+
+@receiver(post_save, sender=User)
+def reindex_guest_on_user_save(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Zmiana imienia/emaila użytkownika aktualizuje dokumenty gościa i jego rezerwacji"""
+    if raw or created:
+        return
+    # Logowanie zapisuje samo last_login - nie ma czego przeindeksowywać
+    if update_fields is not None and not USER_SEARCH_FIELDS.intersection(update_fields):
+        return
+    guest = GuestProfile.objects.filter(user=instance).first()
+    if guest is None:
+        return
+    guest.user = instance
+    search.index_guest(guest)
+    for reservation in guest.reservations.select_related('room'):
+        reservation.guest = guest
+        search.index_reservation(reservation)
+
+
+@receiver(post_delete, sender=Reservation)
+def remove_reservation_from_index(sender, instance, **kwargs):
+    search.remove_document('reservation', instance.pk)
+
+
+@receiver(post_delete, sender=GuestProfile)
+def remove_guest_from_index(sender, instance, **kwargs):
+    search.remove_document('guest', instance.pk)
+
+
+@receiver(post_delete, sender=Room)
+def remove_room_from_index(sender, instance, **kwargs):
+    search.remove_document('room', instance.pk)
+
+
+# Zdarzenia na żywo (SSE)
+
+@receiver(post_save, sender=Room)
+def publish_room_status(sender, instance, raw=False, **kwargs):
+    if raw or not field_changed(instance, 'status'):
+        return
+    event = live.room_event(instance)
+    transaction.on_commit(lambda: live.publish(event))
+
+
+@receiver(post_save, sender=Reservation)
+def publish_reservation_state(sender, instance, raw=False, **kwargs):
+    if raw or not (field_changed(instance, 'status') or field_changed(instance, 'room_id')):
+        return
+    event = live.reservation_event(instance)
+    transaction.on_commit(lambda: live.publish(event))
+
+
+# Saldo rezerwacji
+
+def _cached_reservation(payment):
+    return payment.reservation if Payment.reservation.is_cached(payment) else None
+
+
+def _payment_contributions(instance, created):
+    """(poprzednia rezerwacja, poprzedni wkład, obecny wkład) zapisanej płatności"""
+    new = billing.payment_contribution(instance.payment_status, instance.amount)
+    loaded = getattr(instance, '_loaded_values', None)
+    if created or loaded is None:
+        return instance.reservation_id, billing.ZERO, new
+    old = billing.payment_contribution(loaded.get('payment_status'), loaded.get('amount'))
+    return loaded.get('reservation_id'), old, new
+
+
+def _deleted_contribution(instance):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    return billing.payment_contribution(
+        loaded.get('payment_status', instance.payment_status),
+        loaded.get('amount', instance.amount),
+    )
+
+
+@receiver(post_save, sender=Payment)
+def update_balance_on_payment_save(sender, instance, created=False, raw=False, **kwargs):
+    """Koryguje saldo o różnicę między poprzednim a obecnym stanem płatności"""
+    if raw:
+        return
+    old_reservation_id, old, new = _payment_contributions(instance, created)
+
+    cached = _cached_reservation(instance)
+    if old_reservation_id == instance.reservation_id:
+        billing.apply_payment_delta(instance.reservation_id, new - old, cached)
+    else:
+        billing.apply_payment_delta(old_reservation_id, -old)
+        billing.apply_payment_delta(instance.reservation_id, new, cached)
+
+
+@receiver(post_delete, sender=Payment)
+def update_balance_on_payment_delete(sender, instance, **kwargs):
+    billing.apply_payment_delta(instance.reservation_id, -_deleted_contribution(instance), _cached_reservation(instance))
+
+
+# Stawki dzienne (NightlyRate)
+
+@receiver(post_save, sender=Season)
+def rebuild_rates_on_season_save(sender, instance, created=False, raw=False, **kwargs):
+    """Przelicza dni starego i nowego zakresu sezonu"""
+    if raw or not (created or field_changed(instance, 'start_date') or field_changed(instance, 'end_date')):
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    starts = [d for d in (instance.start_date, loaded.get('start_date')) if d]
+    ends = [d for d in (instance.end_date, loaded.get('end_date')) if d]
+    rates.rebuild(min(starts), max(ends))
+
+
+@receiver(post_delete, sender=Season)
+def rebuild_rates_on_season_delete(sender, instance, **kwargs):
+    rates.rebuild(instance.start_date, instance.end_date)
+
+
+def _season_range(season_id):
+    return Season.objects.filter(pk=season_id).values_list('start_date', 'end_date').first()
+
+
+@receiver(post_save, sender=SeasonPrice)
+def rebuild_rates_on_season_price_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    old_season_id = loaded.get('season_id', instance.season_id)
+    room_types = {instance.room_type, loaded.get('room_type', instance.room_type)}
+    for season_id in {instance.season_id, old_season_id}:
+        season_range = _season_range(season_id)
+        if season_range:
+            rates.rebuild(*season_range, room_types=room_types)
+
+
+@receiver(post_delete, sender=SeasonPrice)
+def rebuild_rates_on_season_price_delete(sender, instance, **kwargs):
+    # Przy kaskadzie z Season zakres przeliczy też sygnał usunięcia sezonu
+    season_range = _season_range(instance.season_id)
+    if season_range:
+        rates.rebuild(*season_range, room_types=[instance.room_type])
+
+
+@receiver(post_save, sender=Room)
+def refresh_rates_on_room_save(sender, instance, created=False, raw=False, **kwargs):
+    # Naprawa zmienia liczbę pokoi do wynajęcia (rooms_total)
+    maintenance_changed = field_changed(instance, 'status') and 'maintenance' in (
+        instance.status, (getattr(instance, '_loaded_values', None) or {}).get('status'),
+    )
+    if raw or not (created or maintenance_changed or field_changed(instance, 'price') or field_changed(instance, 'room_type')):
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    rates.refresh_room_types({instance.room_type, loaded.get('room_type', instance.room_type)})
+
+
+@receiver(post_delete, sender=Room)
+def refresh_rates_on_room_delete(sender, instance, **kwargs):
+    rates.refresh_room_types([instance.room_type])
+
+
+# Rejestr pokoi według typu (RoomTypeInventory)
+
+@receiver(post_save, sender=Reservation)
+def update_inventory_on_reservation_save(sender, instance, created=False, raw=False, **kwargs):
+    """Przenosi rezerwację w rejestrze (Reservation.save działa w transakcji)"""
+    if raw:
+        return
+    old = None if created else inventory.loaded_footprint(instance)
+    inventory.apply_change(old, inventory.reservation_footprint(instance))
+
+
+@receiver(post_delete, sender=Reservation)
+def update_inventory_on_reservation_delete(sender, instance, **kwargs):
+    old = inventory.loaded_footprint(instance) if getattr(instance, '_loaded_values', None) else inventory.reservation_footprint(instance)
+    inventory.apply_change(old, None)
+
+
+def _room_stock(room_type, status):
+    return room_type, 1 if status == 'maintenance' else 0
+
+
+@receiver(post_save, sender=Room)
+def update_inventory_on_room_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    new_type, new_broken = _room_stock(instance.room_type, instance.status)
+    if created:
+        inventory.adjust_rooms(new_type, total=1, out_of_order=new_broken)
+        return
+    if not (field_changed(instance, 'room_type') or field_changed(instance, 'status')):
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    old_type, old_broken = _room_stock(loaded.get('room_type', new_type), loaded.get('status', instance.status))
+    if old_type == new_type:
+        inventory.adjust_rooms(new_type, out_of_order=new_broken - old_broken)
+    else:
+        inventory.adjust_rooms(old_type, total=-1, out_of_order=-old_broken)
+        inventory.adjust_rooms(new_type, total=1, out_of_order=new_broken)
+
+
+@receiver(post_delete, sender=Room)
+def update_inventory_on_room_delete(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    room_type, broken = _room_stock(loaded.get('room_type', instance.room_type), loaded.get('status', instance.status))
+    inventory.adjust_rooms(room_type, total=-1, out_of_order=-broken)
+
+
+# Dziennik zmian (CDC)
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_save, sender=Payment)
+def record_change_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        changes.record(instance, 'create' if created else 'update')
+
+
+@receiver(post_save, sender=Room)
+def record_room_change_on_save(sender, instance, created=False, raw=False, **kwargs):
+    """Dla pokoi dziennik śledzi status (i pełny stan przy utworzeniu)"""
+    if not raw:
+        changes.record(instance, 'create' if created else 'update', only=['status'])
+
+
+@receiver(post_delete, sender=Reservation)
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=Room)
+def record_change_on_delete(sender, instance, **kwargs):
+    changes.record(instance, 'delete')
+
+
+# Kanały iCal - wersja kalendarza pokoju (core.calendars)
+
+CALENDAR_FIELDS = ('status', 'room_id', 'room_type', 'check_in', 'check_out')
+
+
+@receiver(post_save, sender=Reservation)
+def bump_calendar_on_reservation_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not any(field_changed(instance, name) for name in CALENDAR_FIELDS):
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    rows = {(instance.room_id, instance.room_type)}
+    if not created:
+        rows.add((loaded.get('room_id'), loaded.get('room_type')))
+    calendars.bump_for_reservations(rows)
+
+
+@receiver(post_delete, sender=Reservation)
+def bump_calendar_on_reservation_delete(sender, instance, **kwargs):
+    calendars.bump_for_reservations([(instance.room_id, instance.room_type)])
+
+
+@receiver(post_save, sender=Room)
+def bump_calendar_on_room_save(sender, instance, created=False, raw=False, **kwargs):
+    """Naprawa blokuje pokój w kanale; zmiana typu przenosi go do innego kanału typu"""
+    if raw or created:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    maintenance_changed = (loaded.get('status') == 'maintenance') != (instance.status == 'maintenance')
+    if maintenance_changed or field_changed(instance, 'room_type'):
+        calendars.bump_rooms([instance.pk])
+
+
+# Wyceny pobytów - wersja cennika (core.pricing)
+
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+@receiver(post_save, sender=SeasonPrice)
+@receiver(post_delete, sender=SeasonPrice)
+def invalidate_quotes_on_pricing_change(sender, raw=False, **kwargs):
+    if not raw:
+        pricing.invalidate()
+
+
+@receiver(post_save, sender=Room)
+def invalidate_quotes_on_room_save(sender, instance, created=False, raw=False, **kwargs):
+    """Cena pokoju i cena "od" typu (najtańszy pokój) wchodzą do wycen"""
+    if raw:
+        return
+    if created or field_changed(instance, 'price') or field_changed(instance, 'room_type'):
+        pricing.invalidate()
+
+
+@receiver(post_delete, sender=Room)
+def invalidate_quotes_on_room_delete(sender, instance, **kwargs):
+    pricing.invalidate()
+
+
+# Statystyki gości (core.guest_stats)
+
+@receiver(post_save, sender=Reservation)
+def update_guest_stats_on_reservation_save(sender, instance, created=False, raw=False, **kwargs):
+    """Przenosi pobyt w statystykach gościa; zmiana gościa przenosi też wpłaty"""
+    if raw:
+        return
+    old = None if created else guest_stats.loaded_stay(instance)
+    guest_stats.apply_stay_change(old, guest_stats.reservation_stay(instance))
+    loaded = None if created else getattr(instance, '_loaded_values', None)
+    if loaded and loaded.get('guest_id') != instance.guest_id:
+        guest_stats.move_revenue(instance.pk, loaded.get('guest_id'), instance.guest_id)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_guest_stats_on_reservation_delete(sender, instance, **kwargs):
+    # Wpłaty usuwanej rezerwacji odejmują sygnały usunięcia płatności (kaskada)
+    old = guest_stats.loaded_stay(instance) if getattr(instance, '_loaded_values', None) else guest_stats.reservation_stay(instance)
+    guest_stats.apply_stay_change(old, None)
+
+
+@receiver(post_save, sender=Payment)
+def update_guest_revenue_on_payment_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old_reservation_id, old, new = _payment_contributions(instance, created)
+    if old_reservation_id == instance.reservation_id:
+        guest_stats.apply_revenue_delta(instance.reservation_id, new - old)
+    else:
+        guest_stats.apply_revenue_delta(old_reservation_id, -old)
+        guest_stats.apply_revenue_delta(instance.reservation_id, new)
 
-    if room_status in ['reserved', 'occupied']:
-        active_reservations = Reservation.objects.filter(
-            room_id=room_id,
-            status__in=['pending', 'confirmed', 'checked_in']
-        ).exclude(id=instance.id)
 
-        if not active_reservations.exists():
-            Room.objects.filter(id=room_id).update(status='available')
+@receiver(post_delete, sender=Payment)
+def update_guest_revenue_on_payment_delete(sender, instance, **kwargs):
+    guest_stats.apply_revenue_delta(instance.reservation_id, -_deleted_contribution(instance))
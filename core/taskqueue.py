@@ -0,0 +1,286 @@
+"""Kolejka zadań w bazie danych i harmonogram zadań okresowych.
+
+Widok odkłada pracę wywołaniem ``enqueue`` (albo ``funkcja.delay(...)``) -
+to jeden INSERT w bieżącej transakcji, więc zadanie staje się widoczne dla
+workera dopiero po jej zatwierdzeniu. ``manage.py run_tasks`` pobiera zadania
+warunkowym UPDATE (bezpieczne przy kilku workerach, bez zewnętrznego brokera),
+wykonuje je w puli wątków lub procesów i ponawia nieudane z rosnącym
+opóźnieniem. Zadania okresowe (``PeriodicTask``, domyślne z ``TASK_SCHEDULE``)
+mają harmonogram w składni cron liczony w strefie ``TIME_ZONE``.
+
+Zadania rejestruje dekorator ``task``; nazwą zadania jest ścieżka funkcji
+(np. ``core.tasks.render_invoice``), a argumenty muszą dać się zapisać w JSON.
+"""
+import logging
+import multiprocessing
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from importlib import import_module
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PeriodicTask, Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=3, retry_delay=30):
+    """Rejestruje funkcję jako zadanie; ``funkcja.delay(*args, **kwargs)`` odkłada ją do kolejki."""
+    def register(f):
+        f.task_name = name or f"{f.__module__}.{f.__name__}"
+        f.max_attempts = max_attempts
+        f.retry_delay = retry_delay
+        f.delay = lambda *args, **kwargs: enqueue(f.task_name, *args, **kwargs)
+        _registry[f.task_name] = f
+        return f
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    module = name.rpartition('.')[0]
+    if name not in _registry and module:
+        # Moduł z zadaniem rejestruje je przy imporcie
+        import_module(module)
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Nieznane zadanie: {name}")
+
+
+def enqueue(name, *args, run_at=None, **kwargs):
+    """Dodaje zadanie do kolejki. Zwraca obiekt Task."""
+    func = get_task(getattr(name, 'task_name', name))
+    return Task.objects.create(
+        name=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        run_at=run_at or timezone.now(),
+        max_attempts=func.max_attempts,
+    )
+
+
+# Wykonywanie
+
+def claim(limit):
+    """Rezerwuje do ``limit`` zadań gotowych do wykonania. Zwraca ich id.
+
+    Wybór i przejęcie to osobne zapytania, ale UPDATE z warunkiem na status
+    przejmuje każde zadanie co najwyżej raz, także przy kilku workerach.
+    """
+    now = timezone.now()
+    ids = list(
+        Task.objects.filter(status='queued', run_at__lte=now)
+        .order_by('run_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    Task.objects.filter(pk__in=ids, status='queued').update(
+        status='running',
+        locked_by=token,
+        locked_until=now + timedelta(seconds=getattr(settings, 'TASK_LOCK_TIMEOUT', 600)),
+        attempts=F('attempts') + 1,
+    )
+    return list(Task.objects.filter(pk__in=ids, locked_by=token).values_list('pk', flat=True))
+
+
+def execute(task_id):
+    """Wykonuje przejęte zadanie i zapisuje wynik: wykonane, ponowienie albo błąd."""
+    current = Task.objects.get(pk=task_id)
+    mine = Task.objects.filter(pk=task_id, locked_by=current.locked_by, status='running')
+    try:
+        func = get_task(current.name)
+        func(*current.args, **current.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Zadanie %s #%s nieudane (próba %s/%s)", current.name, task_id, current.attempts, current.max_attempts)
+        if current.attempts < current.max_attempts:
+            delay = getattr(_registry.get(current.name), 'retry_delay', 30) * 2 ** (current.attempts - 1)
+            mine.update(
+                status='queued', run_at=timezone.now() + timedelta(seconds=delay),
+                locked_by='', locked_until=None, last_error=error,
+            )
+        else:
+            mine.update(status='failed', finished_at=timezone.now(), locked_until=None, last_error=error)
+        return False
+    mine.update(status='done', finished_at=timezone.now(), locked_until=None)
+    return True
+
+
+def _run_in_worker(task_id):
+    # Wątki i procesy puli mają własne połączenia - zamykane jak po żądaniu HTTP
+    close_old_connections()
+    try:
+        return execute(task_id)
+    finally:
+        close_old_connections()
+
+
+def requeue_stale():
+    """Zadania przejęte przez worker, który przestał działać (minęła blokada), wracają do kolejki."""
+    now = timezone.now()
+    stale = Task.objects.filter(status='running', locked_until__lt=now)
+    message = "Przekroczony czas blokady - worker przerwany"
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=now, locked_until=None, last_error=message,
+    )
+    return stale.update(status='queued', locked_by='', locked_until=None, last_error=message)
+
+
+def run_pending(limit=100):
+    """Wykonuje gotowe zadania w bieżącym wątku (testy, jednorazowe uruchomienia)."""
+    done = 0
+    for task_id in claim(limit):
+        execute(task_id)
+        done += 1
+    return done
+
+
+# Harmonogram (cron)
+
+class Cron:
+    """Wyrażenie cron: minuta godzina dzień miesiąc dzień_tygodnia (0 lub 7 = niedziela).
+
+    Obsługuje ``*``, listy, zakresy i kroki (``*/15``, ``1-5``, ``0,30``).
+    """
+    BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Wyrażenie cron musi mieć 5 pól: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.BOUNDS)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        # Jak w cronie: przy ograniczeniu obu pól dnia wystarczy zgodność jednego
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    @staticmethod
+    def _parse(part, low, high):
+        values = set()
+        for item in part.split(','):
+            spec, _, step = item.partition('/')
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(v) for v in spec.split('-'))
+            else:
+                start = int(spec)
+                end = high if step else start
+            if not (low <= start <= end <= high):
+                raise ValueError(f"Wartość poza zakresem {low}-{high}: {item!r}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, day):
+        in_month = day.day in self.days
+        in_week = (day.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment):
+        """Najbliższa chwila po ``moment`` (datetime ze strefą) zgodna z wyrażeniem."""
+        local = timezone.localtime(moment).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit = local + timedelta(days=366 * 5)
+        while local < limit:
+            if local.month not in self.months:
+                local = datetime(local.year + local.month // 12, local.month % 12 + 1, 1)
+            elif not self._day_matches(local):
+                local = datetime(local.year, local.month, local.day) + timedelta(days=1)
+            elif local.hour not in self.hours:
+                local = local.replace(minute=0) + timedelta(hours=1)
+            elif local.minute not in self.minutes:
+                local += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(local)
+        raise ValueError("Wyrażenie cron nie wskazuje żadnego terminu")
+
+
+def sync_schedule(schedule=None):
+    """Zakłada brakujące zadania okresowe z ``TASK_SCHEDULE`` (istniejących nie zmienia)."""
+    schedule = getattr(settings, 'TASK_SCHEDULE', {}) if schedule is None else schedule
+    now = timezone.now()
+    for name, entry in schedule.items():
+        PeriodicTask.objects.get_or_create(name=name, defaults={
+            'task': entry['task'],
+            'cron': entry['cron'],
+            'args': entry.get('args', []),
+            'kwargs': entry.get('kwargs', {}),
+            'next_run_at': Cron(entry['cron']).next_after(now),
+        })
+
+
+def schedule_due(now=None):
+    """Odkłada do kolejki zadania okresowe, których termin minął. Zwraca ich liczbę."""
+    now = now or timezone.now()
+    for periodic in PeriodicTask.objects.filter(enabled=True, next_run_at__isnull=True):
+        PeriodicTask.objects.filter(pk=periodic.pk, next_run_at__isnull=True).update(
+            next_run_at=Cron(periodic.cron).next_after(now),
+        )
+    queued = 0
+    for periodic in PeriodicTask.objects.filter(enabled=True, next_run_at__lte=now):
+        with transaction.atomic():
+            # Warunek na poprzedni termin: przy kilku workerach zadanie trafi do kolejki raz
+            won = PeriodicTask.objects.filter(pk=periodic.pk, next_run_at=periodic.next_run_at).update(
+                last_run_at=now, next_run_at=Cron(periodic.cron).next_after(now),
+            )
+            if won:
+                enqueue(periodic.task, *periodic.args, **periodic.kwargs)
+                queued += 1
+    return queued
+
+
+# Worker
+
+class Worker:
+    """Pętla ``run_tasks``: harmonogram, przejmowanie zadań i pula wykonawców."""
+
+    def __init__(self, workers=None, pool='thread', poll_interval=None):
+        self.workers = workers or getattr(settings, 'TASK_WORKERS', 4)
+        self.pool = pool
+        self.poll_interval = poll_interval if poll_interval is not None else getattr(settings, 'TASK_POLL_INTERVAL', 2)
+
+    def _executor(self):
+        if self.pool == 'process':
+            # "spawn": procesy nie dziedziczą połączeń do bazy rodzica
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='task')
+
+    def run(self, once=False):
+        """Przetwarza zadania; z ``once`` kończy, gdy kolejka jest pusta. Zwraca liczbę wykonanych."""
+        sync_schedule()
+        processed = 0
+        running = set()
+        with self._executor() as executor:
+            while True:
+                schedule_due()
+                requeue_stale()
+                free = self.workers - len(running)
+                claimed = claim(free) if free > 0 else []
+                for task_id in claimed:
+                    running.add(executor.submit(_run_in_worker, task_id))
+                if once and not claimed and not running:
+                    break
+                if running:
+                    finished, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    processed += len(finished)
+                elif not claimed:
+                    time.sleep(self.poll_interval)
+        return processed
@@ -0,0 +1,59 @@
+"""Zadania wykonywane przez kolejkę (core.taskqueue) - odkładane z widoków lub okresowe."""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import archive, audit, inventory, invoices, notifications, payments, rates
+from .models import Task
+from .taskqueue import task
+
+
+@task
+def night_audit(audit_date=None):
+    from datetime import date
+    audit.run(date.fromisoformat(audit_date) if audit_date else None)
+
+
+@task
+def rebuild_nightly_rates():
+    with transaction.atomic():
+        rates.rebuild_all()
+
+
+@task
+def rebuild_inventory():
+    with transaction.atomic():
+        inventory.rebuild_all()
+
+
+@task(max_attempts=5, retry_delay=10)
+def render_invoice(reservation_id):
+    """Renderuje fakturę z wyprzedzeniem, żeby pobranie jej przez gościa było natychmiastowe."""
+    reservation = invoices.invoice_queryset().filter(pk=reservation_id).first()
+    if reservation is not None:
+        invoices.get_or_render(invoices.invoice_context(reservation))
+
+
+@task(max_attempts=1)
+def send_outbox():
+    """Wysyła zaległe powiadomienia (ponowienia prowadzi sama skrzynka nadawcza)."""
+    notifications.send_all()
+
+
+@task(max_attempts=1)
+def settle_payments():
+    """Rozlicza płatności online przez bramkę (ponowienia prowadzą same płatności)."""
+    payments.settle_all()
+
+
+@task(max_attempts=1)
+def archive_reservations():
+    """Przenosi historyczne rezerwacje do archiwum (paczkami, każda we własnej transakcji)."""
+    archive.archive()
+
+
+@task
+def purge_tasks(days=14):
+    """Usuwa wykonane zadania starsze niż ``days`` dni (nieudane zostają do wglądu)."""
+    Task.objects.filter(status='done', finished_at__lt=timezone.now() - timedelta(days=days)).delete()
@@ -1,11 +1,14 @@
-from django.test import TestCase
+from unittest import skipUnless
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from datetime import date, timedelta
 from decimal import Decimal
 from .models import (
-    GuestProfile, Room, Season, SeasonPrice,
+    GuestProfile, EmployeeProfile, Room, Season, SeasonPrice,
     Reservation, Payment, compute_reservation_price
 )
+from . import pdf
 
 
 class ReservationTestCase(TestCase):
@@ -184,3 +187,1564 @@ class ComputeReservationPriceWithSeasonTestCase(TestCase):
         price = compute_reservation_price(reservation)
         expected_price = 3 * 100.00 * 1.5
         self.assertEqual(price, expected_price)
+
+
+class FullTextSearchTestCase(TestCase):
+    """Test 5: Indeks wyszukiwania aktualizowany sygnałami"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searchguest',
+            email='jk@test.com',
+            first_name='Jan',
+            last_name='Kowalski'
+        )
+        self.guest = GuestProfile.objects.create(user=self.user, phone_number='500600700')
+        self.room = Room.objects.create(number='305', price=Decimal('120.00'))
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in=date.today() + timedelta(days=3),
+            check_out=date.today() + timedelta(days=5),
+            reservation_pin='4821',
+            notes='Gość prosi o łóżeczko dla dziecka'
+        )
+
+    def test_search_by_pin_notes_and_phone(self):
+        """Wyszukiwanie po PIN, treści notatek (bez polskich znaków) i telefonie"""
+        from . import search
+        self.assertEqual(search.search('4821')['reservations'], [self.reservation])
+        self.assertEqual(search.search('lozeczko')['reservations'], [self.reservation])
+        results = search.search('5006')
+        self.assertIn(self.guest, results['guests'])
+        self.assertIn(self.reservation, results['reservations'])
+        self.assertEqual(search.search('305')['rooms'], [self.room])
+
+    def test_index_follows_changes(self):
+        """Zmiana nazwiska i usunięcie rezerwacji są widoczne w indeksie"""
+        from . import search
+        self.user.last_name = 'Nowak'
+        self.user.save()
+        self.assertEqual(search.search('Nowak')['reservations'], [self.reservation])
+        self.assertEqual(search.search('Kowalski')['guests'], [])
+
+        self.reservation.delete()
+        self.assertEqual(search.search('4821')['reservations'], [])
+
+        search.rebuild_index()
+        self.assertEqual(search.search('Nowak')['guests'], [self.guest])
+
+    def test_login_and_transient_errors_keep_index(self):
+        """Zapis samego last_login nie przeindeksowuje, a przejściowy błąd nie wyłącza FTS"""
+        from unittest import mock
+        from django.db import OperationalError
+        from . import search
+        with mock.patch.object(search, 'index_guest') as index_guest:
+            self.user.save(update_fields=['last_login'])
+            index_guest.assert_not_called()
+            self.user.save(update_fields=['email'])
+            index_guest.assert_called_once()
+
+        with mock.patch.object(search, '_match_sqlite', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                search.match('4821')
+        self.assertFalse(search._fts_broken)
+
+
+class MaintenanceTicketTestCase(TestCase):
+    """Test 6: Zgłoszenia usterek zamiast dopisywania do Room.notes"""
+
+    def setUp(self):
+        self.room = Room.objects.create(number='410', price=Decimal('150.00'))
+        self.other_room = Room.objects.create(number='411', price=Decimal('150.00'))
+
+    def test_ticket_lifecycle_and_board(self):
+        """Zgłoszenie przełącza pokój w naprawę, naprawa zamyka je bez utraty historii"""
+        from . import maintenance
+        maintenance.open_ticket(self.room, None, 'housekeeping', 'Cieknący kran', 'Łazienka')
+        maintenance.open_ticket(self.room, None, 'maintenance', 'Klimatyzacja', '')
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, 'maintenance')
+        self.assertEqual(self.room.notes, '')
+
+        with self.assertNumQueries(1):
+            board = maintenance.maintenance_board()
+        self.assertEqual(len(board), 1)
+        self.assertEqual([t['title'] for t in board[0]['tickets']], ['Cieknący kran', 'Klimatyzacja'])
+
+        self.assertEqual(maintenance.close_room_tickets(self.room), 2)
+        self.assertEqual(maintenance.maintenance_board(), [{'id': self.room.id, 'number': '410', 'status': 'maintenance', 'tickets': []}])
+
+        stats = maintenance.repair_stats()
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['open'], 0)
+        self.assertIsNotNone(stats['mean_time_to_repair'])
+        self.assertEqual(maintenance.tickets_per_room()[0]['room__number'], '410')
+
+
+class HousekeepingQueueTestCase(TestCase):
+    """Test 7: Kolejka housekeepingu według przyjazdów, wyjazdów i pobytów"""
+
+    def setUp(self):
+        today = date.today()
+        user = User.objects.create_user(username='hkguest')
+        guest = GuestProfile.objects.create(user=user)
+        self.arrival_room = Room.objects.create(number='501', price=Decimal('100.00'), status='dirty')
+        self.departure_room = Room.objects.create(number='502', price=Decimal('100.00'), status='dirty')
+        self.stay_room = Room.objects.create(number='503', price=Decimal('100.00'), status='occupied')
+        Room.objects.create(number='504', price=Decimal('100.00'), status='available')
+        Reservation.objects.create(guest=guest, room=self.arrival_room, check_in=today,
+                                   check_out=today + timedelta(days=2), status='confirmed')
+        Reservation.objects.create(guest=guest, room=self.departure_room, check_in=today - timedelta(days=2),
+                                   check_out=today, status='completed')
+        Reservation.objects.create(guest=guest, room=self.stay_room, check_in=today - timedelta(days=1),
+                                   check_out=today + timedelta(days=1), status='checked_in')
+        for name in ('anna', 'beata'):
+            maid_user = User.objects.create_user(username=name)
+            EmployeeProfile.objects.create(user=maid_user, role='maid')
+
+    def test_queue_ranking_and_balance(self):
+        """Ranking pilności i równy rozdział w stałej liczbie zapytań"""
+        from . import housekeeping
+        with self.assertNumQueries(2):
+            board = housekeeping.build_board()
+        queue = board['queue']
+        self.assertEqual([r.number for r in queue], ['501', '502', '503'])
+        self.assertEqual([r.hk_priority for r in queue], [1, 2, 3])
+        self.assertNotEqual(queue[0].assigned_maid, queue[1].assigned_maid)
+        self.assertEqual(sorted(load for _, load in board['workload']), [1.0, 1.5])
+
+    def test_queue_after_cleaning_and_service(self):
+        """Posprzątany pokój znika z kolejki, serwis pobytowy nie zwalnia zajętego pokoju"""
+        from django.urls import reverse
+        from . import housekeeping
+        maid = User.objects.create_user(username='hkmaid', password='pass12345')
+        EmployeeProfile.objects.create(user=maid, role='maid')
+        self.client.login(username='hkmaid', password='pass12345')
+        url = reverse('employee:housekeeping')
+
+        self.client.post(url, {'action': 'mark_clean', 'room_id': self.departure_room.pk})
+        self.assertEqual([r.number for r in housekeeping.housekeeping_queue()], ['501', '503'])
+
+        # "Posprzątane" w pokoju z gościem nie czyni go wolnym
+        self.client.post(url, {'action': 'mark_clean', 'room_id': self.stay_room.pk})
+        self.stay_room.refresh_from_db()
+        self.assertEqual(self.stay_room.status, 'occupied')
+        self.assertEqual([r.number for r in housekeeping.housekeeping_queue()], ['501'])
+
+        # Serwis pobytowy wraca następnego dnia
+        tomorrow = date.today() + timedelta(days=1)
+        Reservation.objects.filter(room=self.stay_room).update(check_out=tomorrow + timedelta(days=1))
+        queue = housekeeping.housekeeping_queue(tomorrow)
+        self.assertIn('503', [r.number for r in queue])
+        self.client.post(url, {'action': 'mark_serviced', 'room_id': self.stay_room.pk})
+        self.stay_room.refresh_from_db()
+        self.assertEqual((self.stay_room.status, self.stay_room.serviced_on), ('occupied', date.today()))
+
+    def test_checked_in_departure_is_not_cleaned_yet(self):
+        """Gość zameldowany w dniu wyjazdu nie trafia do kolejki jako wyjazd"""
+        from . import housekeeping
+        guest = GuestProfile.objects.get(user__username='hkguest')
+        room = Room.objects.create(number='505', price=Decimal('100.00'), status='occupied')
+        Reservation.objects.create(guest=guest, room=room, check_in=date.today() - timedelta(days=1),
+                                   check_out=date.today(), status='checked_in')
+        self.assertNotIn('505', [r.number for r in housekeeping.housekeeping_queue()])
+
+
+class LiveUpdatesTestCase(TestCase):
+    """Test 8: Zmiany statusów trafiają do kanału SSE jako delty"""
+
+    def setUp(self):
+        self.room = Room.objects.create(number='601', price=Decimal('100.00'))
+
+    def test_broker_fan_out(self):
+        """Każdy subskrybent dostaje opublikowane zdarzenie"""
+        import asyncio
+        from . import live
+
+        broker = live.InProcessBroker()
+
+        async def scenario():
+            first, second = broker.subscribe(), broker.subscribe()
+            broker.publish({'type': 'room', 'id': 1})
+            events = [await asyncio.wait_for(s.get(), 1) for s in (first, second)]
+            first.close()
+            second.close()
+            return events
+
+        self.assertEqual(asyncio.run(scenario()), [{'type': 'room', 'id': 1}] * 2)
+        self.assertEqual(broker._subscriptions, set())
+
+    def test_room_status_change_is_published_after_commit(self):
+        """Zdarzenie idzie tylko przy zmianie statusu i dopiero po zatwierdzeniu transakcji"""
+        from unittest import mock
+        from . import live
+
+        room = Room.objects.get(pk=self.room.pk)
+        with mock.patch.object(live, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                room.price = Decimal('110.00')
+                room.save()
+            publish.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                room.status = 'dirty'
+                room.save()
+            publish.assert_called_once()
+            event = publish.call_args[0][0]
+            self.assertEqual((event['type'], event['id'], event['status']), ('room', room.pk, 'dirty'))
+
+
+class ReservationBalanceTestCase(TestCase):
+    """Test 9: Zdenormalizowane saldo rezerwacji aktualizowane przez płatności"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='balanceguest')
+        self.guest = GuestProfile.objects.create(user=user)
+        self.room = Room.objects.create(number='701', price=Decimal('100.00'))
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in=date.today() + timedelta(days=1),
+            check_out=date.today() + timedelta(days=4),
+            total_price=Decimal('300.00')
+        )
+
+    def test_payment_create_edit_delete(self):
+        """Tworzenie, edycja i usunięcie płatności przesuwa saldo"""
+        self.assertEqual(self.reservation.balance_due, Decimal('300.00'))
+        payment = Payment.objects.create(reservation=self.reservation, amount=Decimal('100.00'))
+        self.assertEqual(self.reservation.amount_paid, Decimal('100.00'))
+
+        payment = Payment.objects.get(pk=payment.pk)
+        payment.amount = Decimal('250.00')
+        payment.save()
+        payment.payment_status = 'failed'
+        payment.save()
+        Payment.objects.create(reservation=self.reservation, amount=Decimal('50.00'))
+
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.amount_paid, Decimal('50.00'))
+        self.assertEqual(self.reservation.balance_due, Decimal('250.00'))
+
+        Payment.objects.filter(payment_status='completed').get().delete()
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.amount_paid, Decimal('0.00'))
+
+    def test_stale_reservation_save_keeps_payments(self):
+        """Zapis nieaktualnej kopii rezerwacji nie kasuje wpłat i przelicza saldo z nową ceną"""
+        stale = Reservation.objects.get(pk=self.reservation.pk)
+        Payment.objects.create(reservation=Reservation.objects.get(pk=self.reservation.pk), amount=Decimal('120.00'))
+        stale.total_price = Decimal('400.00')
+        stale.status = 'confirmed'
+        stale.save()
+
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.amount_paid, Decimal('120.00'))
+        self.assertEqual(self.reservation.balance_due, Decimal('280.00'))
+
+    def test_reconcile_and_outstanding_report(self):
+        """Uzgadnianie naprawia rozjazd, raport salda to jedno zapytanie"""
+        from . import billing
+        Payment.objects.create(reservation=self.reservation, amount=Decimal('100.00'))
+        Reservation.objects.filter(pk=self.reservation.pk).update(amount_paid=0, balance_due=0)
+        self.assertEqual(len(billing.reconcile_balances(fix=True)), 1)
+        self.assertEqual(billing.reconcile_balances(), [])
+
+        with self.assertNumQueries(1):
+            rows = [(r.pk, r.balance_due, r.guest.user.username, r.room.number) for r in billing.outstanding_balances()]
+        self.assertEqual(rows, [(self.reservation.pk, Decimal('200.00'), 'balanceguest', '701')])
+
+
+class InvoiceCacheTestCase(TestCase):
+    """Test 10: Faktury wersjonowane skrótem danych i serwowane warunkowo"""
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = override_settings(INVOICE_CACHE_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='invoiceguest', password='pass12345', first_name='Łucja')
+        self.guest = GuestProfile.objects.create(user=self.user)
+        self.room = Room.objects.create(number='801', price=Decimal('100.00'))
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in=date.today() + timedelta(days=1),
+            check_out=date.today() + timedelta(days=3),
+            total_price=Decimal('200.00')
+        )
+
+    def _fingerprint(self):
+        from . import invoices
+        reservation = invoices.invoice_queryset().get(pk=self.reservation.pk)
+        return invoices.invoice_fingerprint(invoices.invoice_context(reservation))
+
+    def test_fingerprint_follows_invoice_data(self):
+        """Skrót zmienia się z płatnością i statusem, a nie z innymi polami"""
+        from .pdf import clean_text
+        initial = self._fingerprint()
+        self.assertEqual(self._fingerprint(), initial)
+
+        Payment.objects.create(reservation=self.reservation, amount=Decimal('50.00'))
+        after_payment = self._fingerprint()
+        self.assertNotEqual(after_payment, initial)
+
+        Reservation.objects.filter(pk=self.reservation.pk).update(reservation_pin='1234', notes='Dostawka')
+        self.assertEqual(self._fingerprint(), after_payment)
+        self.assertEqual(clean_text('Łucja Źdźbło'), 'Lucja Zdzblo')
+
+    def test_invoice_uses_configured_hotel_name(self):
+        """Faktura ma nazwę hotelu z ustawień, a jej zmiana daje nową wersję pliku"""
+        from django.test import override_settings
+        from . import invoices
+        before = self._fingerprint()
+        with override_settings(HOTEL_NAME='Hotel Nad Jeziorem'):
+            reservation = invoices.invoice_queryset().get(pk=self.reservation.pk)
+            self.assertEqual(invoices.invoice_context(reservation)['hotel'], 'Hotel Nad Jeziorem')
+            self.assertNotEqual(self._fingerprint(), before)
+            if pdf.available():
+                self.assertTrue(pdf.render_invoice(invoices.invoice_context(reservation)).startswith(b'%PDF'))
+
+    def test_conditional_download_and_zip_stream(self):
+        """Zgodny ETag daje 304 bez renderowania; archiwum ZIP składa się strumieniowo"""
+        import io
+        import zipfile
+        from django.urls import reverse
+        from . import invoices
+
+        self.client.login(username='invoiceguest', password='pass12345')
+        response = self.client.get(
+            reverse('reservation_invoice_pdf', args=[self.reservation.pk]),
+            HTTP_IF_NONE_MATCH=f'"{self._fingerprint()}"',
+        )
+        self.assertEqual(response.status_code, 304)
+
+        archive = b''.join(invoices.stream_zip([('a.pdf', b'%PDF-a'), ('b.pdf', b'%PDF-b')]))
+        with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+            self.assertEqual(zf.namelist(), ['a.pdf', 'b.pdf'])
+            self.assertEqual(zf.read('b.pdf'), b'%PDF-b')
+
+    @skipUnless(pdf.available(), "wymaga reportlab")
+    def test_invoice_rendered_once_per_version(self):
+        """Pierwsze pobranie renderuje i zapisuje PDF, kolejne wysyła plik z dysku"""
+        from unittest import mock
+        from django.urls import reverse
+
+        self.client.login(username='invoiceguest', password='pass12345')
+        url = reverse('reservation_invoice_pdf', args=[self.reservation.pk])
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        content = b''.join(first.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertEqual(first['ETag'], f'"{self._fingerprint()}"')
+
+        with mock.patch.object(pdf, 'render_invoice') as render:
+            second = self.client.get(url)
+            self.assertEqual(b''.join(second.streaming_content), content)
+            render.assert_not_called()
+
+
+class NightlyRateTestCase(TestCase):
+    """Test 11: Tabela stawek dziennych i kalendarz cen"""
+
+    def setUp(self):
+        from . import rates
+        self.rates = rates
+        self.today = date.today()
+        Room.objects.create(number='901', price=Decimal('100.00'), room_type='double')
+        Room.objects.create(number='902', price=Decimal('80.00'), room_type='double')
+        Room.objects.create(number='903', price=Decimal('50.00'), room_type='single', capacity=1)
+        rates.rebuild_all()
+
+    def test_season_changes_rebuild_rates(self):
+        """Sezon i jego ceny przeliczają tabelę, a cena rezerwacji zgadza się z pętlą dzień po dniu"""
+        from .models import NightlyRate
+        season = Season.objects.create(
+            name='Wysoki', start_date=self.today + timedelta(days=10), end_date=self.today + timedelta(days=12)
+        )
+        price = SeasonPrice.objects.create(season=season, room_type='double', price_multiplier=Decimal('1.50'))
+        rate = NightlyRate.objects.get(room_type='double', date=self.today + timedelta(days=11))
+        self.assertEqual((rate.multiplier, rate.price_from, rate.rooms_total), (Decimal('1.50'), Decimal('120.00'), 2))
+
+        room = Room.objects.get(number='901')
+        stay = Reservation(room=room, check_in=self.today + timedelta(days=9), check_out=self.today + timedelta(days=13))
+        with self.assertNumQueries(1):
+            fast = compute_reservation_price(stay)
+        NightlyRate.objects.all().delete()
+        self.assertEqual(fast, compute_reservation_price(stay))
+        self.assertEqual(fast, Decimal('550.00'))
+
+        self.rates.rebuild_all()
+        price.delete()
+        rate = NightlyRate.objects.get(room_type='double', date=self.today + timedelta(days=11))
+        self.assertEqual(rate.multiplier, Decimal('1.00'))
+
+    def test_month_calendar(self):
+        """Kalendarz podaje najtańszy typ z wolnym pokojem i liczbę wolnych pokoi"""
+        from django.urls import reverse
+        guest = GuestProfile.objects.create(user=User.objects.create_user(username='calendarguest'))
+        night = self.today + timedelta(days=40)
+        Reservation.objects.create(
+            guest=guest, room=Room.objects.get(number='903'),
+            check_in=night, check_out=night + timedelta(days=1), status='confirmed'
+        )
+        room = Room.objects.get(number='902')
+        room.price = Decimal('90.00')
+        room.save()
+
+        # Sprawdzenie pokrycia miesiąca w tabeli + zapytanie kalendarza
+        with self.assertNumQueries(2):
+            days = self.rates.month_calendar(night.year, night.month)
+        day = days[night.day - 1]
+        self.assertEqual((day['price_from'], day['room_type'], day['open_rooms']), ('90.00', 'double', 2))
+
+        # Rezerwacja typu bez przydzielonego pokoju też zajmuje pokój w kalendarzu
+        Reservation.objects.create(
+            guest=guest, room=None, room_type='double',
+            check_in=night, check_out=night + timedelta(days=1), status='confirmed'
+        )
+        day = self.rates.month_calendar(night.year, night.month)[night.day - 1]
+        self.assertEqual((day['price_from'], day['room_type'], day['open_rooms']), ('90.00', 'double', 1))
+
+        response = self.client.get(reverse('price_calendar_api'), {'month': night.strftime('%Y-%m'), 'guests': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['days']), len(days))
+
+    def test_missing_rates_and_rooms_in_maintenance(self):
+        """Kalendarz uzupełnia pustą tabelę, a pokoje w naprawie nie są liczone jako wolne"""
+        from .models import NightlyRate
+        NightlyRate.objects.all().delete()
+        night = self.today + timedelta(days=40)
+        room = Room.objects.get(number='901')
+        room.status = 'maintenance'
+        room.save()
+
+        day = self.rates.month_calendar(night.year, night.month)[night.day - 1]
+        self.assertEqual((day['price_from'], day['room_type'], day['open_rooms']), ('50.00', 'single', 2))
+        self.assertEqual(NightlyRate.objects.get(room_type='double', date=night).rooms_total, 1)
+        room.status = 'available'
+        room.save()
+        self.assertEqual(NightlyRate.objects.get(room_type='double', date=night).rooms_total, 2)
+
+
+class RoomTypeInventoryTestCase(TestCase):
+    """Test 12: Rejestr pokoi według typu prowadzony przez rezerwacje i pokoje"""
+
+    def setUp(self):
+        from . import inventory
+        self.inventory = inventory
+        self.today = date.today()
+        self.rooms = [
+            Room.objects.create(number=str(n), price=Decimal('100.00'), room_type='double') for n in (1001, 1002)
+        ]
+        self.guest = GuestProfile.objects.create(user=User.objects.create_user(username='inventoryguest'))
+        inventory.rebuild_all()
+
+    def _booked(self, offset):
+        from .models import RoomTypeInventory
+        return RoomTypeInventory.objects.get(room_type='double', date=self.today + timedelta(days=offset)).booked
+
+    def test_ledger_follows_bookings_and_rooms(self):
+        """Rezerwacja, zmiana dat, anulowanie i naprawa pokoju aktualizują rejestr"""
+        day = lambda n: self.today + timedelta(days=n)
+        reservation = Reservation.objects.create(
+            guest=self.guest, room=self.rooms[0], check_in=day(5), check_out=day(8), status='confirmed'
+        )
+        self.assertEqual(reservation.room_type, 'double')
+        self.assertEqual([self._booked(n) for n in (4, 5, 7, 8)], [0, 1, 1, 0])
+
+        reservation.check_out = day(6)
+        reservation.save()
+        self.assertEqual([self._booked(n) for n in (5, 6, 7)], [1, 0, 0])
+
+        room = Room.objects.get(pk=self.rooms[1].pk)
+        room.status = 'maintenance'
+        room.save()
+        self.assertFalse(self.inventory.is_available('double', day(5), day(6)))
+        self.assertTrue(self.inventory.is_available('double', day(6), day(9)))
+
+        reservation.status = 'cancelled'
+        reservation.save()
+        self.assertEqual(self._booked(5), 0)
+        self.assertEqual(self.inventory.available_rooms('double', day(3), day(10)), 1)
+
+        from .models import RoomTypeInventory
+        ledger = RoomTypeInventory.objects.order_by('room_type', 'date').values_list('total', 'booked', 'out_of_order')
+        expected = list(ledger)
+        self.inventory.rebuild_all()
+        self.assertEqual(list(ledger), expected)
+
+    def test_room_assigned_at_check_in(self):
+        """Rezerwacja na typ zajmuje rejestr, a pokój dostaje przy zameldowaniu"""
+        from django.urls import reverse
+        Reservation.objects.create(
+            guest=self.guest, room=self.rooms[0], check_in=self.today, check_out=self.today + timedelta(days=2),
+            status='confirmed'
+        )
+        by_type = Reservation.objects.create(
+            guest=self.guest, room_type='double', check_in=self.today, check_out=self.today + timedelta(days=2),
+            status='confirmed', total_price=Decimal('200.00')
+        )
+        self.assertFalse(self.inventory.is_available('double', self.today, self.today + timedelta(days=1)))
+
+        staff = User.objects.create_user(username='inventorystaff', password='pass12345')
+        EmployeeProfile.objects.create(user=staff, role='receptionist')
+        self.client.login(username='inventorystaff', password='pass12345')
+        self.client.post(reverse('employee:reservation_detail', args=[by_type.pk]), {'action': 'check_in'})
+
+        by_type.refresh_from_db()
+        self.assertEqual((by_type.status, by_type.room_id), ('checked_in', self.rooms[1].pk))
+        self.assertEqual(self._booked(0), 2)
+
+    def test_room_booking_respects_type_ledger(self):
+        """Rezerwacja konkretnego pokoju nie zajmie miejsca trzymanego przez rezerwację na typ"""
+        from django.urls import reverse
+        self.rooms[1].delete()
+        check_in, check_out = self.today + timedelta(days=3), self.today + timedelta(days=5)
+        by_type = Reservation.objects.create(
+            guest=self.guest, room_type='double', check_in=check_in, check_out=check_out, status='confirmed',
+        )
+        self.assertEqual(self.inventory.available_rooms('double', check_in, check_out), 0)
+
+        dates = {'room_id': self.rooms[0].pk, 'check_in_date': str(check_in), 'check_out_date': str(check_out)}
+        User.objects.create_user(username='ledgerguest', password='pass12345')
+        self.client.login(username='ledgerguest', password='pass12345')
+        self.client.post(reverse('guest:create_reservation'), dates)
+        self.client.post(reverse('public_create_reservation'), dates)
+        staff = User.objects.create_user(username='ledgerstaff', password='pass12345')
+        EmployeeProfile.objects.create(user=staff, role='receptionist')
+        self.client.login(username='ledgerstaff', password='pass12345')
+        self.client.post(reverse('employee:reservation_create'), {**dates, 'guest_id': self.guest.pk})
+
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(self.inventory.available_rooms('double', check_in, check_out), 0)
+        self.assertEqual(self.inventory.assign_room(by_type), self.rooms[0])
+
+    def test_check_out_without_room(self):
+        """Wymeldowanie rezerwacji na typ bez przydzielonego pokoju nie wywraca widoku"""
+        from django.urls import reverse
+        by_type = Reservation.objects.create(
+            guest=self.guest, room_type='double', check_in=self.today, check_out=self.today + timedelta(days=1),
+            status='confirmed', total_price=Decimal('100.00'),
+        )
+        Payment.objects.create(reservation=by_type, amount=Decimal('100.00'), payment_date=self.today)
+        staff = User.objects.create_user(username='checkoutstaff', password='pass12345')
+        EmployeeProfile.objects.create(user=staff, role='receptionist')
+        self.client.login(username='checkoutstaff', password='pass12345')
+        response = self.client.post(reverse('employee:reservation_detail', args=[by_type.pk]), {'action': 'check_out'})
+        self.assertEqual(response.status_code, 302)
+        by_type.refresh_from_db()
+        self.assertEqual(by_type.status, 'completed')
+
+    def test_lists_show_unassigned_room(self):
+        """Listy rezerwacji pokazują typ pokoju "do przydziału" zamiast pustego numeru"""
+        from django.urls import reverse
+        user = User.objects.create_user(username='typeguest', password='pass12345')
+        by_type = Reservation.objects.create(
+            guest=GuestProfile.objects.create(user=user), room_type='double', check_in=self.today,
+            check_out=self.today + timedelta(days=1), status='confirmed',
+        )
+        staff = User.objects.create_user(username='liststaff', password='pass12345')
+        EmployeeProfile.objects.create(user=staff, role='receptionist')
+        self.client.login(username='liststaff', password='pass12345')
+        for url in (reverse('employee:reservations'), reverse('employee:dashboard')):
+            self.assertContains(self.client.get(url), 'Dwuosobowy (do przydziału)')
+
+        self.client.login(username='typeguest', password='pass12345')
+        self.assertContains(self.client.get(reverse('guest:reservations')), '(do przydziału)')
+        response = self.client.get(reverse('guest:reservation_detail', args=[by_type.pk]))
+        self.assertContains(response, 'przydzielony przy zameldowaniu')
+        self.assertNotContains(response, 'Cena za noc')
+
+
+class RoomAssignmentTestCase(TestCase):
+    """Test 13: Optymalizator przydziału pokoi usuwa krótkie luki w grafiku"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.rooms = [
+            Room.objects.create(number=str(n), price=Decimal('100.00'), room_type='double') for n in (1101, 1102)
+        ]
+        self.guest = GuestProfile.objects.create(user=User.objects.create_user(username='assignmentguest'))
+
+    def _book(self, room, start, end, **extra):
+        return Reservation.objects.create(
+            guest=self.guest, room=room, check_in=self.today + timedelta(days=start),
+            check_out=self.today + timedelta(days=end), status='confirmed', **extra
+        )
+
+    def test_dry_run_then_apply(self):
+        """Podgląd niczego nie zmienia, --apply przenosi pobyt do luki"""
+        from io import StringIO
+        from django.core.management import call_command
+        self._book(self.rooms[0], 1, 3)
+        self._book(self.rooms[0], 5, 8)
+        gap_filler = self._book(self.rooms[1], 3, 5)
+
+        out = StringIO()
+        call_command('optimize_room_assignment', room_type='double', stdout=out)
+        self.assertIn(f"#{gap_filler.pk}", out.getvalue())
+        self.assertIn("Krótkie luki: 1 -> 0", out.getvalue())
+        gap_filler.refresh_from_db()
+        self.assertEqual(gap_filler.room_id, self.rooms[1].pk)
+
+        call_command('optimize_room_assignment', room_type='double', apply=True, stdout=StringIO())
+        gap_filler.refresh_from_db()
+        self.assertEqual(gap_filler.room_id, self.rooms[0].pk)
+
+    def test_pinned_and_checked_in_stay(self):
+        """Przypięte i trwające pobyty zostają w swoich pokojach"""
+        from . import assignment
+        self._book(self.rooms[0], 1, 3)
+        self._book(self.rooms[0], 5, 8, room_pinned=True)
+        self._book(self.rooms[1], 3, 5, room_pinned=True)
+        Reservation.objects.create(
+            guest=self.guest, room=self.rooms[1], check_in=self.today, check_out=self.today + timedelta(days=2),
+            status='checked_in'
+        )
+        result, changes, applied = assignment.optimize_room_type('double', apply=True)
+        self.assertEqual((changes, applied), ([], False))
+
+    def test_plan_on_plain_intervals(self):
+        """Plan działa na liczbach dni i zgłasza pobyty bez miejsca"""
+        from . import assignment
+        fixed = [(1, 10, 0, 4)]
+        movable = [(2, 11, 4, 6), (3, 10, 1, 3), (4, 11, 6, 9)]
+        result = assignment.plan([10, 11], fixed, movable, 0, 10)
+        self.assertEqual(result.assignments, {2: 10, 3: 11, 4: 10})
+        self.assertEqual(result.unplaced, [])
+
+
+class GroupAvailabilityTestCase(TestCase):
+    """Test 14: Wyszukiwanie zestawów kilku pokoi dla grupy"""
+
+    def setUp(self):
+        self.check_in = date.today() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=1)
+        rooms = [
+            ('1201', 'single', 1, '80.00'), ('1202', 'single', 1, '80.00'),
+            ('1203', 'double', 2, '100.00'), ('1204', 'double', 2, '100.00'), ('1205', 'double', 2, '100.00'),
+            ('1206', 'suite', 4, '300.00'),
+        ]
+        for number, room_type, capacity, price in rooms:
+            Room.objects.create(number=number, room_type=room_type, capacity=capacity, price=Decimal(price))
+        guest = GuestProfile.objects.create(user=User.objects.create_user(username='groupguest'))
+        Reservation.objects.create(
+            guest=guest, room=Room.objects.get(number='1205'), check_in=self.check_in, check_out=self.check_out,
+            status='confirmed'
+        )
+
+    def test_cheapest_combinations_api(self):
+        """Najtańszy zestaw dla 5 osób to dwa wolne pokoje dwuosobowe i jednoosobowy"""
+        from django.urls import reverse
+        response = self.client.get(reverse('room_availability_api'), {
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': self.check_out.isoformat(),
+            'number_of_guests': 5,
+            'mode': 'group',
+        })
+        self.assertEqual(response.status_code, 200)
+        combinations = response.json()['combinations']
+        first = combinations[0]
+        self.assertEqual(first['total_price'], '280.00')
+        self.assertEqual(sorted(r['number'] for r in first['rooms']), ['1201', '1203', '1204'])
+        prices = [Decimal(c['total_price']) for c in combinations]
+        self.assertEqual(prices, sorted(prices))
+        self.assertTrue(all('1205' not in [r['number'] for r in c['rooms']] for c in combinations))
+
+    def test_search_matches_exhaustive(self):
+        """Przegląd z odcięciem daje te same koszty co pełne przeszukanie"""
+        import itertools
+        import random
+        from . import availability
+        rng = random.Random(7)
+        for _ in range(20):
+            groups = [
+                (capacity, Decimal(rng.randrange(50, 400)), [object()] * rng.randrange(1, 4))
+                for capacity in rng.sample([1, 2, 3, 4, 5, 6], 4)
+            ]
+            groups.sort(key=lambda g: g[1] / g[0])
+            guests = rng.randrange(2, 15)
+            expected = []
+            for counts in itertools.product(*[range(len(g[2]) + 1) for g in groups]):
+                capacity = sum(n * g[0] for n, g in zip(counts, groups))
+                smallest = min((g[0] for n, g in zip(counts, groups) if n), default=0)
+                if capacity >= guests and capacity - smallest < guests:
+                    expected.append(sum(n * g[1] for n, g in zip(counts, groups)))
+            found = availability.group_combinations(guests, groups)
+            self.assertEqual([cost for cost, _, _ in found], sorted(expected)[:5])
+
+
+class AdminEfficiencyTestCase(TestCase):
+    """Test 15: Lista rezerwacji w panelu admina i masowe usuwanie"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='adminlist', password='pass12345', email='a@example.com')
+        self.rooms = [
+            Room.objects.create(number=str(n), price=Decimal('100.00'), status='occupied') for n in (1301, 1302)
+        ]
+        self.check_in = date.today() + timedelta(days=1)
+
+    def _book(self, room, n, status='confirmed'):
+        user = User.objects.create_user(username=f'adminguest{n}')
+        return Reservation.objects.create(
+            guest=GuestProfile.objects.create(user=user), room=room, check_in=self.check_in,
+            check_out=self.check_in + timedelta(days=1), status=status,
+        )
+
+    def _changelist_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:core_reservation_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_is_constant(self):
+        """Liczba zapytań nie rośnie z liczbą rezerwacji na stronie"""
+        self.client.login(username='adminlist', password='pass12345')
+        for n in range(3):
+            self._book(self.rooms[n % 2], n)
+        few = self._changelist_queries()
+        for n in range(3, 15):
+            self._book(self.rooms[n % 2], n)
+        self.assertEqual(self._changelist_queries(), few)
+
+    def test_bulk_delete_releases_rooms(self):
+        """Pokój bez aktywnych rezerwacji wraca do puli, pokój z rezerwacją zostaje zajęty"""
+        from django.urls import reverse
+        from .signals import _release_rooms
+        self._book(self.rooms[0], 1, status='cancelled')
+        self._book(self.rooms[0], 2, status='cancelled')
+        self._book(self.rooms[1], 3, status='cancelled')
+        self._book(self.rooms[1], 4)
+        selected = list(Reservation.objects.filter(status='cancelled').values_list('pk', flat=True))
+        self.client.login(username='adminlist', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(reverse('admin:core_reservation_changelist'), {
+                'action': 'delete_selected', 'post': 'yes', '_selected_action': selected,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Reservation.objects.filter(pk__in=selected).exists())
+        releases = [c for c in callbacks if getattr(c, 'func', None) is _release_rooms]
+        self.assertEqual(len(releases), 1)
+        statuses = dict(Room.objects.values_list('number', 'status'))
+        self.assertEqual(statuses, {'1301': 'available', '1302': 'occupied'})
+
+    def test_rolled_back_delete_releases_nothing(self):
+        """Pokoje z wycofanego usuwania nie zostają w kolejce do zwolnienia"""
+        from django.db import transaction
+        from .signals import bulk_room_release
+        first = self._book(self.rooms[0], 1, status='cancelled')
+        second = self._book(self.rooms[1], 2, status='cancelled')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic(), bulk_room_release():
+                    first.delete()
+                    raise RuntimeError("wycofaj")
+            with bulk_room_release():
+                second.delete()
+        self.assertEqual([c.args[1] for c in callbacks], [{self.rooms[1].pk}])
+        statuses = dict(Room.objects.values_list('number', 'status'))
+        self.assertEqual(statuses, {'1301': 'occupied', '1302': 'available'})
+
+
+class NightAuditTestCase(TestCase):
+    """Test 16: Audyt nocny zamyka dobę zbiorczymi zapytaniami"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.yesterday = self.today - timedelta(days=1)
+        self.guest = GuestProfile.objects.create(user=User.objects.create_user(username='auditguest'))
+        self.rooms = [
+            Room.objects.create(number=str(n), price=Decimal('100.00'), room_type='double') for n in (1401, 1402, 1403)
+        ]
+        from . import inventory
+        inventory.rebuild_all()
+
+    def _booked_today(self):
+        from .models import RoomTypeInventory
+        return RoomTypeInventory.objects.get(room_type='double', date=self.today).booked
+
+    def _book(self, room, start, end, status, total='300.00'):
+        return Reservation.objects.create(
+            guest=self.guest, room=room, status=status, total_price=Decimal(total),
+            check_in=self.today + timedelta(days=start), check_out=self.today + timedelta(days=end),
+        )
+
+    def test_audit_closes_day(self):
+        """Niestawienia, przekroczone wyjazdy, przychód i statusy pokoi; powtórka niczego nie dubluje"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import NightAuditRun, RevenuePosting
+        no_show = self._book(self.rooms[0], -1, 2, 'confirmed')
+        future = self._book(self.rooms[0], 3, 5, 'confirmed')
+        staying = self._book(self.rooms[1], -2, 1, 'checked_in', total='450.00')
+        late = self._book(self.rooms[2], -3, -1, 'checked_in')
+        Room.objects.filter(pk=self.rooms[0].pk).update(status='occupied')
+        self.assertEqual(self._booked_today(), 2)
+
+        for _ in range(2):
+            call_command('night_audit', date=self.yesterday.isoformat(), stdout=StringIO())
+
+        statuses = dict(Reservation.objects.values_list('pk', 'status'))
+        self.assertEqual((statuses[no_show.pk], statuses[future.pk]), ('no_show', 'confirmed'))
+        self.assertEqual(list(Reservation.objects.filter(overdue=True)), [late])
+        self.assertEqual(
+            list(RevenuePosting.objects.values_list('reservation_id', 'date', 'amount')),
+            [(staying.pk, self.yesterday, Decimal('150.00'))],
+        )
+        rooms = dict(Room.objects.values_list('number', 'status'))
+        self.assertEqual(rooms, {'1401': 'dirty', '1402': 'occupied', '1403': 'occupied'})
+
+        summary = NightAuditRun.objects.get()
+        self.assertEqual((summary.no_shows, summary.overdue, summary.postings, summary.revenue), (1, 1, 1, Decimal('150.00')))
+        # Niestawienie zwalnia pokój w rejestrze na pozostałe noce
+        self.assertEqual(self._booked_today(), 1)
+
+    def test_pending_past_check_in_is_no_show(self):
+        """Oczekująca rezerwacja po terminie przyjazdu też staje się niestawieniem i zwalnia rejestr"""
+        from . import audit
+        stale = self._book(self.rooms[0], -1, 2, 'pending')
+        upcoming = self._book(self.rooms[1], 0, 2, 'pending')
+        self.assertEqual(self._booked_today(), 2)
+
+        summary = audit.run(self.yesterday)
+
+        statuses = dict(Reservation.objects.values_list('pk', 'status'))
+        self.assertEqual((statuses[stale.pk], statuses[upcoming.pk]), ('no_show', 'pending'))
+        self.assertEqual(summary.no_shows, 1)
+        self.assertEqual(self._booked_today(), 1)
+
+
+class TaskQueueTestCase(TestCase):
+    """Test 17: Kolejka zadań w bazie, ponowienia i harmonogram cron"""
+
+    def test_enqueue_retry_and_fail(self):
+        """Zadanie wykonane od razu, a błędne ponawiane z opóźnieniem aż do limitu prób"""
+        from django.utils import timezone
+        from . import taskqueue
+        from .models import Task
+        calls = []
+
+        @taskqueue.task(name='core.tests.collect', max_attempts=2, retry_delay=60)
+        def collect(value, fail=False):
+            calls.append(value)
+            if fail:
+                raise RuntimeError("awaria")
+
+        ok = collect.delay(1)
+        bad = collect.delay(2, fail=True)
+        self.assertEqual(taskqueue.run_pending(), 2)
+        ok.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual((ok.status, bad.status, bad.attempts), ('done', 'queued', 1))
+        self.assertIn('awaria', bad.last_error)
+        self.assertGreater(bad.run_at, timezone.now())
+
+        Task.objects.filter(pk=bad.pk).update(run_at=timezone.now())
+        taskqueue.run_pending()
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ('failed', 2))
+        self.assertEqual(calls, [1, 2, 2])
+
+    def test_cron_and_periodic_schedule(self):
+        """Wyrażenia cron i jednokrotne odłożenie zadania okresowego"""
+        from datetime import datetime
+        from django.utils import timezone
+        from . import taskqueue
+        from .models import PeriodicTask, Task
+        tz = timezone.get_current_timezone()
+        moment = datetime(2026, 3, 6, 14, 7, tzinfo=tz)  # piątek
+        next_run = lambda expression: taskqueue.Cron(expression).next_after(moment).replace(tzinfo=None)
+        self.assertEqual(next_run('*/15 * * * *'), datetime(2026, 3, 6, 14, 15))
+        self.assertEqual(next_run('30 2 * * *'), datetime(2026, 3, 7, 2, 30))
+        self.assertEqual(next_run('0 9 * * 1-5'), datetime(2026, 3, 9, 9, 0))
+        self.assertEqual(next_run('0 0 1 1 *'), datetime(2027, 1, 1, 0, 0))
+        with self.assertRaises(ValueError):
+            taskqueue.Cron('61 * * * *')
+
+        taskqueue.sync_schedule({'rates': {'task': 'core.tasks.rebuild_nightly_rates', 'cron': '0 3 * * *'}})
+        periodic = PeriodicTask.objects.get(name='rates')
+        self.assertEqual(taskqueue.schedule_due(periodic.next_run_at), 1)
+        self.assertEqual(taskqueue.schedule_due(periodic.next_run_at), 0)
+        self.assertEqual(list(Task.objects.values_list('name', flat=True)), ['core.tasks.rebuild_nightly_rates'])
+        self.assertEqual(taskqueue.run_pending(), 1)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class NotificationOutboxTestCase(TestCase):
+    """Test 18: Potwierdzenia rezerwacji przez skrzynkę nadawczą"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='outboxguest', password='pass12345', email='gosc@example.com', first_name='Ewa'
+        )
+        self.guest = GuestProfile.objects.create(user=self.user)
+        self.room = Room.objects.create(number='1501', price=Decimal('100.00'))
+        self.client.login(username='outboxguest', password='pass12345')
+
+    def test_booking_and_cancellation_are_sent_in_background(self):
+        """Rezerwacja zapisuje wiadomość z PIN-em, wysyłka następuje dopiero w zadaniu"""
+        from django.core import mail
+        from django.urls import reverse
+        from . import taskqueue
+        from .models import OutboxMessage
+        check_in = date.today() + timedelta(days=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('guest:create_reservation'), {
+                'room_id': self.room.pk,
+                'check_in_date': check_in.isoformat(),
+                'check_out_date': (check_in + timedelta(days=2)).isoformat(),
+            })
+        reservation = Reservation.objects.get()
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.recipient), ('pending', 'gosc@example.com'))
+        self.assertIn(reservation.reservation_pin, message.body)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(taskqueue.run_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"nr {reservation.pk}", mail.outbox[0].subject)
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'sent')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('guest:cancel_reservation', args=[reservation.pk]))
+        taskqueue.run_pending()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('anulowana', mail.outbox[1].subject)
+
+    @override_settings(EMAIL_BACKEND='core.tests.BrokenEmailBackend')
+    def test_failed_delivery_is_retried(self):
+        """Błąd serwera poczty nie gubi wiadomości - czeka na kolejną próbę"""
+        from . import notifications
+        reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, check_in=date.today(), check_out=date.today() + timedelta(days=1)
+        )
+        message = notifications.reservation_confirmation(reservation)
+        self.assertEqual(notifications.send_pending(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertGreater(message.next_attempt_at, message.created_at)
+        self.assertIn('serwer niedostępny', message.last_error)
+
+
+class WalkInGuestTestCase(TestCase):
+    """Test 19: Konta gości walk-in bez hasła i przejęcie konta z linku"""
+
+    def setUp(self):
+        self.room = Room.objects.create(number='1601', price=Decimal('100.00'))
+        staff = User.objects.create_user(username='walkinstaff', password='pass12345')
+        EmployeeProfile.objects.create(user=staff, role='receptionist')
+        self.client.login(username='walkinstaff', password='pass12345')
+
+    def test_next_free_username_in_one_query(self):
+        """Wolna nazwa z kolejnym numerem wyznaczona jednym zapytaniem"""
+        from . import accounts
+        for username in ['anna.nowak', 'anna.nowak1', 'anna.nowak2', 'anna.nowakowska']:
+            User.objects.create(username=username)
+        with self.assertNumQueries(1):
+            self.assertEqual(accounts.next_free_username('anna.nowak'), 'anna.nowak3')
+        self.assertEqual(accounts.next_free_username('piotr'), 'piotr')
+
+    def test_walk_in_gets_unusable_password_and_claims_account(self):
+        """Gość walk-in nie ma hasła, dostaje link i sam je ustawia"""
+        from django.urls import reverse
+        from .models import OutboxMessage
+        check_in = date.today() + timedelta(days=3)
+        self.client.post(reverse('employee:reservation_create'), {
+            'room_id': self.room.pk,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=1)).isoformat(),
+            'name': 'Anna', 'surname': 'Nowak', 'email': 'anna@example.com', 'phone': '600100200',
+        })
+        user = User.objects.get(username='anna')
+        self.assertFalse(user.has_usable_password())
+        invite = OutboxMessage.objects.get(kind='account_invite')
+        self.assertEqual(invite.recipient, 'anna@example.com')
+        link = next(line for line in invite.body.splitlines() if '/account/claim/' in line)
+        path = link[link.index('/account/claim/'):]
+
+        self.client.logout()
+        response = self.client.post(path, {'new_password1': 'Nowe-haslo-2026', 'new_password2': 'Nowe-haslo-2026'})
+        self.assertRedirects(response, reverse('guest:dashboard'))
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Nowe-haslo-2026'))
+
+        # Link jest jednorazowy
+        self.client.logout()
+        response = self.client.post(path, {'new_password1': 'Inne-haslo-2026', 'new_password2': 'Inne-haslo-2026'})
+        self.assertRedirects(response, reverse('login'))
+
+    def test_public_booking_does_not_use_phone_as_password(self):
+        """Rezerwacja bez logowania nie ustawia hasła z numeru telefonu"""
+        from django.urls import reverse
+        self.client.logout()
+        check_in = date.today() + timedelta(days=3)
+        response = self.client.post(reverse('public_create_reservation'), {
+            'room_id': self.room.pk,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=1)).isoformat(),
+            'name': 'Jan', 'surname': 'Nowak', 'email': 'jan@example.com', 'phone': '600300400',
+        }, follow=True)
+        user = User.objects.get(email='jan@example.com')
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(Reservation.objects.filter(guest__user=user).exists())
+        self.assertNotContains(response, '600300400')
+
+
+class OnlinePaymentTestCase(TestCase):
+    """Test 20: Idempotentne płatności online rozliczane w tle"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payguest', password='pass12345')
+        self.guest = GuestProfile.objects.create(user=self.user)
+        self.room = Room.objects.create(number='1701', price=Decimal('100.00'))
+        check_in = date.today() + timedelta(days=5)
+        self.reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, check_in=check_in, check_out=check_in + timedelta(days=2),
+            status='pending', total_price=Decimal('200.00'),
+        )
+        self.client.login(username='payguest', password='pass12345')
+
+    def _pay(self, key):
+        from django.urls import reverse
+        return self.client.post(
+            reverse('guest:reservation_detail', args=[self.reservation.pk]),
+            {'action': 'pay_online', 'idempotency_key': key},
+        )
+
+    def test_double_submit_creates_one_pending_payment(self):
+        """Powtórzony formularz (i nowy klucz) nie zakłada drugiej płatności, a widok nie czeka na bramkę"""
+        self._pay('klucz-1')
+        self._pay('klucz-1')
+        self._pay('klucz-2')
+        payment = Payment.objects.get()
+        self.assertEqual((payment.payment_status, payment.amount), ('pending', Decimal('200.00')))
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, 'pending')
+
+    def test_worker_settles_and_confirms(self):
+        """Zadanie rozlicza płatność, koryguje saldo i potwierdza rezerwację"""
+        from . import taskqueue
+        with self.captureOnCommitCallbacks(execute=True):
+            self._pay('klucz-1')
+        self.assertEqual(taskqueue.run_pending(), 1)
+        payment = Payment.objects.get()
+        self.assertEqual(payment.payment_status, 'completed')
+        self.assertTrue(payment.transaction_id.startswith('FAKE-'))
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.balance_due), ('confirmed', Decimal('0.00')))
+
+    @override_settings(PAYMENT_GATEWAY='core.tests.FlakyGateway')
+    def test_gateway_error_is_retried_then_declined_payment_fails(self):
+        """Błąd bramki ponawia płatność, odmowa kończy ją bez zmiany salda"""
+        from django.utils import timezone
+        from . import payments
+        payment, _ = payments.start(self.reservation, 'klucz-1')
+        self.assertEqual(payments.settle_pending(), {'completed': 0, 'failed': 0, 'retried': 1})
+        payment.refresh_from_db()
+        self.assertEqual((payment.payment_status, payment.attempts), ('pending', 1))
+        self.assertGreater(payment.next_attempt_at, timezone.now())
+
+        Payment.objects.filter(pk=payment.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(payments.settle_pending(), {'completed': 0, 'failed': 1, 'retried': 0})
+        payment.refresh_from_db()
+        self.assertEqual(payment.payment_status, 'failed')
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.balance_due), ('pending', Decimal('200.00')))
+
+    def test_cancel_then_settle_does_not_charge(self):
+        """Gość nie anuluje rezerwacji z płatnością w toku, a płatność za anulowaną nie jest pobierana"""
+        from unittest import mock
+        from django.urls import reverse
+        from . import payments
+        payment, _ = payments.start(self.reservation, 'klucz-1')
+        self.client.post(reverse('guest:cancel_reservation', args=[self.reservation.pk]))
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, 'pending')
+
+        # Anulowanie przez recepcję w trakcie rozliczania
+        self.reservation.status = 'cancelled'
+        self.reservation.save()
+        with mock.patch.object(payments.FakeGateway, 'charge') as charge:
+            self.assertEqual(payments.settle_pending(), {'completed': 0, 'failed': 1, 'retried': 0})
+        charge.assert_not_called()
+        payment.refresh_from_db()
+        self.assertEqual(payment.payment_status, 'failed')
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.amount_paid), ('cancelled', Decimal('0.00')))
+
+        with self.assertRaises(ValueError):
+            payments.start(self.reservation, 'klucz-2')
+
+
+@override_settings(CHANGE_FEED_TOKENS=['tajny-token'])
+class ChangeFeedTestCase(TestCase):
+    """Test 21: Dziennik zmian rezerwacji, płatności i statusów pokoi"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='cdcguest')
+        self.guest = GuestProfile.objects.create(user=user)
+        self.room = Room.objects.create(number='1801', price=Decimal('100.00'))
+
+    def _events(self, since=0, **params):
+        from django.urls import reverse
+        response = self.client.get(
+            reverse('changes_api'), {'since': since, **params}, HTTP_AUTHORIZATION='Bearer tajny-token',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_feed_covers_saves_deletes_and_bulk_updates(self):
+        """Zapis, usunięcie i masowe zmiany (audyt nocny) trafiają do dziennika w kolejności"""
+        from . import audit
+        start = self._events()['next']
+        reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, check_in=date.today() - timedelta(days=1),
+            check_out=date.today() + timedelta(days=1), status='confirmed', total_price=Decimal('200.00'),
+        )
+        Payment.objects.create(reservation=reservation, amount=Decimal('50.00'))
+        reservation.notes = 'bez zmian w dzienniku'
+        reservation.save()
+        audit.run(date.today() - timedelta(days=1))
+        Payment.objects.all().delete()
+
+        feed = self._events(start)
+        summary = [(e['entity'], e['action'], e['changed']) for e in feed['events']]
+        self.assertEqual(summary, [
+            ('reservation', 'create', []),
+            ('payment', 'create', []),
+            ('reservation', 'update', ['status']),
+            ('payment', 'delete', []),
+        ])
+        self.assertEqual(feed['events'][2]['data']['status'], 'no_show')
+        self.assertNotIn('reservation_pin', feed['events'][0]['data'])
+        self.assertEqual(self._events(feed['next'])['events'], [])
+
+    def test_room_status_and_pagination(self):
+        """Pokój trafia do dziennika tylko przy zmianie statusu; stronicowanie kursorem"""
+        start = self._events()['next']
+        self.room.notes = 'nowa wykładzina'
+        self.room.save()
+        for status in ['dirty', 'available', 'maintenance']:
+            self.room.status = status
+            self.room.save()
+        first = self._events(start, limit=2)
+        self.assertTrue(first['has_more'])
+        rest = self._events(first['next'], limit=2)
+        self.assertFalse(rest['has_more'])
+        statuses = [e['data']['status'] for e in first['events'] + rest['events']]
+        self.assertEqual(statuses, ['dirty', 'available', 'maintenance'])
+
+    def test_late_commit_is_not_skipped(self):
+        """Zdarzenie z transakcji zatwierdzonej później niż następna i tak trafia do odbiorcy"""
+        from .models import ChangeEvent
+        start = self._events()['next']
+        for status in ['dirty', 'occupied', 'available']:
+            self.room.status = status
+            self.room.save()
+        # Środkowe zdarzenie "w toku": wiersz z niższym id pojawia się dopiero po odczycie
+        late = ChangeEvent.objects.filter(seq__isnull=True).order_by('pk')[1]
+        late_values = {f.attname: getattr(late, f.attname) for f in ChangeEvent._meta.concrete_fields}
+        late.delete()
+        first = self._events(start)
+        self.assertEqual([e['data']['status'] for e in first['events']], ['dirty', 'available'])
+
+        ChangeEvent.objects.create(**late_values)
+        second = self._events(first['next'])
+        self.assertEqual([e['data']['status'] for e in second['events']], ['occupied'])
+        self.assertGreater(second['next'], first['next'])
+
+    def test_access_and_file_sink(self):
+        """Bez tokenu brak dostępu; eksport do pliku dopisuje tylko nowe zdarzenia"""
+        import json
+        import os
+        import tempfile
+        from django.urls import reverse
+        from . import changes
+        self.assertEqual(self.client.get(reverse('changes_api')).status_code, 403)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'changes.jsonl')
+            self.assertEqual(changes.export(path), 1)
+            self.room.status = 'dirty'
+            self.room.save()
+            self.assertEqual(changes.export(path), 1)
+            self.assertEqual(changes.export(path), 0)
+            with open(path, encoding='utf-8') as handle:
+                lines = [json.loads(line) for line in handle]
+        self.assertEqual([(e['entity'], e['action']) for e in lines], [('room', 'create'), ('room', 'update')])
+
+
+class CalendarFeedTestCase(TestCase):
+    """Test 22: Kanały iCal pokoi - wersjonowane, z cache i odpowiedzią 304"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        user = User.objects.create_user(username='icalguest')
+        self.guest = GuestProfile.objects.create(user=user)
+        self.room = Room.objects.create(number='1901', price=Decimal('100.00'), room_type='suite')
+        self.today = date.today()
+
+    def _feed_url(self):
+        from . import calendars
+        return calendars.room_feed_path(self.room)
+
+    def test_feed_blocks_reservations_and_answers_304(self):
+        """Rezerwacja blokuje terminy; niezmieniony kanał to 304 po jednym zapytaniu"""
+        Reservation.objects.create(
+            guest=self.guest, room=self.room, status='confirmed',
+            check_in=self.today + timedelta(days=2), check_out=self.today + timedelta(days=4),
+        )
+        Reservation.objects.create(
+            guest=self.guest, room=self.room, status='cancelled',
+            check_in=self.today + timedelta(days=10), check_out=self.today + timedelta(days=12),
+        )
+        response = self.client.get(self._feed_url())
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn(f"DTSTART;VALUE=DATE:{self.today + timedelta(days=2):%Y%m%d}", body)
+        self.assertNotIn('icalguest', body)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(self._feed_url(), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self._feed_url()).content.decode(), body)
+
+    def test_changes_bump_version(self):
+        """Nowa rezerwacja, naprawa pokoju i rezerwacja na typ zmieniają ETag"""
+        from django.urls import reverse
+        from . import calendars, inventory
+        inventory.rebuild()
+        seen = {self.client.get(self._feed_url())['ETag']}
+        reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, status='confirmed',
+            check_in=self.today, check_out=self.today + timedelta(days=1),
+        )
+        seen.add(self.client.get(self._feed_url())['ETag'])
+        self.room.status = 'maintenance'
+        self.room.save()
+        seen.add(self.client.get(self._feed_url())['ETag'])
+        self.assertEqual(len(seen), 3)
+        self.room.status = 'available'
+        self.room.save()
+
+        type_url = calendars.room_type_feed_path('suite')
+        before = self.client.get(type_url)
+        Reservation.objects.create(
+            guest=self.guest, room_type='suite', status='confirmed',
+            check_in=self.today + timedelta(days=5), check_out=self.today + timedelta(days=6),
+        )
+        after = self.client.get(type_url)
+        self.assertNotEqual(before['ETag'], after['ETag'])
+        self.assertIn(f"DTSTART;VALUE=DATE:{self.today + timedelta(days=5):%Y%m%d}", after.content.decode())
+
+        reservation.delete()
+        self.assertNotIn(self.client.get(self._feed_url())['ETag'], seen)
+        bad = reverse('room_calendar', args=[self.room.pk, 'zly-token'])
+        self.assertEqual(self.client.get(bad).status_code, 404)
+
+
+class PriceQuoteCacheTestCase(TestCase):
+    """Test 23: Wyceny pobytów zapamiętywane między żądaniami i unieważniane zmianą cennika"""
+
+    def setUp(self):
+        from . import pricing
+        pricing.clear()
+        self.room = Room.objects.create(number='2001', price=Decimal('200.00'), room_type='double')
+        self.check_in = date.today() + timedelta(days=30)
+        self.check_out = self.check_in + timedelta(days=3)
+
+    def _quote(self):
+        from . import pricing
+        return pricing.quote('double', self.room.price, self.check_in, self.check_out)
+
+    def test_repeat_quote_skips_database(self):
+        """Ta sama wycena drugi raz nie odpytuje bazy i liczy trafienie"""
+        from . import pricing
+        first = self._quote()
+        self.assertEqual(first, Decimal('600.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self._quote(), first)
+        self.assertEqual(pricing.stats()['misses'], 1)
+        self.assertEqual(pricing.stats()['hits'], 1)
+
+    def test_pricing_changes_invalidate(self):
+        """Nowa cena sezonowa i zmiana ceny pokoju dają nową wycenę"""
+        from . import pricing
+        self.assertEqual(self._quote(), Decimal('600.00'))
+        season = Season.objects.create(
+            name='Lato', start_date=self.check_in, end_date=self.check_out + timedelta(days=10),
+        )
+        SeasonPrice.objects.create(season=season, room_type='double', price_multiplier=Decimal('1.50'))
+        self.assertEqual(self._quote(), Decimal('900.00'))
+
+        reservation = Reservation(room_type='double', check_in=self.check_in, check_out=self.check_out)
+        self.assertEqual(pricing.reservation_price(reservation), Decimal('900.00'))
+        self.room.price = Decimal('100.00')
+        self.room.save()
+        self.assertEqual(pricing.reservation_price(reservation), Decimal('450.00'))
+
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTestCase(TestCase):
+    """Test 24: Raporty, kanały i API dostępności czytają z repliki, zapisy i sesja po zapisie - z bazy głównej"""
+
+    def setUp(self):
+        from django.db import connections
+        # Lustro bazy testowej: zapytania "repliki" idą tym samym połączeniem
+        # (widzą dane z transakcji testu), a router zapisuje wybrane aliasy
+        self._replica_connection = connections['replica']
+        connections['replica'] = connections['default']
+        self.room = Room.objects.create(number='2101', price=Decimal('100.00'), capacity=2)
+        user = User.objects.create_user(username='replicaguest', password='pass12345')
+        self.guest = GuestProfile.objects.create(user=user)
+        self.check_in = date.today() + timedelta(days=10)
+        self.reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, status='confirmed',
+            check_in=self.check_in, check_out=self.check_in + timedelta(days=2),
+        )
+        manager = User.objects.create_user(username='replicamanager', password='pass12345')
+        EmployeeProfile.objects.create(user=manager, role='manager')
+
+    def tearDown(self):
+        from django.db import connections
+        connections['replica'] = self._replica_connection
+
+    def _aliases(self, method, url, data=None):
+        """Aliasy odczytów modeli core w trakcie żądania"""
+        from unittest import mock
+        from .replica import ReplicaRouter
+        chosen = set()
+        original = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            alias = original(router, model, **hints)
+            if model._meta.app_label == 'core':
+                chosen.add(alias or 'default')
+            return alias
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', record):
+            response = getattr(self.client, method)(url, data or {})
+        return response, chosen
+
+    def test_read_only_views_use_replica(self):
+        """Raport menedżera, kanał iCal i API dostępności czytają tylko z repliki"""
+        from django.urls import reverse
+        from . import calendars
+        self.client.login(username='replicamanager', password='pass12345')
+        urls = [
+            reverse('employee:manager_reports'),
+            reverse('employee:manager_balances'),
+            calendars.room_feed_path(self.room),
+            reverse('room_availability_api') + f"?check_in_date={self.check_in + timedelta(days=5)}"
+            f"&check_out_date={self.check_in + timedelta(days=7)}",
+        ]
+        for url in urls:
+            # Pierwsze żądanie liczy wyceny z bazy głównej (core.pricing), kolejne biorą je z cache
+            self.client.get(url)
+            response, aliases = self._aliases('get', url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(aliases, {'replica'}, url)
+
+        response, aliases = self._aliases('get', reverse('employee:reservations'))
+        self.assertEqual(aliases, {'default'})
+
+    def test_session_pinned_to_primary_after_write(self):
+        """Po anulowaniu rezerwacji ta sama sesja czyta z bazy głównej, a inne - nadal z repliki"""
+        from django.test import Client
+        from django.urls import reverse
+        api = reverse('room_availability_api') + f"?check_in_date={self.check_in}&check_out_date={self.check_in + timedelta(days=1)}"
+        self.client.login(username='replicaguest', password='pass12345')
+        self.assertEqual(self._aliases('get', api)[1], {'replica'})
+
+        response, aliases = self._aliases('post', reverse('guest:cancel_reservation', args=[self.reservation.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(aliases, {'default'})
+        self.assertEqual(self._aliases('get', api)[1], {'default'})
+
+        other, self.client = self.client, Client()
+        self.assertEqual(self._aliases('get', api)[1], {'replica'})
+        self.client = other
+
+class ReservationArchiveTestCase(TestCase):
+    """Test 25: Archiwizacja historycznych rezerwacji z płatnościami"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='archiveguest', password='pass12345')
+        self.guest = GuestProfile.objects.create(user=user)
+        self.room = Room.objects.create(number='2201', price=Decimal('100.00'))
+        self.old = date.today() - timedelta(days=800)
+
+    def _reservation(self, status, check_in, paid=True):
+        reservation = Reservation.objects.create(
+            guest=self.guest, room=self.room, status=status, total_price=Decimal('200.00'),
+            check_in=check_in, check_out=check_in + timedelta(days=2),
+        )
+        if paid:
+            Payment.objects.create(reservation=reservation, amount=Decimal('200.00'), payment_date=check_in)
+        return reservation
+
+    def test_moves_settled_history_only(self):
+        """Rozliczone stare pobyty przechodzą do archiwum z płatnościami i nocami, bez zdarzeń usunięcia"""
+        from . import archive
+        from .models import (
+            ArchivedPayment, ArchivedReservation, ArchivedRevenuePosting, ChangeEvent, OutboxMessage, RevenuePosting,
+        )
+        completed = self._reservation('completed', self.old)
+        RevenuePosting.objects.create(reservation=completed, room=self.room, room_type='double', date=self.old, amount=Decimal('100.00'))
+        message = OutboxMessage.objects.create(kind='reservation_confirmation', reservation=completed, recipient='a@example.com', subject='x', body='y')
+        cancelled = self._reservation('cancelled', self.old, paid=False)
+        no_show = self._reservation('no_show', self.old, paid=False)
+        unpaid = self._reservation('completed', self.old, paid=False)
+        recent = self._reservation('completed', date.today() - timedelta(days=10))
+        deletes = ChangeEvent.objects.filter(action='delete').count()
+
+        self.assertEqual(archive.archive(batch_size=1), 3)
+        self.assertEqual(set(Reservation.objects.values_list('pk', flat=True)), {unpaid.pk, recent.pk})
+        self.assertEqual(
+            set(ArchivedReservation.objects.values_list('pk', flat=True)), {completed.pk, cancelled.pk, no_show.pk},
+        )
+        archived = ArchivedReservation.objects.get(pk=completed.pk)
+        self.assertEqual((archived.total_price, archived.amount_paid, archived.guest_id), (Decimal('200.00'), Decimal('200.00'), self.guest.pk))
+        self.assertEqual(ArchivedPayment.objects.get().reservation_id, completed.pk)
+        self.assertEqual(ArchivedRevenuePosting.objects.get().reservation_id, completed.pk)
+        self.assertFalse(Payment.objects.filter(reservation_id=completed.pk).exists())
+        message.refresh_from_db()
+        self.assertIsNone(message.reservation_id)
+        self.assertEqual(ChangeEvent.objects.filter(action='delete').count(), deletes)
+        self.assertEqual(archive.archive(), 0)
+
+    def test_reports_and_guest_history_include_archive(self):
+        """Przychód, historia gościa i faktura obejmują rezerwacje z archiwum"""
+        from django.urls import reverse
+        from . import archive
+        archived = self._reservation('completed', self.old)
+        live = self._reservation('confirmed', date.today() + timedelta(days=5))
+        archive.archive()
+
+        self.assertEqual(archive.revenue(payment_date__year=self.old.year), Decimal('200.00'))
+        self.assertEqual([r.pk for r in archive.history(guest=self.guest)], [live.pk, archived.pk])
+
+        self.client.login(username='archiveguest', password='pass12345')
+        response = self.client.get(reverse('guest:reservations'))
+        self.assertEqual([r.pk for r in response.context['reservations']], [live.pk, archived.pk])
+        self.assertContains(response, reverse('reservation_invoice_pdf', args=[archived.pk]))
+        self.assertNotEqual(self.client.get(reverse('reservation_invoice_pdf', args=[archived.pk])).status_code, 404)
+
+class GuestStatsTestCase(TestCase):
+    """Test 26: Zdenormalizowane statystyki gości i lista gości sortowana po wartości"""
+
+    def setUp(self):
+        self.guest = GuestProfile.objects.create(user=User.objects.create_user(username='statsguest', password='pass12345'))
+        self.other = GuestProfile.objects.create(user=User.objects.create_user(username='statsother', password='pass12345'))
+        self.room = Room.objects.create(number='2601', price=Decimal('100.00'))
+
+    def _reservation(self, guest, status, check_in, nights=2):
+        return Reservation.objects.create(
+            guest=guest, room=self.room, status=status, total_price=Decimal('200.00'),
+            check_in=check_in, check_out=check_in + timedelta(days=nights),
+        )
+
+    def _stats(self, guest):
+        guest.refresh_from_db()
+        return guest.stays_count, guest.nights_count, guest.lifetime_revenue, guest.last_visit
+
+    def test_signals_keep_stats_in_sync(self):
+        """Zmiany statusu, dat, gościa i płatności przesuwają statystyki jak przeliczenie od zera"""
+        from . import archive, guest_stats
+        early = date.today() - timedelta(days=900)
+        late = date.today() - timedelta(days=30)
+        first = self._reservation(self.guest, 'completed', early, nights=3)
+        second = self._reservation(self.guest, 'confirmed', late)
+        Payment.objects.create(reservation=first, amount=Decimal('300.00'), payment_date=early)
+        pending = Payment.objects.create(reservation=second, amount=Decimal('200.00'), payment_date=late, payment_status='pending')
+        self.assertEqual(self._stats(self.guest), (1, 3, Decimal('300.00'), early))
+
+        second.status = 'checked_in'
+        second.save()
+        pending.payment_status = 'completed'
+        pending.save()
+        self.assertEqual(self._stats(self.guest), (2, 5, Decimal('500.00'), late))
+
+        # Cofnięty ostatni pobyt przelicza ostatnią wizytę
+        second.status = 'cancelled'
+        second.save()
+        self.assertEqual(self._stats(self.guest), (1, 3, Decimal('500.00'), early))
+
+        second.guest = self.other
+        second.status = 'completed'
+        second.save()
+        self.assertEqual(self._stats(self.other), (1, 2, Decimal('200.00'), late))
+        self.assertEqual(self._stats(self.guest), (1, 3, Decimal('300.00'), early))
+
+        # Archiwizacja nie zmienia sum, a przeliczenie od zera obejmuje archiwum
+        archive.archive()
+        self.assertFalse(Reservation.objects.filter(pk=first.pk).exists())
+        self.assertEqual(guest_stats.rebuild(), 0)
+        second.delete()
+        self.assertEqual(self._stats(self.other), (0, 0, Decimal('0.00'), None))
+        self.assertEqual(guest_stats.rebuild(), 0)
+
+        GuestProfile.objects.filter(pk=self.guest.pk).update(stays_count=7, lifetime_revenue=0)
+        self.assertEqual(guest_stats.rebuild(), 1)
+        self.assertEqual(self._stats(self.guest), (1, 3, Decimal('300.00'), early))
+
+    def test_profile_save_keeps_stats(self):
+        """Zapis profilu z nieaktualną kopią w pamięci nie nadpisuje statystyk"""
+        stale = GuestProfile.objects.get(pk=self.guest.pk)
+        reservation = self._reservation(self.guest, 'completed', date.today() - timedelta(days=5))
+        Payment.objects.create(reservation=reservation, amount=Decimal('150.00'), payment_date=date.today())
+        stale.phone_number = '500600700'
+        stale.save()
+        self.assertEqual(self._stats(self.guest), (1, 2, Decimal('150.00'), reservation.check_in))
+
+    def test_guest_list_sorts_and_filters_by_value(self):
+        """Lista gości sortuje i filtruje po statystykach, szczegóły pokazują historię"""
+        from django.urls import reverse
+        employee = User.objects.create_user(username='statsstaff', password='pass12345')
+        EmployeeProfile.objects.create(user=employee, role='receptionist')
+        visit = date.today() - timedelta(days=10)
+        rich = self._reservation(self.other, 'completed', visit)
+        Payment.objects.create(reservation=rich, amount=Decimal('900.00'), payment_date=visit)
+        self._reservation(self.guest, 'confirmed', date.today() + timedelta(days=3))
+        self.client.login(username='statsstaff', password='pass12345')
+
+        response = self.client.get(reverse('employee:guests'))
+        self.assertEqual([g.pk for g in response.context['guests']], [self.other.pk, self.guest.pk])
+        response = self.client.get(reverse('employee:guests'), {'min_revenue': '500', 'sort': 'stays'})
+        self.assertEqual([g.pk for g in response.context['guests']], [self.other.pk])
+        response = self.client.get(reverse('employee:guests'), {'sort': 'last_visit', 'search': 'statsother'})
+        self.assertEqual([g.pk for g in response.context['guests']], [self.other.pk])
+
+        response = self.client.get(reverse('employee:guest_detail', args=[self.other.pk]))
+        self.assertEqual([r.pk for r in response.context['reservations']], [rich.pk])
+        self.assertContains(response, visit.strftime('%Y-%m-%d'))
+        self.assertContains(response, '900,00 PLN')
+
+class BrokenEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("serwer niedostępny")
+
+
+class FlakyGateway:
+    """Bramka, która najpierw nie odpowiada, a potem odmawia."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def charge(self, payment):
+        from .payments import ChargeResult, GatewayError
+        self.calls += 1
+        if self.calls == 1:
+            raise GatewayError("przekroczony czas odpowiedzi")
+        return ChargeResult(approved=False, error="Odmowa")
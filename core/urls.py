@@ -6,7 +6,13 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('register/', views.register_view, name='register'),
+    path('account/claim/<uidb64>/<token>/', views.claim_account, name='claim_account'),
     path('reservation/start/', views.public_create_reservation, name='public_create_reservation'),
     path('api/rooms-availability/', views.room_availability_api, name='room_availability_api'),
+    path('api/price-calendar/', views.price_calendar_api, name='price_calendar_api'),
+    path('api/changes/', views.changes_api, name='changes_api'),
+    path('api/pricing-stats/', views.pricing_stats_api, name='pricing_stats_api'),
+    path('calendar/room/<int:pk>/<str:token>.ics', views.room_calendar, name='room_calendar'),
+    path('calendar/type/<str:room_type>/<str:token>.ics', views.room_type_calendar, name='room_type_calendar'),
     path('invoice/<int:pk>/pdf/', views.reservation_invoice_pdf, name='reservation_invoice_pdf'),
 ]
\ No newline at end of file
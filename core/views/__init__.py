@@ -0,0 +1,56 @@
+"""Widoki aplikacji core, podzielone według obszaru.
+
+Moduły ładują tylko to, czego potrzebują, a ciężkie zależności opcjonalne
+(reportlab) importują się przy pierwszym użyciu. Wszystkie widoki są
+dostępne także jako ``core.views.<nazwa>`` - tak odwołują się do nich pliki URL.
+"""
+from .auth import (
+    login_view,
+    logout_view,
+    home_view,
+    register_view,
+    claim_account,
+)
+from .guest import (
+    guest_dashboard,
+    guest_reservations,
+    guest_reservation_detail,
+    guest_create_reservation,
+    guest_profile,
+    guest_cancel_reservation,
+    public_create_reservation,
+    generate_pin,
+)
+from .employee import (
+    employee_dashboard,
+    employee_rooms,
+    employee_reservations,
+    employee_reservation_detail,
+    employee_guests,
+    employee_guest_detail,
+    employee_search,
+    employee_create_reservation,
+    employee_housekeeping,
+    employee_maintenance,
+    employee_live_events,
+    employee_pricing,
+    employee_room_create,
+)
+from .manager import (
+    manager_employees,
+    manager_reports,
+    manager_outstanding_balances,
+)
+from .pdf import (
+    manager_report_pdf,
+    reservation_invoice_pdf,
+    manager_invoices_zip,
+)
+from .api import (
+    room_availability_api,
+    price_calendar_api,
+    pricing_stats_api,
+    changes_api,
+    room_calendar,
+    room_type_calendar,
+)
@@ -0,0 +1,187 @@
+"""API JSON (dostępność, ceny, dziennik zmian) i kanały iCal."""
+from django.http import Http404, HttpResponse, JsonResponse
+from django.contrib.auth.decorators import login_required
+from ..models import Room
+from ..decorators import employee_required
+from ..replica import replica_reads
+from .. import rates, availability, changes, calendars, pricing
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from datetime import datetime
+import hmac
+
+
+@replica_reads
+def room_availability_api(request):
+    """API zwracające dostępne pokoje w zadanym terminie (JSON)."""
+    check_in_str = request.GET.get('check_in_date')
+    check_out_str = request.GET.get('check_out_date')
+    guests_str = request.GET.get('number_of_guests', '1')
+
+    if not check_in_str or not check_out_str:
+        return JsonResponse({'error': 'Brak dat'}, status=400)
+
+    try:
+        check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+        check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+        guests = int(guests_str)
+    except ValueError:
+        return JsonResponse({'error': 'Błędny format danych'}, status=400)
+
+    if request.GET.get('mode') == 'group':
+        if guests < 1 or check_out <= check_in:
+            return JsonResponse({'error': 'Błędny format danych'}, status=400)
+        combinations = availability.search_groups(check_in, check_out, guests)
+        return JsonResponse({
+            'guests': guests,
+            'combinations': [
+                {
+                    'total_price': str(combination['total_price']),
+                    'capacity': combination['capacity'],
+                    'rooms': [
+                        {
+                            'id': room.id,
+                            'number': room.number,
+                            'capacity': room.capacity,
+                            'total_price': str(price),
+                            'room_type': room.get_room_type_display(),
+                        }
+                        for room, price in combination['rooms']
+                    ],
+                }
+                for combination in combinations
+            ],
+        })
+
+    # Typy bez wolnego miejsca w rejestrze odpadają bez sprawdzania pokoi po kolei
+    limits = availability.type_limits(check_in, check_out)
+    sold_out = [room_type for room_type, free in limits.items() if free <= 0]
+    candidates = availability.free_rooms(check_in, check_out, min_capacity=guests).exclude(room_type__in=sold_out)
+    prices = availability.PriceCache(check_in, check_out)
+
+    available_now = []
+
+    for room in candidates:
+        total_price = prices.total(room)
+
+        days = (check_out - check_in).days
+        avg_price = total_price / days if days > 0 else total_price
+
+        available_now.append({
+            'id': room.id,
+            'number': room.number,
+            'price': str(round(avg_price, 2)),
+            'total_price': str(total_price),
+            'average_price': str(round(avg_price, 2)),
+            'capacity': room.capacity,
+            'room_type': room.get_room_type_display()
+        })
+
+    return JsonResponse({
+        'available_now': available_now,
+        'available_later': [],
+        'capacity_issue': len(available_now) == 0 and not Room.objects.exclude(status='maintenance').filter(capacity__gte=guests).exists()
+    })
+
+@replica_reads
+def price_calendar_api(request):
+    """API kalendarza: najniższa cena i liczba wolnych pokoi dla każdego dnia miesiąca (JSON)."""
+    month_str = request.GET.get('month') or timezone.now().date().strftime('%Y-%m')
+    room_type = request.GET.get('room_type') or None
+    guests_str = request.GET.get('guests', '1')
+
+    try:
+        month_start = datetime.strptime(month_str, '%Y-%m').date()
+        guests = int(guests_str)
+    except ValueError:
+        return JsonResponse({'error': 'Błędny format danych'}, status=400)
+
+    if room_type and room_type not in dict(Room.TYPE_CHOICES):
+        return JsonResponse({'error': 'Nieznany typ pokoju'}, status=400)
+
+    return JsonResponse({
+        'month': month_start.strftime('%Y-%m'),
+        'room_type': room_type,
+        'guests': guests,
+        'days': rates.month_calendar(month_start.year, month_start.month, room_type=room_type, guests=guests),
+    })
+
+@login_required
+@employee_required
+def pricing_stats_api(request):
+    """Liczniki cache wycen tego procesu (JSON) - dla menedżera."""
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        return JsonResponse({'error': 'Brak dostępu'}, status=403)
+    return JsonResponse(pricing.stats())
+
+def _change_feed_allowed(request):
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        token = header[len('Bearer '):].strip()
+        return any(hmac.compare_digest(token, allowed) for allowed in settings.CHANGE_FEED_TOKENS)
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    return user.is_superuser or (hasattr(user, 'employee_profile') and user.employee_profile.role == 'manager')
+
+def changes_api(request):
+    """Dziennik zmian (JSON) do synchronizacji przyrostowej: ?since=<seq>&limit=<n>&entity=<typ>.
+
+    Dostęp: nagłówek ``Authorization: Bearer <token>`` z CHANGE_FEED_TOKENS
+    albo zalogowany menedżer. Odbiorca zapamiętuje ``next`` i podaje go jako
+    ``since`` w kolejnym wywołaniu; ``has_more`` oznacza, że warto pytać od razu.
+    """
+    if not _change_feed_allowed(request):
+        return JsonResponse({'error': 'Brak dostępu'}, status=403)
+    try:
+        since = int(request.GET.get('since', 0))
+        limit = int(request.GET.get('limit', changes.DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': 'Błędny format danych'}, status=400)
+    entity = request.GET.get('entity') or None
+    if entity and entity not in changes.TRACKED:
+        return JsonResponse({'error': 'Nieznany typ obiektu'}, status=400)
+
+    events, has_more = changes.feed(since, limit, entity)
+    return JsonResponse({
+        'events': [changes.as_dict(event) for event in events],
+        'next': events[-1].seq if events else since,
+        'has_more': has_more,
+    })
+
+def _calendar_response(request, etag, render_body, filename):
+    # Ta sama wersja co u odbiorcy - 304 bez sięgania do cache i rezerwacji
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    response = HttpResponse(render_body(), content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
+
+@replica_reads
+def room_calendar(request, pk, token):
+    """Kanał iCal zajętości pokoju (adres z tokenem z panelu administracyjnego)."""
+    if not calendars.check_token('room', pk, token):
+        raise Http404
+    version = calendars.room_version(pk)
+    if version is None:
+        raise Http404
+    return _calendar_response(
+        request, calendars.etag('room', pk, version), lambda: calendars.room_feed(pk, version), f"pokoj-{pk}.ics",
+    )
+
+@replica_reads
+def room_type_calendar(request, room_type, token):
+    """Kanał iCal dni bez wolnego pokoju danego typu."""
+    if not calendars.check_token('type', room_type, token):
+        raise Http404
+    version = calendars.room_type_version(room_type)
+    if version is None:
+        raise Http404
+    return _calendar_response(
+        request, calendars.etag('type', room_type, version),
+        lambda: calendars.room_type_feed(room_type, version), f"typ-{room_type}.ics",
+    )
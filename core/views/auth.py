@@ -0,0 +1,79 @@
+"""Logowanie, rejestracja gościa i przejęcie konta założonego w recepcji."""
+from django.shortcuts import render, redirect
+from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth.forms import SetPasswordForm
+from django.contrib import messages
+from django.contrib.auth.models import User
+from ..models import GuestProfile
+from .. import accounts
+
+
+def login_view(request):
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        user = authenticate(request, username=username, password=password)
+        if user is not None:
+            login(request, user)
+            messages.success(request, f"Witaj, {user.first_name or user.username}! Zalogowano pomyślnie.")
+            if user.is_superuser or hasattr(user, 'employee_profile'):
+                return redirect('employee:dashboard')
+            else:
+                return redirect('guest:dashboard')
+        else:
+            messages.error(request, "Nieprawidłowy email lub hasło.")
+    return render(request, 'core/login.html')
+
+def logout_view(request):
+    logout(request)
+    messages.info(request, "Zostałeś wylogowany.")
+    return redirect('home')
+
+def home_view(request):
+    return render(request, 'core/home.html')
+
+def register_view(request):
+    if request.method == 'POST':
+        email = request.POST.get('email')
+        password = request.POST.get('password')
+        first_name = request.POST.get('name')
+        last_name = request.POST.get('surname')
+        phone = request.POST.get('phone')
+        username_input = request.POST.get('username')
+
+        username = username_input if username_input else email
+
+        if User.objects.filter(username=username).exists():
+            messages.error(request, "Użytkownik o takiej nazwie już istnieje.")
+            return redirect('register')
+        if User.objects.filter(email=email).exists():
+            messages.error(request, "Użytkownik o takim emailu już istnieje.")
+            return redirect('register')
+            
+        user = User.objects.create_user(username=username, email=email, password=password)
+        user.first_name = first_name
+        user.last_name = last_name
+        user.save()
+        
+        GuestProfile.objects.create(user=user, phone_number=phone)
+        
+        messages.success(request, "Konto utworzone! Zaloguj się.")
+        return redirect('login')
+
+    return render(request, 'guest/register.html')
+
+def claim_account(request, uidb64, token):
+    """Ustawienie hasła do konta założonego przy rezerwacji (link z e-maila)."""
+    user = accounts.user_from_claim(uidb64, token)
+    if user is None:
+        messages.error(request, "Link jest nieważny lub wygasł. Poproś recepcję o nowy.")
+        return redirect('login')
+
+    form = SetPasswordForm(user, request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        login(request, user)
+        messages.success(request, "Hasło ustawione. Witamy na Twoim koncie!")
+        return redirect('guest:dashboard')
+
+    return render(request, 'guest/claim_account.html', {'form': form, 'claimed_user': user})
@@ -0,0 +1,629 @@
+"""Panel pracownika: pulpit, pokoje, rezerwacje, goście, housekeeping i usterki."""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+from ..models import Room, Reservation, GuestProfile, EmployeeProfile, Payment, Season, SeasonPrice
+from ..decorators import employee_required
+from .. import search, maintenance, housekeeping, live, pdf, inventory, tasks, notifications, accounts, payments, pricing, archive, guest_stats
+from .guest import generate_pin
+from django.utils import timezone
+from datetime import datetime
+from django.db import transaction
+import json
+from decimal import Decimal
+
+
+@login_required
+@employee_required
+def employee_dashboard(request):
+    today = timezone.now().date()
+    pending_reservations = Reservation.objects.filter(status='pending').count()
+    checkins_today = Reservation.objects.filter(check_in=today, status='confirmed').count()
+    checkouts_today = Reservation.objects.filter(check_out=today, status='checked_in').count()
+
+    total_rooms = Room.objects.count()
+    available_rooms = Room.objects.filter(status='available').count()
+
+    recent_reservations = Reservation.objects.all().order_by('-created_at')[:5]
+
+    employee = None
+    if hasattr(request.user, 'employee_profile'):
+        employee = request.user.employee_profile
+        if employee.role == 'technician':
+            return redirect('employee:maintenance')
+        if employee.role == 'maid':
+            return redirect('employee:housekeeping')
+    elif request.user.is_superuser:
+        class AdminProxy:
+            user = request.user
+            role = 'manager'
+            def get_role_display(self):
+                return "Administrator"
+        employee = AdminProxy()
+
+    calendar_events = []
+    active_reservations = Reservation.objects.filter(
+        status__in=['confirmed', 'checked_in', 'pending']
+    ).values('id', 'status', 'check_in', 'check_out', 'room__number', 'guest__user__last_name')
+
+    for res in active_reservations:
+        color = '#28a745' if res['status'] == 'checked_in' else ('#0d6efd' if res['status'] == 'confirmed' else '#ffc107')
+        calendar_events.append({
+            'title': f"{res['room__number']} - {res['guest__user__last_name']}",
+            'start': res['check_in'].isoformat(),
+            'end': res['check_out'].isoformat(),
+            'color': color,
+            'url': f"/employee/reservations/{res['id']}/"
+        })
+
+    context = {
+        'pending_reservations': pending_reservations,
+        'checkins_today': checkins_today,
+        'checkouts_today': checkouts_today,
+        'total_rooms': total_rooms,
+        'available_rooms': available_rooms,
+        'recent_reservations': recent_reservations,
+        'employee': employee,
+        'calendar_events_json': json.dumps(calendar_events),
+    }
+    return render(request, 'employee/dashboard.html', context)
+
+@login_required
+@employee_required
+def employee_rooms(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do zarządzania pokojami.")
+        return redirect('employee:dashboard')
+
+    if request.method == 'POST':
+        room_id = request.POST.get('room_id')
+        new_status = request.POST.get('status')
+        
+        if room_id and new_status:
+            room = get_object_or_404(Room, pk=room_id)
+
+            if new_status == 'maintenance':
+                description = request.POST.get('maintenance_description')
+                if not description:
+                    messages.error(request, "Wymagany jest opis usterki przy zmianie statusu na 'W naprawie'.")
+                    return redirect('employee:rooms')
+                title = description.strip().splitlines()[0]
+                maintenance.open_ticket(room, request.user, 'reception', title, description)
+            else:
+                room.status = new_status
+                room.save()
+            messages.success(request, f"Status pokoju {room.number} zmieniony na {room.get_status_display()}.")
+            return redirect('employee:rooms')
+
+    today = timezone.now().date()
+    rooms = Room.objects.all()
+
+    for room in rooms:
+        active_reservation = Reservation.objects.filter(
+            room=room,
+            check_in__lte=today,
+            check_out__gte=today,
+            status__in=['confirmed', 'checked_in']
+        ).first()
+        room.active_reservation = active_reservation
+        
+    return render(request, 'employee/rooms.html', {'rooms': rooms})
+
+@login_required
+@employee_required
+def employee_reservations(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do modułu rezerwacji.")
+        return redirect('employee:dashboard')
+
+    reservations = Reservation.objects.all().order_by('-created_at')
+    return render(request, 'employee/reservations.html', {'reservations': reservations})
+
+@login_required
+@employee_required
+def employee_reservation_detail(request, pk):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do szczegółów rezerwacji.")
+        return redirect('employee:dashboard')
+
+    reservation = get_object_or_404(Reservation, pk=pk)
+
+    if not reservation.total_price:
+        reservation.total_price = pricing.reservation_price(reservation)
+        reservation.save()
+
+    payments = reservation.payments.all().order_by('-payment_date')
+    total_paid = reservation.amount_paid
+    remaining = reservation.balance_due
+
+    candidate_rooms = []
+    unavailable_rooms = []
+    if request.method == 'GET':
+        all_rooms = Room.objects.all().order_by('number')
+        for r in all_rooms:
+            if r.id == reservation.room_id:
+                continue
+            collision = Reservation.objects.filter(
+                room=r,
+                check_in__lt=reservation.check_out,
+                check_out__gt=reservation.check_in,
+                status__in=['pending', 'confirmed', 'checked_in']
+            ).exists()
+            if not collision and r.status != 'maintenance':
+                candidate_rooms.append((r, 'Dostępny'))
+            else:
+                unavailable_rooms.append((r, 'Zajęty'))
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+
+        if action == 'confirm':
+            reservation.status = 'confirmed'
+            reservation.save()
+            messages.success(request, "Rezerwacja została potwierdzona.")
+
+        elif action == 'cancel':
+            reservation.status = 'cancelled'
+            reservation.save()
+            if reservation.room_id and reservation.room.status == 'occupied':
+                reservation.room.status = 'available'
+                reservation.room.save()
+            messages.success(request, "Rezerwacja została anulowana.")
+
+        elif action == 'check_in':
+            if reservation.room_id is None:
+                # Rezerwacja na typ pokoju - przydział dopiero teraz
+                room = inventory.assign_room(reservation)
+                if room is None:
+                    messages.error(request, f"Brak wolnego pokoju typu {reservation.get_room_type_display()} na cały pobyt.")
+                    return redirect('employee:reservation_detail', pk=pk)
+                reservation.room = room
+            reservation.status = 'checked_in'
+            reservation.save()
+            room = reservation.room
+            room.status = 'occupied'
+            room.save()
+            messages.success(request, f"Gość zameldowany. Pokój {room.number} oznaczony jako ZAJĘTY.")
+
+        elif action == 'check_out':
+            if remaining > 0:
+                messages.error(request, f"Nie można wymeldować gościa. Nieopłacone saldo: {remaining} PLN.")
+                return redirect('employee:reservation_detail', pk=pk)
+
+            reservation.status = 'completed'
+            reservation.overdue = False
+            reservation.save()
+            if pdf.available():
+                # Faktura renderuje się w tle - pobranie po wymeldowaniu trafia w gotowy plik
+                tasks.render_invoice.delay(reservation.pk)
+            room = reservation.room
+            if room is None:
+                # Rezerwacja na typ bez przydzielonego pokoju - nie ma czego sprzątać
+                messages.success(request, "Gość wymeldowany.")
+            else:
+                room.status = 'dirty'
+                room.save()
+                messages.success(request, f"Gość wymeldowany. Pokój {room.number} oznaczony jako DO SPRZĄTANIA.")
+
+        elif action == 'change_room':
+            new_room_id = request.POST.get('new_room_id')
+            confirm_force = request.POST.get('confirm_force') == 'yes'
+
+            if new_room_id:
+                with transaction.atomic():
+                    new_room = get_object_or_404(Room, pk=new_room_id)
+
+                    if new_room.status == 'maintenance':
+                        messages.error(request, f"Pokój {new_room.number} jest w naprawie. Nie można go przypisać.")
+                        return redirect('employee:reservation_detail', pk=pk)
+
+                    if not confirm_force:
+                        if new_room.status == 'occupied':
+                            messages.error(request, f"Pokój {new_room.number} jest oznaczony jako ZAJĘTY. Użyj przycisku 'Wymuś', aby zignorować.")
+                            return redirect('employee:reservation_detail', pk=pk)
+                    
+                        if new_room.status == 'dirty':
+                            messages.warning(request, f"Pokój {new_room.number} jest DO SPRZĄTANIA. Użyj przycisku 'Wymuś', aby zignorować.")
+                            return redirect('employee:reservation_detail', pk=pk)
+
+                        if not inventory.room_is_free(new_room, reservation.check_in, reservation.check_out, reservation):
+                            messages.error(request, f"Pokój {new_room.number} ma kolizję terminów. Użyj przycisku 'Wymuś'.")
+                            return redirect('employee:reservation_detail', pk=pk)
+
+                        # Przeniesienie do innego typu zajmuje miejsce w rejestrze tego typu
+                        if new_room.room_type != reservation.room_type and not inventory.is_available(
+                                new_room.room_type, reservation.check_in, reservation.check_out, lock=True):
+                            messages.error(request, f"Brak wolnego miejsca w typie pokoju {new_room.number} w tym terminie. Użyj przycisku 'Wymuś'.")
+                            return redirect('employee:reservation_detail', pk=pk)
+
+                    reservation.room = new_room
+                    # Ręczny wybór pokoju - optymalizator przydziału go nie zmieni
+                    reservation.room_pinned = True
+                    reservation.save()
+                    messages.success(request, f"Pokój zmieniony na {new_room.number}.")
+
+        elif action == 'add_payment':
+            try:
+                amount_str = request.POST.get('amount', '').strip().replace(' ', '').replace('\xa0', '').replace(',', '.')
+                amount = Decimal(amount_str)
+                
+                method = request.POST.get('payment_method')
+                status = request.POST.get('payment_status')
+                date = request.POST.get('payment_date')
+                Payment.objects.create(
+                    reservation=reservation,
+                    amount=amount,
+                    payment_method=method,
+                    payment_status=status,
+                    payment_date=date
+                )
+                messages.success(request, "Płatność dodana.")
+            except Exception as e:
+                messages.error(request, f"Błąd kwoty: {e}")
+
+        elif action == 'delete_payment':
+            payment_id = request.POST.get('payment_id')
+            payment = get_object_or_404(Payment, pk=payment_id, reservation=reservation)
+            payment.delete()
+            messages.success(request, "Płatność została usunięta.")
+
+        elif action == 'edit_payment':
+            payment_id = request.POST.get('payment_id')
+            payment = get_object_or_404(Payment, pk=payment_id, reservation=reservation)
+            try:
+                amount_str = request.POST.get('amount', '').strip().replace(' ', '').replace('\xa0', '').replace(',', '.')
+                payment.amount = Decimal(amount_str)
+                payment.payment_date = request.POST.get('payment_date')
+                payment.payment_method = request.POST.get('payment_method')
+                payment.payment_status = request.POST.get('payment_status')
+                payment.transaction_id = request.POST.get('transaction_id')
+                payment.save()
+                messages.success(request, "Płatność zaktualizowana.")
+            except Exception as e:
+                messages.error(request, f"Błąd edycji płatności: {e}")
+
+        elif action == 'add_charge':
+            try:
+                amount_str = request.POST.get('charge_amount', '').strip().replace(' ', '').replace('\xa0', '')
+                charge_amount = Decimal(amount_str.replace(',', '.'))
+                
+                charge_description = request.POST.get('charge_description')
+
+                if charge_amount > 0:
+                    reservation.total_price = Decimal(reservation.total_price or 0) + charge_amount
+
+                    note_entry = f"Dnia {timezone.now().date()} doliczono {charge_amount} PLN: {charge_description}"
+                    if reservation.notes:
+                        reservation.notes += f"\n{note_entry}"
+                    else:
+                        reservation.notes = note_entry
+
+                    reservation.save()
+                    messages.success(request, f"Doliczono opłatę {charge_amount} PLN.")
+                else:
+                    messages.error(request, "Kwota musi być dodatnia.")
+            except Exception as e:
+                print(f"Błąd add_charge: {e}")
+                messages.error(request, f"Wystąpił błąd: {e}")
+
+        return redirect('employee:reservation_detail', pk=pk)
+
+    context = {
+        'reservation': reservation,
+        'payments': payments,
+        'total_paid': total_paid,
+        'remaining': remaining,
+        'candidate_rooms': candidate_rooms,
+        'unavailable_rooms': unavailable_rooms,
+        'current_room': reservation.room
+    }
+    return render(request, 'employee/reservation_detail.html', context)
+
+@login_required
+@employee_required
+def employee_guests(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do listy gości.")
+        return redirect('employee:dashboard')
+
+    search_query = request.GET.get('search', '').strip()
+    sort = request.GET.get('sort', '')
+    if sort not in guest_stats.ORDERINGS:
+        sort = 'revenue'
+    min_revenue = _decimal_param(request.GET.get('min_revenue'))
+    min_stays = _int_param(request.GET.get('min_stays'))
+
+    guests = GuestProfile.objects.select_related('user')
+    if search_query:
+        guests = guests.filter(
+            Q(user__first_name__icontains=search_query) | Q(user__last_name__icontains=search_query)
+            | Q(user__email__icontains=search_query) | Q(user__username__icontains=search_query)
+        )
+    if min_revenue is not None:
+        guests = guests.filter(lifetime_revenue__gte=min_revenue)
+    if min_stays is not None:
+        guests = guests.filter(stays_count__gte=min_stays)
+    _, ordering, condition = guest_stats.ORDERINGS[sort]
+    guests = guests.filter(**condition).order_by(*ordering)
+
+    page = Paginator(guests, 50).get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        'guests': page,
+        'page': page,
+        'querystring': query.urlencode(),
+        'search_query': search_query,
+        'sort': sort,
+        'orderings': [(key, label) for key, (label, _, _) in guest_stats.ORDERINGS.items()],
+        'min_revenue': request.GET.get('min_revenue', ''),
+        'min_stays': request.GET.get('min_stays', ''),
+    }
+    return render(request, 'employee/guests.html', context)
+
+
+def _decimal_param(value):
+    try:
+        number = Decimal(value.replace(',', '.')) if value else None
+    except ArithmeticError:
+        return None
+    return number if number is not None and number.is_finite() else None
+
+
+def _int_param(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+@login_required
+@employee_required
+def employee_guest_detail(request, pk):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do szczegółów gościa.")
+        return redirect('employee:dashboard')
+
+    guest = get_object_or_404(GuestProfile.objects.select_related('user'), pk=pk)
+    context = {
+        'guest': guest,
+        'reservations': archive.history(guest=guest),
+    }
+    return render(request, 'employee/guest_detail.html', context)
+
+@login_required
+@employee_required
+def employee_search(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do wyszukiwarki.")
+        return redirect('employee:dashboard')
+
+    query = request.GET.get('q', '').strip()
+    results = search.search(query) if query else None
+    return render(request, 'employee/search.html', {'query': query, 'results': results})
+
+@login_required
+@employee_required
+def employee_create_reservation(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do tworzenia rezerwacji.")
+        return redirect('employee:dashboard')
+
+    if request.method == 'POST':
+        guest_id = request.POST.get('guest_id')
+        room_id = request.POST.get('room_id')
+        room_type = request.POST.get('room_type')
+        if not room_id and room_type not in dict(Room.TYPE_CHOICES):
+            messages.error(request, "Nie wybrano pokoju.")
+            return redirect('employee:reservation_create')
+
+        check_in_str = request.POST.get('check_in_date')
+        check_out_str = request.POST.get('check_out_date')
+
+        try:
+            check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+            check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+
+            if check_in >= check_out:
+                messages.error(request, "Data zameldowania musi być wcześniejsza niż data wymeldowania.")
+                return redirect('employee:reservation_create')
+
+            with transaction.atomic():
+                room = get_object_or_404(Room, pk=room_id) if room_id else None
+
+                if room is not None and room.status == 'maintenance':
+                    messages.error(request, "Ten pokój jest wyłączony z użytku (konserwacja).")
+                    return redirect('employee:reservation_create')
+
+                if guest_id:
+                    guest = get_object_or_404(GuestProfile, pk=guest_id)
+                else:
+                    name = request.POST.get('name')
+                    surname = request.POST.get('surname')
+                    email = request.POST.get('email')
+                    phone = request.POST.get('phone')
+
+                    if not name or not surname:
+                        messages.error(request, "Imię i nazwisko są wymagane dla nowego gościa.")
+                        return redirect('employee:reservation_create')
+
+                    # Gość walk-in dostaje konto bez hasła - hasło ustawi sam z linku w e-mailu
+                    guest = accounts.create_guest(name, surname, email=email, phone=phone)
+
+                if room is None:
+                    # Rezerwacja na typ pokoju: wystarczy wolne miejsce w rejestrze, pokój przy zameldowaniu
+                    conflicting_reservations = not inventory.is_available(room_type, check_in, check_out, lock=True)
+                else:
+                    conflicting_reservations = not inventory.can_book_room(room, check_in, check_out)
+
+                if conflicting_reservations:
+                    if room is None:
+                        messages.error(request, "Brak wolnych pokoi tego typu w wybranym terminie.")
+                    else:
+                        messages.error(request, "Ten pokój jest już zajęty w wybranym terminie.")
+                else:
+                    reservation = Reservation(
+                        guest=guest,
+                        room=room,
+                        room_type=room.room_type if room else room_type,
+                        check_in=check_in,
+                        check_out=check_out,
+                        number_of_guests=room.capacity if room else int(request.POST.get('number_of_guests') or 1),
+                        status='confirmed',
+                        reservation_pin=generate_pin()
+                    )
+                    total_price = pricing.reservation_price(reservation)
+                    reservation.total_price = total_price
+                    reservation.save()
+                    notifications.reservation_confirmation(reservation)
+                    if not guest_id:
+                        accounts.send_invite(request, guest.user, reservation)
+
+                    messages.success(request, f"Rezerwacja utworzona pomyślnie. Cena: {total_price} PLN")
+                    return redirect('employee:reservations')
+
+        except ValueError:
+            messages.error(request, "Nieprawidłowy format daty.")
+        except Exception as e:
+            messages.error(request, f"Wystąpił błąd: {e}")
+
+    guests = GuestProfile.objects.all()
+    rooms = Room.objects.all()
+    return render(request, 'employee/create_reservation.html', {
+        'guests': guests,
+        'available_rooms': rooms,
+        'room_types': Room.TYPE_CHOICES,
+    })
+
+@login_required
+@employee_required
+def employee_housekeeping(request):
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        room_id = request.POST.get('room_id')
+        room = get_object_or_404(Room, pk=room_id)
+        
+        if action == 'mark_clean':
+            if housekeeping.mark_clean(room) == 'available':
+                messages.success(request, f"Pokój {room.number} oznaczony jako POSPRZĄTANY (Wolny).")
+            else:
+                messages.warning(request, f"Pokój {room.number} posprzątany. Mieszka w nim zameldowany gość, więc pozostaje ZAJĘTY.")
+        elif action == 'mark_serviced':
+            housekeeping.mark_serviced(room)
+            messages.success(request, f"Serwis pobytowy w pokoju {room.number} wykonany.")
+        elif action == 'report_issue':
+            title = request.POST.get('issue_title')
+            desc = request.POST.get('issue_description')
+            if not title or not desc:
+                messages.error(request, "Tytuł i opis usterki są wymagane.")
+                return redirect('employee:housekeeping')
+            maintenance.open_ticket(room, request.user, 'housekeeping', title, desc)
+            messages.warning(request, f"Zgłoszono usterkę w pokoju {room.number}. Status: W NAPRAWIE.")
+
+        return redirect('employee:housekeeping')
+
+    board = housekeeping.build_board(balance=request.GET.get('balance', '1') == '1')
+    current_maid = None
+    if hasattr(request.user, 'employee_profile') and request.user.employee_profile.role == 'maid':
+        current_maid = request.user.employee_profile
+    context = {
+        'queue': board['queue'],
+        'workload': board['workload'],
+        'current_maid': current_maid,
+        'today': timezone.now().date(),
+    }
+    return render(request, 'employee/housekeeping.html', context)
+
+@login_required
+@employee_required
+def employee_maintenance(request):
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        room_id = request.POST.get('room_id')
+        room = get_object_or_404(Room, pk=room_id)
+        
+        if action == 'repair_done':
+            maintenance.close_room_tickets(room)
+            room.status = 'dirty'
+            room.save()
+            messages.success(request, f"Usterka w pokoju {room.number} usunięta. Pokój przekazany do sprzątania.")
+        elif action == 'clean_done':
+            room.status = 'available'
+            room.save()
+            messages.success(request, f"Pokój {room.number} oznaczony jako POSPRZĄTANY (Wolny).")
+
+        elif action == 'report_issue':
+            title = request.POST.get('issue_title')
+            desc = request.POST.get('issue_description')
+            if not title or not desc:
+                messages.error(request, "Tytuł i opis usterki są wymagane.")
+                return redirect('employee:maintenance')
+            maintenance.open_ticket(room, request.user, 'maintenance', title, desc)
+            messages.warning(request, f"Zgłoszono usterkę w pokoju {room.number}. Status: W NAPRAWIE.")
+
+        return redirect('employee:maintenance')
+
+    maintenance_rooms = maintenance.maintenance_board()
+    dirty_rooms = Room.objects.filter(status='dirty').order_by('number')
+    return render(request, 'employee/maintenance.html', {'maintenance_rooms': maintenance_rooms, 'dirty_rooms': dirty_rooms})
+
+async def employee_live_events(request):
+    """Strumień SSE ze zmianami statusów pokoi i rezerwacji (wymaga serwera ASGI)."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    if not user.is_superuser and not await EmployeeProfile.objects.filter(user_id=user.pk).aexists():
+        return HttpResponseForbidden()
+
+    response = StreamingHttpResponse(live.event_stream(live.get_broker()), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+@employee_required
+def employee_pricing(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do cennika.")
+        return redirect('employee:dashboard')
+
+    seasons = Season.objects.all().order_by('start_date')
+    season_prices = SeasonPrice.objects.all().select_related('season')
+
+    context = {
+        'seasons': seasons,
+        'season_prices': season_prices
+    }
+    return render(request, 'employee/pricing.html', context)
+
+@login_required
+@employee_required
+def employee_room_create(request):
+    if not request.user.is_superuser and request.user.employee_profile.role in ['technician', 'maid']:
+        messages.error(request, "Brak uprawnień do dodawania pokoi.")
+        return redirect('employee:dashboard')
+
+    if request.method == 'POST':
+        number = request.POST.get('number')
+        capacity = request.POST.get('capacity')
+        price = request.POST.get('price')
+        room_type = request.POST.get('room_type') or request.POST.get('type')
+
+        if number and capacity and price and room_type:
+            try:
+                Room.objects.create(
+                    number=number,
+                    capacity=capacity,
+                    price=price,
+                    room_type=room_type,
+                    status='available'
+                )
+                messages.success(request, "Pokój dodany.")
+                return redirect('employee:rooms')
+            except Exception as e:
+                messages.error(request, f"Błąd: {e}")
+        else:
+            messages.error(request, "Wszystkie pola są wymagane.")
+    return render(request, 'employee/room_create.html')
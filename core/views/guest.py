@@ -0,0 +1,250 @@
+"""Panel gościa: rezerwacje, płatność online, profil, oraz rezerwacja publiczna."""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth import login
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.contrib.auth.models import User
+from ..models import Room, Reservation, GuestProfile
+from ..decorators import guest_required
+from .. import notifications, accounts, payments, pricing, archive, inventory
+from django.utils import timezone
+from datetime import datetime
+from django.db import transaction
+import random
+import string
+import logging
+import uuid
+
+
+def generate_pin():
+    return ''.join(random.choices(string.digits, k=4))
+
+@login_required
+@guest_required
+def guest_dashboard(request):
+    guest_profile, created = GuestProfile.objects.get_or_create(user=request.user)
+    active_reservations = Reservation.objects.filter(
+        guest=guest_profile,
+        status__in=['pending', 'confirmed', 'checked_in']
+    ).order_by('check_in')
+    return render(request, 'guest/dashboard.html', {'reservations': active_reservations})
+
+@login_required
+@guest_required
+def guest_reservations(request):
+    guest_profile, created = GuestProfile.objects.get_or_create(user=request.user)
+    reservations = archive.history(guest=guest_profile)
+    return render(request, 'guest/reservations.html', {'reservations': reservations})
+
+@login_required
+@guest_required
+def guest_reservation_detail(request, pk):
+    guest_profile, created = GuestProfile.objects.get_or_create(user=request.user)
+    reservation = get_object_or_404(Reservation, pk=pk, guest=guest_profile)
+
+    if not reservation.reservation_pin:
+        reservation.reservation_pin = generate_pin()
+        reservation.save()
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        if action == 'pay_online':
+            # Płatność rozlicza w tle core.payments - klucz z formularza chroni przed podwójnym wysłaniem
+            try:
+                payment, created = payments.start(reservation, request.POST.get('idempotency_key'))
+            except ValueError as e:
+                messages.error(request, str(e))
+            except Exception as e:
+                messages.error(request, "Wystąpił błąd podczas przetwarzania płatności online. Spróbuj ponownie lub skontaktuj się z obsługą.")
+                logger = logging.getLogger(__name__)
+                logger.error(f"Błąd płatności online dla rezerwacji {reservation.id}: {str(e)}", exc_info=True)
+            else:
+                if created:
+                    messages.info(request, "Płatność przyjęta do realizacji. Rezerwacja zostanie potwierdzona po autoryzacji płatności.")
+                else:
+                    messages.info(request, "Ta płatność jest już realizowana.")
+            return redirect('guest:reservation_detail', pk=pk)
+
+    return render(request, 'guest/reservation_detail.html', {
+        'reservation': reservation,
+        'payment_in_progress': payments.in_progress(reservation),
+        'failed_payment': reservation.payments.filter(payment_method='online', payment_status='failed').exists(),
+        'idempotency_key': uuid.uuid4().hex,
+    })
+
+@login_required
+@guest_required
+def guest_create_reservation(request):
+    if request.method == 'POST':
+        room_id = request.POST.get('room_id')
+        if not room_id:
+            messages.error(request, "Nie wybrano pokoju.")
+            return redirect('guest:create_reservation')
+
+        check_in_str = request.POST.get('check_in_date')
+        check_out_str = request.POST.get('check_out_date')
+        payment_method = request.POST.get('payment_method', 'cash')
+
+        try:
+            check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+            check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+
+            if check_in < timezone.now().date():
+                messages.error(request, "Nie można rezerwować dat w przeszłości.")
+                return redirect('guest:create_reservation')
+
+            if check_in >= check_out:
+                messages.error(request, "Data zameldowania musi być wcześniejsza niż data wymeldowania.")
+                return redirect('guest:create_reservation')
+
+            with transaction.atomic():
+                room = get_object_or_404(Room, pk=room_id)
+                
+                if room.status == 'maintenance':
+                    messages.error(request, "Ten pokój jest wyłączony z użytku (konserwacja).")
+                    return redirect('guest:create_reservation')
+                
+                if not inventory.can_book_room(room, check_in, check_out):
+                    messages.error(request, "Ten pokój jest niestety zajęty w wybranym terminie.")
+                else:
+                    guest_profile, created = GuestProfile.objects.get_or_create(user=request.user)
+
+                    reservation = Reservation(
+                        guest=guest_profile,
+                        room=room,
+                        check_in=check_in,
+                        check_out=check_out,
+                        number_of_guests=room.capacity,
+                        status='pending',
+                        reservation_pin=generate_pin()
+                    )
+                    reservation.payment_method = payment_method
+                    total_price = pricing.reservation_price(reservation)
+                    reservation.total_price = total_price
+                    reservation.save()
+                    notifications.reservation_confirmation(reservation)
+
+                    payment_msg = "Opłacono online" if payment_method == 'online' else "Płatność gotówką na miejscu"
+                    messages.success(request, f"Rezerwacja złożona! Kwota: {total_price} PLN. ({payment_msg})")
+
+                    return redirect('guest:reservation_detail', pk=reservation.pk)
+
+        except ValueError:
+            messages.error(request, "Błąd formatu daty.")
+
+    rooms = Room.objects.filter(status='available')
+    return render(request, 'guest/create_reservation.html', {'available_rooms': rooms})
+
+@login_required
+@guest_required
+def guest_profile(request):
+    guest, created = GuestProfile.objects.get_or_create(user=request.user)
+    if request.method == 'POST':
+        guest.phone_number = request.POST.get('phone_number')
+        request.user.first_name = request.POST.get('first_name')
+        request.user.last_name = request.POST.get('last_name')
+        request.user.save()
+        guest.save()
+        messages.success(request, "Profil zaktualizowany.")
+    return render(request, 'guest/profile.html', {'guest': guest})
+
+@login_required
+@guest_required
+def guest_cancel_reservation(request, pk):
+    guest_profile, created = GuestProfile.objects.get_or_create(user=request.user)
+    reservation = get_object_or_404(Reservation, pk=pk, guest=guest_profile)
+
+    if request.method == 'POST':
+        if reservation.status in ['pending', 'confirmed'] and reservation.check_in > timezone.now().date():
+            with transaction.atomic():
+                # Blokada jak w payments.start - płatność nie powstanie w trakcie anulowania
+                reservation = Reservation.objects.select_for_update().get(pk=reservation.pk)
+                if payments.in_progress(reservation):
+                    messages.error(request, "Płatność online jest w trakcie rozliczania. Spróbuj anulować za chwilę.")
+                    return redirect('guest:reservation_detail', pk=pk)
+                reservation.status = 'cancelled'
+                reservation.save()
+                notifications.reservation_cancelled(reservation)
+            messages.success(request, "Rezerwacja została anulowana.")
+        else:
+            messages.error(request, "Nie można anulować tej rezerwacji (zbyt późno lub zły status).")
+
+    return redirect('guest:reservation_detail', pk=pk)
+
+def public_create_reservation(request):
+    """Umożliwia rezerwację bez logowania."""
+    if request.method == 'POST':
+        room_id = request.POST.get('room_id')
+        check_in_str = request.POST.get('check_in_date')
+        check_out_str = request.POST.get('check_out_date')
+
+        email = request.POST.get('email')
+        first_name = request.POST.get('name')
+        last_name = request.POST.get('surname')
+        phone = request.POST.get('phone')
+        
+        create_account_flag = request.POST.get('create_account')
+        password_input = request.POST.get('password')
+        username_input = request.POST.get('username')
+
+        try:
+            check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+            check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+
+            if check_in >= check_out:
+                messages.error(request, "Data zameldowania musi być wcześniejsza niż data wymeldowania.")
+                return redirect('public_create_reservation')
+
+            with transaction.atomic():
+                room = get_object_or_404(Room, pk=room_id)
+                if not inventory.can_book_room(room, check_in, check_out):
+                    messages.error(request, "Ten pokój jest niestety zajęty w wybranym terminie.")
+                    return redirect('public_create_reservation')
+
+                if request.user.is_authenticated:
+                    user = request.user
+                    guest_profile = user.guest_profile
+                else:
+                    if User.objects.filter(email=email).exists():
+                        messages.error(request, "Konto z tym adresem email już istnieje. Zaloguj się.")
+                        return redirect('login')
+
+                    # Hasło haszujemy tylko, gdy gość sam je podał - pozostali ustawiają je z linku w e-mailu
+                    password = password_input if create_account_flag == 'on' else None
+                    username = username_input if create_account_flag == 'on' and username_input else None
+                    guest_profile = accounts.create_guest(
+                        first_name, last_name, email=email, phone=phone,
+                        username=username or accounts.next_free_username(email), password=password,
+                    )
+                    user = guest_profile.user
+
+                    login(request, user)
+
+                    if not password:
+                        accounts.send_invite(request, user)
+                        messages.info(request, "Utworzono konto dla tej rezerwacji. Link do ustawienia hasła wyślemy na podany adres e-mail.")
+
+                reservation = Reservation(
+                    guest=guest_profile,
+                    room=room,
+                    check_in=check_in,
+                    check_out=check_out,
+                    number_of_guests=room.capacity,
+                    status='pending',
+                    reservation_pin=generate_pin()
+                )
+                reservation.payment_method = 'online' if request.POST.get('payment_method') == 'online' else 'cash'
+                reservation.total_price = pricing.reservation_price(reservation)
+                reservation.save()
+                notifications.reservation_confirmation(reservation)
+
+                messages.success(request, f"Rezerwacja przyjęta! Witaj {user.first_name}.")
+                return redirect('guest:reservation_detail', pk=reservation.pk)
+
+        except ValueError:
+            messages.error(request, "Błąd danych.")
+        except Exception as e:
+            messages.error(request, f"Wystąpił błąd: {e}")
+
+    rooms = Room.objects.filter(status='available')
+    return render(request, 'guest/create_reservation_public.html', {'available_rooms': rooms})
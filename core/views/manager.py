@@ -0,0 +1,121 @@
+"""Widoki menedżera: pracownicy, raport miesięczny i nieopłacone salda."""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.contrib.auth.models import User
+from ..models import Room, EmployeeProfile
+from ..decorators import employee_required
+from ..replica import replica_reads
+from .. import maintenance, billing, archive
+from django.utils import timezone
+from django.db.models import Sum
+from django.core.paginator import Paginator
+from django.db import transaction
+import random
+
+
+@login_required
+
+@login_required
+@employee_required
+def manager_employees(request):
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        messages.error(request, "Brak uprawnień menadżerskich.")
+        return redirect('employee:dashboard')
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        
+        if action == 'add_employee':
+            first_name = request.POST.get('first_name')
+            last_name = request.POST.get('last_name')
+            email = request.POST.get('email')
+            role = request.POST.get('role')
+            password = request.POST.get('password')
+
+            username = email.split('@')[0]
+            if User.objects.filter(username=username).exists():
+                 username = f"{username}_{random.randint(100,999)}"
+
+            if User.objects.filter(email=email).exists():
+                 messages.error(request, "Użytkownik o takim emailu już istnieje.")
+            else:
+                try:
+                    with transaction.atomic():
+                        user = User.objects.create_user(username=username, email=email, password=password)
+                        user.first_name = first_name
+                        user.last_name = last_name
+                        user.save()
+                        EmployeeProfile.objects.create(user=user, role=role)
+                        messages.success(request, f"Pracownik {first_name} {last_name} dodany pomyślnie.")
+                except Exception as e:
+                    messages.error(request, f"Błąd podczas dodawania: {e}")
+        
+        elif action == 'toggle_active':
+            user_id = request.POST.get('user_id')
+            user = get_object_or_404(User, pk=user_id)
+            if user.is_superuser:
+                 messages.error(request, "Nie można dezaktywować administratora.")
+            else:
+                user.is_active = not user.is_active
+                user.save()
+                status = "aktywowany" if user.is_active else "dezaktywowany"
+                messages.success(request, f"Pracownik {user.get_full_name()} został {status}.")
+
+        return redirect('employee:manager_employees')
+
+    employees = EmployeeProfile.objects.all().select_related('user').order_by('role')
+    return render(request, 'employee/manager_employees.html', {'employees': employees})
+
+@replica_reads
+@login_required
+@employee_required
+def manager_reports(request):
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        messages.error(request, "Brak uprawnień menadżerskich.")
+        return redirect('employee:dashboard')
+
+    today = timezone.now().date()
+    current_month = today.month
+    current_year = today.year
+
+    monthly_revenue = archive.revenue(payment_date__month=current_month, payment_date__year=current_year)
+
+    total_rooms = Room.objects.count()
+    occupied_rooms = Room.objects.filter(status='occupied').count()
+    occupancy_rate = 0
+    if total_rooms > 0:
+        occupancy_rate = round((occupied_rooms / total_rooms) * 100, 1)
+
+    cancelled_reservations = archive.history(status='cancelled', limit=20)
+
+    repair_stats = maintenance.repair_stats()
+    tickets_per_room = maintenance.tickets_per_room()
+
+    context = {
+        'repair_stats': repair_stats,
+        'tickets_per_room': tickets_per_room,
+        'monthly_revenue': monthly_revenue,
+        'occupancy_rate': occupancy_rate,
+        'cancelled_reservations': cancelled_reservations,
+        'total_rooms': total_rooms,
+        'occupied_rooms': occupied_rooms,
+        'current_date': today
+    }
+    return render(request, 'employee/manager_reports.html', context)
+
+@replica_reads
+@login_required
+@employee_required
+def manager_outstanding_balances(request):
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        messages.error(request, "Brak uprawnień menadżerskich.")
+        return redirect('employee:dashboard')
+
+    page = Paginator(billing.outstanding_balances(), 50).get_page(request.GET.get('page'))
+    total_outstanding = billing.outstanding_balances().aggregate(total=Sum('balance_due'))['total'] or 0
+    context = {
+        'page': page,
+        'total_outstanding': total_outstanding,
+    }
+    return render(request, 'employee/manager_balances.html', context)
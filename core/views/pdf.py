@@ -0,0 +1,113 @@
+"""Dokumenty do pobrania: raport PDF, faktura rezerwacji i paczka faktur miesiąca.
+
+reportlab ładuje się dopiero przy pierwszym renderowaniu (core.pdf).
+"""
+from django.shortcuts import redirect
+from django.http import Http404, StreamingHttpResponse, FileResponse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from ..models import Room
+from ..decorators import employee_required
+from ..replica import replica_reads
+from .. import invoices, pdf, archive
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+import io
+
+
+@replica_reads
+@login_required
+@employee_required
+def manager_report_pdf(request):
+    if not pdf.available():
+        messages.error(request, "Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
+        return redirect('employee:manager_reports')
+        
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        messages.error(request, "Brak uprawnień.")
+        return redirect('employee:dashboard')
+
+    today = timezone.now().date()
+    current_month = today.month
+    current_year = today.year
+
+    monthly_revenue = archive.revenue(payment_date__month=current_month, payment_date__year=current_year)
+    
+    total_rooms = Room.objects.count()
+    occupied_rooms = Room.objects.filter(status='occupied').count()
+    occupancy_rate = 0
+    if total_rooms > 0:
+        occupancy_rate = round((occupied_rooms / total_rooms) * 100, 1)
+
+    report = pdf.render_report({
+        'hotel': pdf.hotel_name(),
+        'month': today.strftime('%m/%Y'),
+        'generated': today.strftime('%Y-%m-%d'),
+        'monthly_revenue': monthly_revenue,
+        'occupancy_rate': occupancy_rate,
+        'occupied_rooms': occupied_rooms,
+        'total_rooms': total_rooms,
+    })
+    buffer = io.BytesIO(report)
+    return FileResponse(buffer, as_attachment=True, filename=f"raport_{current_month}_{current_year}.pdf")
+
+@replica_reads
+@login_required
+def reservation_invoice_pdf(request, pk):
+    # Faktura zostaje dostępna także po przeniesieniu rezerwacji do archiwum
+    reservation = archive.find(pk)
+    if reservation is None:
+        raise Http404("Brak rezerwacji.")
+
+    is_owner = hasattr(request.user, 'guest_profile') and reservation.guest_id == request.user.guest_profile.pk
+    is_staff = hasattr(request.user, 'employee_profile') or request.user.is_superuser
+
+    if not (is_owner or is_staff):
+        messages.error(request, "Brak uprawnień.")
+        return redirect('home')
+
+    data = invoices.invoice_context(reservation)
+    fingerprint = invoices.invoice_fingerprint(data)
+    path = invoices.cached_path(data, fingerprint)
+    etag = f'"{fingerprint}"'
+    last_modified = int(path.stat().st_mtime) if path.exists() else None
+
+    # Ta sama wersja faktury co w przeglądarce - 304 bez renderowania i czytania pliku
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if last_modified is None:
+        if not pdf.available():
+            messages.error(request, "Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
+            return redirect('home')
+        path = invoices.get_or_render(data, fingerprint)
+        last_modified = int(path.stat().st_mtime)
+
+    response = FileResponse(open(path, 'rb'), as_attachment=True, filename=f"faktura_{reservation.id}.pdf")
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@replica_reads
+@login_required
+@employee_required
+def manager_invoices_zip(request, year, month):
+    if not request.user.is_superuser and (not hasattr(request.user, 'employee_profile') or request.user.employee_profile.role != 'manager'):
+        messages.error(request, "Brak uprawnień.")
+        return redirect('employee:dashboard')
+
+    if not 1 <= month <= 12:
+        messages.error(request, "Nieprawidłowy miesiąc.")
+        return redirect('employee:manager_reports')
+
+    if not pdf.available():
+        messages.error(request, "Brak biblioteki reportlab. Zainstaluj: pip install reportlab")
+        return redirect('employee:manager_reports')
+
+    entries = invoices.month_invoices(year, month)
+    response = StreamingHttpResponse(invoices.stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="faktury_{year}_{month:02d}.zip"'
+    return response